@@ -0,0 +1 @@
+from . import backends, permissions, users
@@ -0,0 +1,59 @@
+from __future__ import unicode_literals
+
+
+__all__ = ("ObjectPermissionBackend",)
+
+
+class ObjectPermissionBackend(object):
+    """
+    A base class for authentication backends that implement object
+    permissions, i.e. "row-level" permissions, and support batched
+    permission lookups for many objects at once.
+    
+    Subclasses should implement get_all_permissions(user_obj, obj=None) and
+    has_perm(user_obj, perm, obj=None) as usual for Django's authentication
+    backends. To answer permission checks for a list of objects with a single
+    query, override get_objects_permissions().
+    
+    The batched lookups are used by
+    daydreamer.auth.permissions.filter_objects() and by the
+    daydreamer.views.behaviors.ObjectListPermissions view behavior. Backends
+    that don't implement get_objects_permissions() are still honored, but
+    they are checked one object at a time with has_perm().
+    
+    """
+    def get_objects_permissions(self, user_obj, objs):
+        """
+        Returns a dictionary mapping the primary key of each of the objects
+        to the set of permission names granted to the user for the object.
+        
+        The default implementation calls get_all_permissions() for each of
+        the objects. Inactive users are granted no permissions.
+        
+        """
+        return dict(
+            (obj.pk,
+                set(self.get_all_permissions(user_obj, obj=obj))
+                    if user_obj.is_active
+                    else set())
+            for obj in objs)
+    
+    def get_all_permissions(self, user_obj, obj=None):
+        """
+        Returns the set of permission names granted to the user, optionally
+        for the given object.
+        
+        Subclasses must implement this.
+        
+        """
+        raise NotImplementedError
+    
+    def has_perm(self, user_obj, perm, obj=None):
+        """
+        Returns True when the user is active and has the named permission,
+        optionally for the given object.
+        
+        """
+        return (
+            user_obj.is_active and
+            perm in self.get_all_permissions(user_obj, obj=obj))
@@ -0,0 +1,284 @@
+from __future__ import unicode_literals
+
+from django.contrib import auth
+from django.contrib.auth import models as auth_models
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.db.models import signals
+from django.utils import encoding, six
+
+from daydreamer.core import versions
+
+
+__all__ = (
+    "get_permissions", "has_perms",
+    "invalidate_user", "invalidate_object", "invalidate_all",
+    "get_permitted", "filter_objects", "annotate_objects",)
+
+
+# The cache key namespace for permission sets and their version counters.
+KEY_PREFIX = "daydreamer.auth.permissions"
+
+
+def get_global_version_key():
+    """
+    Returns the key of the version counter shared by all users' permission
+    sets. It is bumped for changes that may affect many users at once, such
+    as changes to a group's permissions.
+    
+    """
+    return ".".join((KEY_PREFIX, "version",))
+
+
+def get_user_version_key(user_pk):
+    """
+    Returns the key of the version counter for the permission sets of the
+    user with the given primary key.
+    
+    """
+    return ".".join((
+        KEY_PREFIX, "version", "user", encoding.force_text(user_pk),))
+
+
+def get_object_version_key(obj):
+    """
+    Returns the key of the version counter for the permission sets that are
+    specific to the given object.
+    
+    """
+    return ".".join((
+        KEY_PREFIX, "version", "object",
+        obj._meta.app_label, obj._meta.model_name,
+        encoding.force_text(obj.pk),))
+
+
+def get_permissions(user, obj=None, cache=None, timeout=DEFAULT_TIMEOUT):
+    """
+    Returns the frozenset of permission names that the authentication
+    backends grant to the user, optionally for the given object.
+    
+    The permission set is loaded with user.get_all_permissions() and stored
+    in the given cache or cache alias under a key that identifies the user
+    and the object and that includes the current values of the global, user
+    and object version counters, so that bumping any of the counters makes
+    the stored set unreachable. The version counters are always kept in the
+    default cache, where the invalidation functions bump them, whichever
+    cache holds the permission sets.
+    
+    """
+    version_keys = (
+        (get_global_version_key(), get_user_version_key(user.pk),) +
+        ((get_object_version_key(obj),)
+            if obj is not None
+            else ()))
+    current = versions.get_versions(version_keys)
+    key = ".".join(
+        (KEY_PREFIX, "set", "user", encoding.force_text(user.pk),) +
+        ((
+            "object", obj._meta.app_label, obj._meta.model_name,
+            encoding.force_text(obj.pk),)
+            if obj is not None
+            else ()) +
+        ("version",) +
+        tuple(
+            encoding.force_text(current[version_key])
+            for version_key in version_keys))
+    cache = versions.get_cache(cache)
+    permissions = cache.get(key)
+    if permissions is None:
+        permissions = frozenset(user.get_all_permissions(obj=obj))
+        cache.set(key, permissions, timeout)
+    return permissions
+
+
+def has_perms(user, permissions, obj=None, cache=None,
+        timeout=DEFAULT_TIMEOUT):
+    """
+    A cached equivalent of user.has_perms(permissions, obj=obj).
+    
+    Active superusers have all permissions. For other active users, the test
+    is made against the cached permission set from get_permissions(). This
+    assumes that each authentication backend's has_perm() agrees with its
+    get_all_permissions(), as it does for Django's ModelBackend.
+    
+    Anonymous and inactive users are deferred to user.has_perms(), because
+    the backends may treat them specially. So are objects that are not model
+    instances, because their permission sets cannot be versioned.
+    
+    """
+    if (not user.is_authenticated() or
+        not user.is_active or
+        (obj is not None and not hasattr(obj, "_meta"))):
+        return user.has_perms(permissions, obj=obj)
+    return (
+        user.is_superuser or
+        set(permissions) <= get_permissions(
+            user, obj=obj, cache=cache, timeout=timeout))
+
+
+def invalidate_user(user_pk):
+    """
+    Invalidates the cached permission sets of the user with the given
+    primary key, in every cache.
+    
+    """
+    versions.bump_version(get_user_version_key(user_pk))
+
+
+def invalidate_object(obj):
+    """
+    Invalidates the cached permission sets of all users for the given object,
+    in every cache. Object permission backends should call this when they
+    change the permissions granted for an object.
+    
+    """
+    versions.bump_version(get_object_version_key(obj))
+
+
+def invalidate_all():
+    """
+    Invalidates the cached permission sets of all users, in every cache.
+    
+    """
+    versions.bump_version(get_global_version_key())
+
+
+def get_permitted(user, permissions, objs):
+    """
+    Returns the set of primary keys of the objects for which the user has all
+    of the named permissions, with the same semantics as calling
+    user.has_perms(permissions, obj=obj) for each object.
+    
+    Authentication backends implementing get_objects_permissions(), such as
+    subclasses of daydreamer.auth.backends.ObjectPermissionBackend, are asked
+    about all of the objects with a single call. Other backends are asked
+    about each object with has_perm().
+    
+    """
+    objs = list(objs)
+    if user.is_active and user.is_superuser:
+        return set(obj.pk for obj in objs)
+    required = frozenset(permissions)
+    granted = dict((obj.pk, set(),) for obj in objs)
+    for backend in auth.get_backends():
+        if hasattr(backend, "get_objects_permissions"):
+            for pk, names in six.iteritems(
+                    backend.get_objects_permissions(user, objs)):
+                if pk in granted:
+                    granted[pk].update(required.intersection(names))
+        elif hasattr(backend, "has_perm"):
+            for obj in objs:
+                granted[obj.pk].update(
+                    permission
+                    for permission in required - granted[obj.pk]
+                    if backend.has_perm(user, permission, obj))
+    return set(
+        pk
+        for pk, names in six.iteritems(granted)
+        if names >= required)
+
+
+def filter_objects(user, permissions, objs):
+    """
+    Returns a list of the objects for which the user has all of the named
+    permissions, preserving their order. See get_permitted().
+    
+    """
+    objs = list(objs)
+    permitted = get_permitted(user, permissions, objs)
+    return [obj for obj in objs if obj.pk in permitted]
+
+
+def annotate_objects(user, permissions, objs, name):
+    """
+    Sets an attribute with the given name on each of the objects to True when
+    the user has all of the named permissions for the object and to False
+    otherwise. Returns the objects as a list. See get_permitted().
+    
+    """
+    objs = list(objs)
+    permitted = get_permitted(user, permissions, objs)
+    for obj in objs:
+        setattr(obj, name, obj.pk in permitted)
+    return objs
+
+
+# Signal receivers for keeping the cached permission sets current.
+def user_changed(sender, instance, **kwargs):
+    """
+    Invalidates the cached permission sets of a saved or deleted user.
+    
+    """
+    invalidate_user(instance.pk)
+
+
+def user_relations_changed(sender, instance, action, reverse, pk_set,
+        **kwargs):
+    """
+    Invalidates the cached permission sets of the users whose permissions or
+    groups have changed.
+    
+    """
+    if action in ("post_add", "post_remove",):
+        for user_pk in (pk_set or ()) if reverse else (instance.pk,):
+            invalidate_user(user_pk)
+    elif action == "post_clear":
+        # The affected users are unknown when the relation is cleared from
+        # the permission's or the group's side.
+        if reverse:
+            invalidate_all()
+        else:
+            invalidate_user(instance.pk)
+
+
+def global_relations_changed(sender, action, **kwargs):
+    """
+    Invalidates all of the cached permission sets when a group's permissions
+    have changed.
+    
+    """
+    if action in ("post_add", "post_remove", "post_clear",):
+        invalidate_all()
+
+
+def global_changed(sender, **kwargs):
+    """
+    Invalidates all of the cached permission sets when a permission or a group
+    has been changed or deleted.
+    
+    """
+    invalidate_all()
+
+
+def connect():
+    """
+    Invalidates the cached permission sets whenever a user, a permission or
+    a group changes. Called when the daydreamer app's models are loaded.
+    
+    """
+    User = auth.get_user_model()
+    signals.post_save.connect(
+        user_changed, sender=User,
+        dispatch_uid="daydreamer.auth.permissions.user_saved")
+    signals.post_delete.connect(
+        user_changed, sender=User,
+        dispatch_uid="daydreamer.auth.permissions.user_deleted")
+    for name in ("user_permissions", "groups",):
+        if name in User._meta.get_all_field_names():
+            signals.m2m_changed.connect(
+                user_relations_changed,
+                sender=getattr(User, name).through,
+                dispatch_uid=".".join(
+                    ("daydreamer.auth.permissions", name, "changed",)))
+    signals.m2m_changed.connect(
+        global_relations_changed,
+        sender=auth_models.Group.permissions.through,
+        dispatch_uid="daydreamer.auth.permissions.group_permissions_changed")
+    signals.post_save.connect(
+        global_changed, sender=auth_models.Permission,
+        dispatch_uid="daydreamer.auth.permissions.permission_saved")
+    signals.post_delete.connect(
+        global_changed, sender=auth_models.Permission,
+        dispatch_uid="daydreamer.auth.permissions.permission_deleted")
+    signals.post_delete.connect(
+        global_changed, sender=auth_models.Group,
+        dispatch_uid="daydreamer.auth.permissions.group_deleted")
@@ -0,0 +1,255 @@
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import backends as auth_backends
+from django.contrib.auth import models as auth_models
+from django.db.models import Q, signals
+from django.utils import encoding, functional
+from django.utils.six.moves import cPickle as pickle
+
+from daydreamer.core import datastructures, versions
+
+
+__all__ = (
+    "is_anonymous_request", "prefetch", "get_group_ids",
+    "prefetch_permissions", "get_user", "use_cached_user", "invalidate_user",)
+
+
+# The cache key namespace for cached users.
+KEY_PREFIX = "daydreamer.auth.users"
+
+# The default number of seconds that a user is cached in the shared cache.
+TIMEOUT = 60
+
+# The in-process cache of pickled users, which is consulted before the shared
+# cache. Its entries can't be invalidated from other processes, so they
+# expire quickly.
+local_cache = datastructures.LRUCache(size=1000, timeout=5)
+
+
+# The request attribute names used to store the prefetched authorization data.
+PREFETCHED_ATTR = "auth_prefetched"
+GROUP_IDS_ATTR = "auth_group_ids"
+
+
+def is_anonymous_request(request):
+    """
+    Returns True when the request's user is known to be anonymous without
+    loading the session or the user.
+    
+    This is the case when the request's user is still the unevaluated lazy
+    object set by django.contrib.auth.middleware.AuthenticationMiddleware
+    and the request has no session cookie, because the user can only be
+    loaded from a session. Returns False when the user's state can't be
+    decided this way, in which case the caller should test the user.
+    
+    """
+    user = getattr(request, "user", None)
+    return (
+        isinstance(user, functional.SimpleLazyObject) and
+        user._wrapped is functional.empty and
+        settings.SESSION_COOKIE_NAME not in request.COOKIES)
+
+
+def prefetch(request, requirements):
+    """
+    Loads the authorization data named by the requirements for the request's
+    user, so that the authorization tests for the request can share it.
+    
+    The requirements should be an iterable containing any of:
+        
+        "user" to load the user from the session.
+        "groups" to load the primary keys of the user's groups with a single
+        query. They are stored on the request and are returned by
+        get_group_ids().
+        "permissions" to load the user's permissions from Django's
+        ModelBackend with a single query, rather than the two queries that
+        the backend uses. They are stored in the backend's permission cache
+        on the user.
+    
+    Requirements that have already been loaded for the request are skipped.
+    Nothing beyond the user is loaded for anonymous users, and nothing at all
+    is loaded for requests that is_anonymous_request() recognizes.
+    
+    """
+    prefetched = getattr(request, PREFETCHED_ATTR, set())
+    requirements = set(requirements) - prefetched
+    if not requirements or is_anonymous_request(request):
+        return
+    user = request.user
+    if user.is_authenticated():
+        if "groups" in requirements:
+            get_group_ids(request)
+        if "permissions" in requirements:
+            prefetch_permissions(user)
+    setattr(request, PREFETCHED_ATTR, prefetched | requirements)
+
+
+def get_group_ids(request):
+    """
+    Returns the frozenset of primary keys of the groups that the request's
+    user belongs to. The primary keys are loaded with a single query and are
+    stored on the request for subsequent calls.
+    
+    """
+    group_ids = getattr(request, GROUP_IDS_ATTR, None)
+    if group_ids is None:
+        user = request.user
+        group_ids = (
+            frozenset(user.groups.values_list("pk", flat=True))
+                if user.is_authenticated()
+                else frozenset())
+        setattr(request, GROUP_IDS_ATTR, group_ids)
+    return group_ids
+
+
+def prefetch_permissions(user):
+    """
+    Fills Django's ModelBackend permission cache on the user with the user's
+    permissions and group permissions, loaded with a single query.
+    
+    Does nothing when the ModelBackend is not installed, when the cache is
+    already filled, when the user model has no permissions or when the user's
+    permission checks don't reach the backend, i.e. for inactive users and
+    active superusers.
+    
+    """
+    if (hasattr(user, "_perm_cache") or
+        not hasattr(user, "user_permissions") or
+        not user.is_active or
+        user.is_superuser or
+        not any(
+            isinstance(backend, auth_backends.ModelBackend)
+            for backend in auth.get_backends())):
+        return
+    opts = user._meta
+    user_query = opts.get_field("user_permissions").related_query_name()
+    groups_query = opts.get_field("groups").related_query_name()
+    user._perm_cache = set(
+        "{app_label:s}.{codename:s}".format(
+            app_label=app_label, codename=codename)
+        for app_label, codename in (
+            auth_models.Permission.objects
+                .filter(
+                    Q(**{user_query: user}) |
+                    Q(**{"__".join(("group", groups_query,)): user}))
+                .values_list("content_type__app_label", "codename")
+                .distinct()))
+
+
+def get_user_key(backend_path, user_pk):
+    """
+    Returns the cache key of the user with the given primary key, as loaded
+    by the authentication backend with the given import path.
+    
+    """
+    return ".".join((
+        KEY_PREFIX, "user", backend_path, encoding.force_text(user_pk),))
+
+
+def get_user_version_key(user_pk):
+    """
+    Returns the key of the version counter for the cached snapshots of the
+    user with the given primary key.
+    
+    """
+    return ".".join((
+        KEY_PREFIX, "version", "user", encoding.force_text(user_pk),))
+
+
+def get_user(request, cache=None, timeout=TIMEOUT):
+    """
+    A cached equivalent of django.contrib.auth.get_user(request).
+    
+    The user is loaded from the session's authentication backend and stored
+    as a pickled snapshot in the in-process local_cache and in the given
+    cache or cache alias for timeout seconds, so that subsequent requests in
+    the same session don't have to query the database for the user. Each
+    call returns a new instance, so changes made to the user while
+    handling a request don't leak into other requests.
+    
+    The snapshots are invalidated when the user is saved or deleted. The
+    snapshots in the shared cache are keyed by a version counter that is
+    always kept in the default cache, so that they are invalidated whichever
+    cache holds them. Other processes may continue to use their local
+    snapshots for a few seconds.
+    
+    """
+    try:
+        user_pk = request.session[auth.SESSION_KEY]
+        backend_path = request.session[auth.BACKEND_SESSION_KEY]
+    except KeyError:
+        return auth_models.AnonymousUser()
+    if backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return auth_models.AnonymousUser()
+    key = get_user_key(backend_path, user_pk)
+    data = local_cache.get(key)
+    if data is None:
+        shared_key = ".".join((
+            key, "version",
+            encoding.force_text(
+                versions.get_version(get_user_version_key(user_pk))),))
+        cache = versions.get_cache(cache)
+        data = cache.get(shared_key)
+        if data is None:
+            user = auth.load_backend(backend_path).get_user(user_pk)
+            if user is None:
+                return auth_models.AnonymousUser()
+            data = pickle.dumps(user, pickle.HIGHEST_PROTOCOL)
+            cache.set(shared_key, data, timeout)
+        local_cache.set(key, data)
+    user = pickle.loads(data)
+    user.backend = backend_path
+    return user
+
+
+def use_cached_user(request, cache=None, timeout=TIMEOUT):
+    """
+    Replaces the request's lazily loaded user with one that is lazily loaded
+    by get_user() with the given cache or cache alias and timeout.
+    
+    The user is only replaced while it is still the unevaluated lazy object
+    set by django.contrib.auth.middleware.AuthenticationMiddleware.
+    
+    """
+    user = getattr(request, "user", None)
+    if (isinstance(user, functional.SimpleLazyObject) and
+        user._wrapped is functional.empty):
+        request.user = functional.SimpleLazyObject(
+            lambda: get_user(request, cache=cache, timeout=timeout))
+
+
+def invalidate_user(user_pk):
+    """
+    Invalidates the cached snapshots of the user with the given primary key
+    in this process and in every cache.
+    
+    """
+    for backend_path in settings.AUTHENTICATION_BACKENDS:
+        local_cache.delete(get_user_key(backend_path, user_pk))
+    versions.bump_version(get_user_version_key(user_pk))
+
+
+# Signal receivers for keeping the cached users current.
+def user_changed(sender, instance, **kwargs):
+    """
+    Invalidates the cached snapshots of a saved or deleted user.
+    
+    """
+    invalidate_user(instance.pk)
+
+
+def connect():
+    """
+    Invalidates the cached snapshots of users whenever they are saved or
+    deleted. Called when the daydreamer app's models are loaded.
+    
+    """
+    User = auth.get_user_model()
+    signals.post_save.connect(
+        user_changed, sender=User,
+        dispatch_uid="daydreamer.auth.users.user_saved")
+    signals.post_delete.connect(
+        user_changed, sender=User,
+        dispatch_uid="daydreamer.auth.users.user_deleted")
@@ -0,0 +1,101 @@
+from __future__ import unicode_literals
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.utils.six.moves import cPickle as pickle
+
+
+__all__ = ("TieredCache",)
+
+
+class TieredCache(object):
+    """
+    A cache that keeps recently used values in an in-process local cache,
+    such as a daydreamer.core.datastructures.LRUCache, in front of a shared
+    Django cache.
+    
+    Reads are served from the local cache when possible. Values read from or
+    written to the shared cache are also stored locally, as pickled strings,
+    for at most the local cache's timeout, which bounds how stale they can
+    get after they are changed by other processes. Every read returns a new
+    copy of the value.
+    
+    When stats is given, it should be a daydreamer.core.stats.Stats instance,
+    which counts the "local_hits", "local_misses", "shared_hits" and
+    "shared_misses" of the reads.
+    
+    Only the cache methods used for caching responses are supported. Use the
+    shared cache directly for anything else, such as locks and counters.
+    
+    """
+    def __init__(self, local, shared, stats=None):
+        self.local = local
+        self.shared = shared
+        self.stats = stats
+    
+    @property
+    def default_timeout(self):
+        """
+        The shared cache's default timeout.
+        
+        """
+        return self.shared.default_timeout
+    
+    def count(self, name):
+        """
+        Increments the named counter of the stats, if any.
+        
+        """
+        if self.stats is not None:
+            self.stats.incr(name)
+    
+    def store_local(self, key, value, timeout=DEFAULT_TIMEOUT):
+        """
+        Stores a pickled copy of the value in the local cache for at most the
+        local cache's timeout and the given timeout.
+        
+        """
+        local_timeout = self.local.timeout
+        if timeout is not DEFAULT_TIMEOUT and timeout is not None:
+            local_timeout = (
+                timeout
+                    if local_timeout is None
+                    else min(local_timeout, timeout))
+        if local_timeout is None or local_timeout > 0:
+            self.local.set(
+                key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL),
+                local_timeout)
+    
+    def get(self, key, default=None):
+        """
+        Returns the value stored under the key, or the default when the key is
+        missing from both caches.
+        
+        """
+        data = self.local.get(key)
+        if data is not None:
+            self.count("local_hits")
+            return pickle.loads(data)
+        self.count("local_misses")
+        value = self.shared.get(key)
+        if value is None:
+            self.count("shared_misses")
+            return default
+        self.count("shared_hits")
+        self.store_local(key, value)
+        return value
+    
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT):
+        """
+        Stores the value under the key in both caches.
+        
+        """
+        self.shared.set(key, value, timeout)
+        self.store_local(key, value, timeout)
+    
+    def delete(self, key):
+        """
+        Deletes the value stored under the key from both caches.
+        
+        """
+        self.local.delete(key)
+        self.shared.delete(key)
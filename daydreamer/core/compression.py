@@ -0,0 +1,306 @@
+from __future__ import unicode_literals
+
+import fnmatch
+import gzip
+import hashlib
+import io
+import multiprocessing
+import os
+import re
+import time
+import zlib
+
+from django.middleware import gzip as gzip_middleware
+from django.utils import cache as cache_utils
+
+from . import datastructures, stats as daydreamer_stats
+
+
+__all__ = (
+    "compress", "compress_sequence", "decompress", "get_level",
+    "get_pressure", "is_compressed_type", "accepts_gzip", "encode_response",
+    "compress_body", "gzip_response",)
+
+
+# The number of bytes of content that compress_sequence() compresses between
+# flushes of the compressed stream.
+FLUSH_SIZE = 16384
+
+# The minimum length of the content of a response worth gzipping, like
+# django.middleware.gzip.GZipMiddleware.
+MIN_LENGTH = 200
+
+# The compression level used by default, like
+# django.utils.text.compress_string().
+LEVEL = 6
+
+# The compression levels for content lengths, as a sequence of tuples of the
+# minimum content length and the level, sorted by length. See get_level().
+LEVELS = ((0, LEVEL,), (131072, 9,),)
+
+# The fnmatch-style patterns of the content types that are already
+# compressed, and aren't worth gzipping.
+COMPRESSED_TYPES = (
+    "image/gif", "image/jpeg", "image/png", "image/webp", "audio/*",
+    "video/*", "font/woff", "font/woff2", "application/font-woff",
+    "application/gzip", "application/x-gzip", "application/zip",
+    "application/x-bzip2", "application/x-7z-compressed",
+    "application/x-rar-compressed",)
+
+# The maximum number of bytes of compressed content that the process keeps in
+# body_cache.
+BODY_CACHE_BYTES = 8388608
+
+# The maximum length of the content that is compressed through body_cache, so
+# that a few large bodies don't evict all of the others.
+BODY_CACHE_MAX_LENGTH = 262144
+
+# The compressed content of the bodies compressed by this process, by the
+# compression level and the hash of the content. The evictions are counted in
+# the "gzip_page.body_cache" stats.
+body_cache = datastructures.LRUCache(
+    max_bytes=BODY_CACHE_BYTES,
+    stats=daydreamer_stats.get_stats("gzip_page.body_cache"))
+
+
+def compress(content, level=LEVEL):
+    """
+    Returns the content compressed in the gzip format at the compression
+    level, like django.utils.text.compress_string() does.
+    
+    """
+    buffer = io.BytesIO()
+    with gzip.GzipFile(
+            mode="wb", compresslevel=level, fileobj=buffer) as zfile:
+        zfile.write(content)
+    return buffer.getvalue()
+
+
+def compress_sequence(sequence, flush_size=FLUSH_SIZE, level=LEVEL,
+        stats=None):
+    """
+    Yields the chunks of content of the sequence compressed in the gzip
+    format, as a single stream.
+    
+    Unlike django.utils.text.compress_sequence(), which flushes the stream
+    after every chunk, the stream is only flushed once flush_size bytes of
+    content have been compressed since the last flush, so small chunks
+    compress about as well as the whole content would, while at most about
+    flush_size bytes are held back. A falsy flush_size flushes the stream
+    after every chunk.
+    
+    When stats is given, it should be a daydreamer.core.stats.Stats instance,
+    which gets the lengths of the content and of the compressed content
+    added to its "bytes_in" and "bytes_out" counters and the time spent
+    compressing observed as "compress", once the stream is finished.
+    
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    pending = 0
+    length = 0
+    compressed_length = 0
+    elapsed = 0
+    for chunk in sequence:
+        if not chunk:
+            continue
+        started = time.time()
+        compressed = compressor.compress(chunk)
+        pending += len(chunk)
+        if not flush_size or pending >= flush_size:
+            compressed += compressor.flush(zlib.Z_SYNC_FLUSH)
+            pending = 0
+        elapsed += time.time() - started
+        length += len(chunk)
+        compressed_length += len(compressed)
+        if compressed:
+            yield compressed
+    compressed = compressor.flush()
+    if stats is not None:
+        stats.incr("bytes_in", length)
+        stats.incr("bytes_out", compressed_length + len(compressed))
+        stats.observe("compress", elapsed)
+    yield compressed
+
+
+def decompress(content):
+    """
+    Returns the content decompressed from the gzip format.
+    
+    """
+    with gzip.GzipFile(mode="rb", fileobj=io.BytesIO(content)) as zfile:
+        return zfile.read()
+
+
+def get_level(length, levels=LEVELS, pressure=0):
+    """
+    Returns the compression level for content of the given length, which is
+    the level of the last of the levels whose minimum length the length
+    reaches, or LEVEL when there is none.
+    
+    The pressure, such as the one returned by get_pressure(), lowers the
+    level proportionally, down to 1 at a pressure of 1, trading compression
+    for CPU time when the CPU is busy.
+    
+    """
+    level = LEVEL
+    for min_length, length_level in levels:
+        if length < min_length:
+            break
+        level = length_level
+    if pressure > 0:
+        level -= int(round((level - 1) * min(pressure, 1)))
+    return max(level, 1)
+
+
+def get_pressure():
+    """
+    Returns the CPU pressure as the 1-minute load average per CPU, capped at
+    1, or 0 when the load average is not available.
+    
+    """
+    try:
+        load = os.getloadavg()[0]
+        cpus = multiprocessing.cpu_count()
+    except (AttributeError, NotImplementedError, OSError):
+        return 0
+    return min(float(load) / cpus, 1)
+
+
+def is_compressed_type(content_type, types=COMPRESSED_TYPES):
+    """
+    Returns True when the content type, ignoring its parameters, matches any
+    of the fnmatch-style patterns of the types.
+    
+    """
+    content_type = content_type.split(";")[0].strip().lower()
+    return any(
+        fnmatch.fnmatchcase(content_type, pattern)
+        for pattern in types)
+
+
+def accepts_gzip(request, response):
+    """
+    Returns True when django.middleware.gzip.GZipMiddleware would gzip the
+    response to the request, ignoring the length of its content.
+    
+    """
+    if response.has_header("Content-Encoding"):
+        return False
+    if "msie" in request.META.get("HTTP_USER_AGENT", "").lower():
+        content_type = response.get("Content-Type", "").lower()
+        if (not content_type.startswith("text/") or
+            "javascript" in content_type):
+            return False
+    return bool(
+        gzip_middleware.re_accepts_gzip.search(
+            request.META.get("HTTP_ACCEPT_ENCODING", "")))
+
+
+def encode_response(response, compressed):
+    """
+    Replaces the response's content with its gzipped content and sets the
+    headers like django.middleware.gzip.GZipMiddleware does.
+    
+    """
+    cache_utils.patch_vary_headers(response, ("Accept-Encoding",))
+    response.content = compressed
+    response["Content-Length"] = str(len(compressed))
+    if response.has_header("ETag"):
+        response["ETag"] = re.sub('"$', ';gzip"', response["ETag"])
+    response["Content-Encoding"] = "gzip"
+
+
+def compress_body(content, level=LEVEL, cache=body_cache, stats=None):
+    """
+    Returns the content compressed in the gzip format at the compression
+    level, reusing the compressed content of identical content from the
+    cache, which is the process-wide body_cache by default. Content longer
+    than BODY_CACHE_MAX_LENGTH and content compressed without a cache are
+    always compressed.
+    
+    When stats is given, it should be a daydreamer.core.stats.Stats instance,
+    which counts the "body_hits" and "body_misses" of the cache and observes
+    the time spent compressing as "compress".
+    
+    """
+    key = None
+    if cache is not None and len(content) <= BODY_CACHE_MAX_LENGTH:
+        key = (level, hashlib.sha1(content).hexdigest(),)
+        compressed = cache.get(key)
+        if stats is not None:
+            stats.incr("body_misses" if compressed is None else "body_hits")
+        if compressed is not None:
+            return compressed
+    started = time.time()
+    compressed = compress(content, level=level)
+    if stats is not None:
+        stats.observe("compress", time.time() - started)
+    if key is not None:
+        cache.set(key, compressed)
+    return compressed
+
+
+def gzip_response(request, response, flush_size=FLUSH_SIZE,
+        min_length=MIN_LENGTH, types=COMPRESSED_TYPES, levels=LEVELS,
+        pressure=0, body_cache=None, stats=None):
+    """
+    Gzips the response to the request like
+    django.middleware.gzip.GZipMiddleware does, and returns it. Streaming
+    content is compressed chunk by chunk with compress_sequence(), without
+    ever holding all of it in memory.
+    
+    Content shorter than min_length and content of the types that are
+    already compressed is left alone. The compression level is picked from
+    the levels by the content's length, or by the flush_size for streaming
+    content, and lowered by the pressure. See get_level(). Content that
+    isn't streaming is compressed through the body_cache, when it is given.
+    See compress_body().
+    
+    When stats is given, it should be a daydreamer.core.stats.Stats instance,
+    which counts the "compressed" responses and the responses that are
+    "skipped_length", "skipped_type", "skipped_encoding" when the client
+    doesn't accept gzip, and "skipped_ratio" when gzipping doesn't make the
+    content shorter. It also gets the "bytes_in" and "bytes_out" of the
+    compressed content, counts the "body_hits" and "body_misses" of the
+    body_cache, and observes the time spent compressing as "compress".
+    
+    """
+    def count(name):
+        if stats is not None:
+            stats.incr(name)
+    
+    if not response.streaming and len(response.content) < min_length:
+        count("skipped_length")
+        return response
+    if is_compressed_type(response.get("Content-Type", ""), types=types):
+        count("skipped_type")
+        return response
+    cache_utils.patch_vary_headers(response, ("Accept-Encoding",))
+    if not accepts_gzip(request, response):
+        count("skipped_encoding")
+        return response
+    if response.streaming:
+        # The compressed length is unknown until all of it has been sent.
+        response.streaming_content = compress_sequence(
+            response.streaming_content, flush_size=flush_size,
+            level=get_level(flush_size, levels=levels, pressure=pressure),
+            stats=stats)
+        del response["Content-Length"]
+        if response.has_header("ETag"):
+            response["ETag"] = re.sub('"$', ';gzip"', response["ETag"])
+        response["Content-Encoding"] = "gzip"
+    else:
+        content = response.content
+        compressed = compress_body(
+            content,
+            level=get_level(len(content), levels=levels, pressure=pressure),
+            cache=body_cache, stats=stats)
+        if len(compressed) >= len(content):
+            count("skipped_ratio")
+            return response
+        if stats is not None:
+            stats.incr("bytes_in", len(content))
+            stats.incr("bytes_out", len(compressed))
+        encode_response(response, compressed)
+    count("compressed")
+    return response
@@ -0,0 +1,132 @@
+from __future__ import unicode_literals
+
+import collections
+import threading
+import time
+
+
+__all__ = ("LRUCache",)
+
+
+class LRUCache(object):
+    """
+    A thread-safe, in-process least recently used cache with optional
+    expiration times.
+    
+    When the cache holds more than size entries, the least recently used
+    entries are discarded. A falsy size allows the cache to grow without
+    bound. The timeout is the default number of seconds that an entry
+    remains valid. A timeout of None keeps entries until they are discarded.
+    
+    The values are shared by all of the threads that use the cache, so
+    callers should store immutable values, such as pickled strings.
+    
+    When max_bytes is given, the values must be strings, and the least
+    recently used entries are also discarded when the total length of the
+    values exceeds max_bytes. Values longer than max_bytes are not stored.
+    
+    When stats is given, it should be a daydreamer.core.stats.Stats instance,
+    which counts the "evictions" of the least recently used entries, their
+    "evicted_bytes" when max_bytes is given, and the "rejections" of values
+    longer than max_bytes.
+    
+    """
+    def __init__(self, size=None, timeout=None, max_bytes=None, stats=None):
+        self.size = size
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.stats = stats
+        self.bytes = 0
+        self.entries = collections.OrderedDict()
+        self.lock = threading.RLock()
+    
+    def __len__(self):
+        with self.lock:
+            return len(self.entries)
+    
+    def __contains__(self, key):
+        return self.get(key) is not None
+    
+    def weigh(self, value):
+        """
+        Returns the number of bytes that the value counts against max_bytes,
+        which is 0 when max_bytes is not given.
+        
+        """
+        return len(value) if self.max_bytes else 0
+    
+    def count(self, name, amount=1):
+        """
+        Adds the amount to the named counter of the stats, if any.
+        
+        """
+        if self.stats is not None:
+            self.stats.incr(name, amount)
+    
+    def get(self, key, default=None):
+        """
+        Returns the value stored under the key, or the default when the key
+        is missing or its entry has expired. Marks the entry as the most
+        recently used.
+        
+        """
+        with self.lock:
+            try:
+                expires, value = self.entries.pop(key)
+            except KeyError:
+                return default
+            if expires is not None and expires <= time.time():
+                self.bytes -= self.weigh(value)
+                return default
+            self.entries[key] = (expires, value,)
+            return value
+    
+    def set(self, key, value, timeout=None):
+        """
+        Stores the value under the key as the most recently used entry,
+        discarding the least recently used entries when the cache is full.
+        
+        The timeout overrides the cache's default timeout when it is not None.
+        
+        """
+        timeout = self.timeout if timeout is None else timeout
+        weight = self.weigh(value)
+        with self.lock:
+            self.delete(key)
+            if self.max_bytes and weight > self.max_bytes:
+                self.count("rejections")
+                return
+            self.entries[key] = (
+                time.time() + timeout
+                    if timeout is not None
+                    else None,
+                value,)
+            self.bytes += weight
+            while (
+                (self.size and len(self.entries) > self.size) or
+                (self.max_bytes and self.bytes > self.max_bytes)):
+                _, (_, evicted) = self.entries.popitem(last=False)
+                evicted_weight = self.weigh(evicted)
+                self.bytes -= evicted_weight
+                self.count("evictions")
+                if evicted_weight:
+                    self.count("evicted_bytes", evicted_weight)
+    
+    def delete(self, key):
+        """
+        Discards the entry stored under the key, if any.
+        
+        """
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is not None:
+                self.bytes -= self.weigh(entry[1])
+    
+    def clear(self):
+        """
+        Discards all of the entries.
+        
+        """
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
@@ -0,0 +1,82 @@
+from __future__ import unicode_literals
+
+import hashlib
+
+from . import datastructures, tags
+
+
+__all__ = ("get_generations", "get_etag",)
+
+
+# The maximum number of tag generations to keep in the process' memory.
+LOCAL_SIZE = 10000
+
+# The default number of seconds that a tag generation is kept in the
+# process' memory, which bounds how long another process' invalidation of
+# the tag can go unnoticed.
+LOCAL_TIMEOUT = 1
+
+# The tag generations read by this process, by tag.
+local = datastructures.LRUCache(size=LOCAL_SIZE, timeout=LOCAL_TIMEOUT)
+
+
+def get_generations(items, cache=None, local_timeout=LOCAL_TIMEOUT):
+    """
+    Returns a dictionary mapping the tags for the items to their current
+    generations, like daydreamer.core.tags.get_generations() does, but reads
+    the generations that the process has read within the last local_timeout
+    seconds from its memory instead of from the given cache or cache alias.
+    A falsy local_timeout always reads from the cache.
+    
+    Tags invalidated by the current process are dropped from its memory right
+    away. The memory is keyed by tag only, so each tag's generation should
+    always be read from the same cache.
+    
+    """
+    generations = {}
+    missing = []
+    for tag in tags.get_tags(items):
+        generation = local.get(tag) if local_timeout else None
+        if generation is None:
+            missing.append(tag)
+        else:
+            generations[tag] = generation
+    if missing:
+        fetched = tags.get_generations(missing, cache=cache)
+        if local_timeout:
+            for tag, generation in fetched.items():
+                local.set(tag, generation, local_timeout)
+        generations.update(fetched)
+    return generations
+
+
+def get_etag(items, cache=None, local_timeout=LOCAL_TIMEOUT):
+    """
+    Returns an ETag made from the current generations of the tags for the
+    items, which changes whenever any of the tags is invalidated, or None
+    when there are no tags. See get_generations().
+    
+    """
+    generations = get_generations(
+        items, cache=cache, local_timeout=local_timeout)
+    if not generations:
+        return None
+    return hashlib.md5(
+        " ".join(
+            "{tag:s}:{generation!s}".format(
+                tag=tag, generation=generations[tag])
+            for tag in sorted(generations)).encode("utf-8")).hexdigest()
+
+
+# Signal receiver for dropping invalidated tags from the process' memory.
+def tags_invalidated(sender, **kwargs):
+    """
+    Drops the invalidated tags' generations from the process' memory.
+    
+    """
+    for tag in kwargs["tags"]:
+        local.delete(tag)
+
+
+tags.tags_invalidated.connect(
+    tags_invalidated, dispatch_uid=".".join((__name__, "tags_invalidated",)))
@@ -0,0 +1,64 @@
+from __future__ import unicode_literals
+
+import uuid
+
+from . import versions
+
+
+__all__ = ("acquire", "release", "is_locked",)
+
+
+# The cache key namespace for locks.
+KEY_PREFIX = "daydreamer.core.locks"
+
+
+def get_lock_key(name):
+    """
+    Returns the cache key of the lock with the given name.
+    
+    """
+    return ".".join((KEY_PREFIX, name,))
+
+
+def acquire(name, timeout, cache=None):
+    """
+    Tries to acquire the lock with the given name in the given cache or cache
+    alias without blocking. Returns a token to pass to release() when the
+    lock was acquired, or None when it is held by someone else.
+    
+    The lock is shared by all of the processes using the cache, because it is
+    acquired with the cache's atomic add(). It expires after timeout seconds,
+    so that a holder that dies can't keep it forever.
+    
+    """
+    token = uuid.uuid4().hex
+    return (
+        token
+            if versions.get_cache(cache).add(
+                get_lock_key(name), token, timeout)
+            else None)
+
+
+def release(name, token, cache=None):
+    """
+    Releases the lock with the given name in the given cache or cache alias
+    when it is still held with the token returned by acquire().
+    
+    A lock that has expired and has been acquired by someone else is left
+    alone. The check and the release are not atomic, so the lock's timeout
+    should comfortably exceed the time it is held for.
+    
+    """
+    cache = versions.get_cache(cache)
+    key = get_lock_key(name)
+    if cache.get(key) == token:
+        cache.delete(key)
+
+
+def is_locked(name, cache=None):
+    """
+    Returns True when the lock with the given name is held in the given cache
+    or cache alias.
+    
+    """
+    return versions.get_cache(cache).get(get_lock_key(name)) is not None
@@ -0,0 +1,222 @@
+from __future__ import unicode_literals
+
+import collections
+import os
+import socket
+import threading
+import time
+
+from django.conf import settings
+
+from . import versions
+
+
+__all__ = (
+    "Stats", "get_stats", "get_view_stats", "get_all_stats",
+    "get_stats_cache", "publish", "publish_due", "collect",)
+
+
+# The cache key namespace for published stats.
+KEY_PREFIX = "daydreamer.core.stats"
+
+# The number of seconds between publications of a process' stats by
+# publish_due().
+PUBLISH_INTERVAL = 10
+
+# The number of seconds that published stats are kept, so that the stats of
+# processes that have stopped drop out of collect().
+PUBLISH_TIMEOUT = 300
+
+
+class Stats(object):
+    """
+    A thread-safe set of named counters for the current process.
+    
+    """
+    def __init__(self):
+        self.counters = collections.defaultdict(int)
+        self.lock = threading.Lock()
+    
+    def incr(self, name, amount=1):
+        """
+        Adds the amount to the named counter.
+        
+        """
+        with self.lock:
+            self.counters[name] += amount
+    
+    def observe(self, name, value):
+        """
+        Records a measurement, such as a duration in seconds, by adding 1 to
+        the counter named "<name>_count" and the value to the counter named
+        "<name>_total".
+        
+        """
+        with self.lock:
+            self.counters["_".join((name, "count",))] += 1
+            self.counters["_".join((name, "total",))] += value
+    
+    def get(self, name):
+        """
+        Returns the value of the named counter, which is 0 when it has never
+        been incremented.
+        
+        """
+        with self.lock:
+            return self.counters.get(name, 0)
+    
+    def snapshot(self):
+        """
+        Returns a dictionary mapping the names of the counters to their
+        current values.
+        
+        """
+        with self.lock:
+            return dict(self.counters)
+    
+    def ratio(self, name, *others):
+        """
+        Returns the value of the named counter as a fraction of the sum of its
+        value and the values of the other named counters, or None when the
+        sum is 0. For example, ratio("hits", "misses") is the hit rate.
+        
+        """
+        with self.lock:
+            value = self.counters.get(name, 0)
+            total = value + sum(
+                self.counters.get(other, 0)
+                for other in others)
+        return float(value) / total if total else None
+    
+    def reset(self):
+        """
+        Resets all of the counters to 0.
+        
+        """
+        with self.lock:
+            self.counters.clear()
+
+
+# The process-wide stats, by name.
+registry = {}
+registry_lock = threading.Lock()
+
+
+def get_stats(name):
+    """
+    Returns the process-wide Stats instance with the given name, creating it
+    when it doesn't exist.
+    
+    """
+    with registry_lock:
+        try:
+            return registry[name]
+        except KeyError:
+            return registry.setdefault(name, Stats())
+
+
+def get_view_stats(prefix, view_class):
+    """
+    Returns the process-wide Stats instance for a view class, which is named
+    by the prefix and the class' import path.
+    
+    """
+    return get_stats(".".join(
+        (prefix, view_class.__module__, view_class.__name__,)))
+
+
+def get_all_stats():
+    """
+    Returns a dictionary mapping the names of the process-wide Stats
+    instances to snapshots of their counters.
+    
+    """
+    with registry_lock:
+        items = list(registry.items())
+    return dict((name, stats.snapshot(),) for name, stats in items)
+
+
+def get_process_key():
+    """
+    Returns the cache key of the current process' published stats.
+    
+    """
+    return ".".join((
+        KEY_PREFIX, "process", socket.gethostname(),
+        "{pid:d}".format(pid=os.getpid()),))
+
+
+def get_index_key():
+    """
+    Returns the cache key of the set of keys of the published stats.
+    
+    """
+    return ".".join((KEY_PREFIX, "index",))
+
+
+def get_stats_cache(cache=None):
+    """
+    Returns the given cache or cache alias, which defaults to the alias named
+    by settings.DAYDREAMER_STATS_CACHE, or to the default cache when it is
+    not set.
+    
+    """
+    return versions.get_cache(
+        cache or getattr(settings, "DAYDREAMER_STATS_CACHE", None))
+
+
+def publish(cache=None):
+    """
+    Stores the current process' stats in the given cache or cache alias, so
+    that collect() can aggregate the stats of all of the processes sharing
+    the cache. The cache defaults to get_stats_cache().
+    
+    """
+    cache = get_stats_cache(cache)
+    key = get_process_key()
+    cache.set(key, get_all_stats(), PUBLISH_TIMEOUT)
+    index = cache.get(get_index_key()) or frozenset()
+    if key not in index:
+        # Concurrent updates may drop a key, which is added back on the next
+        # publication.
+        cache.set(get_index_key(), index | frozenset((key,)), None)
+
+
+# The time of the current process' last publication.
+published = {"time": 0}
+
+
+def publish_due(cache=None):
+    """
+    Publishes the current process' stats when they haven't been published
+    for PUBLISH_INTERVAL seconds.
+    
+    """
+    now = time.time()
+    with registry_lock:
+        if now - published["time"] < PUBLISH_INTERVAL:
+            return
+        published["time"] = now
+    publish(cache=cache)
+
+
+def collect(cache=None):
+    """
+    Returns a dictionary mapping the names of the stats published in the
+    given cache or cache alias to dictionaries of their counters, summed
+    over all of the processes that have published within PUBLISH_TIMEOUT
+    seconds. The cache defaults to get_stats_cache().
+    
+    """
+    cache = get_stats_cache(cache)
+    index = cache.get(get_index_key()) or frozenset()
+    published_stats = cache.get_many(tuple(index)) if index else {}
+    if len(published_stats) < len(index):
+        # Forget the processes whose stats have expired.
+        cache.set(get_index_key(), frozenset(published_stats), None)
+    totals = collections.defaultdict(lambda: collections.defaultdict(int))
+    for snapshot in published_stats.values():
+        for name, counters in snapshot.items():
+            for counter, value in counters.items():
+                totals[name][counter] += value
+    return dict((name, dict(counters),) for name, counters in totals.items())
@@ -0,0 +1,179 @@
+from __future__ import unicode_literals
+
+import io
+import logging
+import threading
+
+from django.conf import settings
+from django.utils import module_loading
+
+from . import tags
+
+
+__all__ = (
+    "patch_surrogate_control", "patch_surrogate_keys",
+    "BasePurgeClient", "LoggingPurgeClient", "MemoryPurgeClient",
+    "FilePurgeClient",
+    "get_purge_client", "purge", "connect",)
+
+
+# The import path of the purge client class used when
+# settings.DAYDREAMER_PURGE_CLIENT is not set.
+DEFAULT_PURGE_CLIENT = "daydreamer.core.surrogates.LoggingPurgeClient"
+
+
+def patch_surrogate_control(response, **kwargs):
+    """
+    Adds directives to the response's Surrogate-Control header, like
+    django.utils.cache.patch_cache_control() does for the Cache-Control
+    header. Underscores in the keyword names are replaced with dashes, True
+    values add bare directives and None values are ignored.
+    
+    """
+    directives = []
+    values = {}
+    for directive in response.get("Surrogate-Control", "").split(","):
+        name, _, value = directive.partition("=")
+        name = name.strip().lower()
+        if name:
+            directives.append(name)
+            values[name] = value.strip() or True
+    for name, value in sorted(kwargs.items()):
+        name = name.replace("_", "-")
+        if value is None:
+            continue
+        if name not in values:
+            directives.append(name)
+        values[name] = value
+    response["Surrogate-Control"] = ", ".join(
+        name
+            if values[name] is True
+            else "{name:s}={value!s}".format(name=name, value=values[name])
+        for name in directives)
+
+
+def patch_surrogate_keys(response, items, header="Surrogate-Key"):
+    """
+    Adds the tags for the items to the space-separated keys in the response's
+    header, which is Surrogate-Key by default. See
+    daydreamer.core.tags.get_tag() for how the items are turned into keys.
+    
+    """
+    keys = response.get(header, "").split()
+    keys.extend(sorted(tags.get_tags(items) - frozenset(keys)))
+    if keys:
+        response[header] = " ".join(keys)
+
+
+class BasePurgeClient(object):
+    """
+    The interface of the clients that purge content from a CDN or another
+    surrogate cache by its surrogate keys.
+    
+    """
+    def purge_keys(self, keys):
+        """
+        Purges everything tagged with any of the surrogate keys.
+        
+        """
+        raise NotImplementedError
+
+
+class LoggingPurgeClient(BasePurgeClient):
+    """
+    A purge client that logs the purged keys to the
+    "daydreamer.core.surrogates" logger instead of purging anything, and
+    keeps no state. It is the default client, so that a project without a
+    configured client notices that nothing is purged.
+    
+    """
+    logger = logging.getLogger("daydreamer.core.surrogates")
+    
+    def purge_keys(self, keys):
+        self.logger.warning(
+            "Not purging the surrogate keys %s, because "
+            "settings.DAYDREAMER_PURGE_CLIENT is not set.",
+            " ".join(sorted(keys)))
+
+
+class MemoryPurgeClient(BasePurgeClient):
+    """
+    A purge client that records the purged keys in its purged list instead
+    of purging anything, for tests. The list is never trimmed.
+    
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.purged = []
+    
+    def purge_keys(self, keys):
+        with self.lock:
+            self.purged.extend(sorted(keys))
+
+
+class FilePurgeClient(BasePurgeClient):
+    """
+    A purge client that appends the purged keys to the file named by
+    settings.DAYDREAMER_PURGE_FILE, one per line, instead of purging
+    anything. Another process may tail the file to purge them.
+    
+    """
+    def __init__(self, path=None):
+        self.lock = threading.Lock()
+        self.path = path or settings.DAYDREAMER_PURGE_FILE
+    
+    def purge_keys(self, keys):
+        with self.lock:
+            with io.open(self.path, "a", encoding="utf-8") as purged:
+                for key in sorted(keys):
+                    purged.write(key + "\n")
+
+
+# The purge clients of this process, by import path.
+clients = {}
+clients_lock = threading.Lock()
+
+
+def get_purge_client(path=None):
+    """
+    Returns the purge client instance for the import path, which defaults to
+    settings.DAYDREAMER_PURGE_CLIENT. Clients are created once per process.
+    
+    """
+    path = path or getattr(
+        settings, "DAYDREAMER_PURGE_CLIENT", DEFAULT_PURGE_CLIENT)
+    with clients_lock:
+        if path not in clients:
+            clients[path] = module_loading.import_by_path(path)()
+        return clients[path]
+
+
+def purge(items, client=None):
+    """
+    Purges everything tagged with the surrogate keys for the items, using
+    the purge client for the given import path.
+    
+    """
+    keys = tags.get_tags(items)
+    if keys:
+        get_purge_client(client).purge_keys(keys)
+
+
+# Signal receiver for purging invalidated tags.
+def tags_purged(sender, **kwargs):
+    """
+    Purges the invalidated tags from the surrogate caches.
+    
+    """
+    purge(kwargs["tags"])
+
+
+def connect():
+    """
+    Purges the surrogate keys of the tags whenever they are invalidated with
+    daydreamer.core.tags.invalidate(), so that the surrogate caches drop
+    what the cache framework drops.
+    
+    """
+    tags.tags_invalidated.connect(
+        tags_purged, dispatch_uid=".".join((__name__, "tags_purged",)))
@@ -0,0 +1,120 @@
+from __future__ import unicode_literals
+
+from django import dispatch
+from django.db.models import signals
+from django.utils import encoding, six
+
+from . import versions
+
+
+__all__ = (
+    "get_tag", "get_tags", "get_generations", "invalidate", "connect",
+    "disconnect", "tags_invalidated",)
+
+
+# The cache key namespace for tag generations.
+KEY_PREFIX = "daydreamer.core.tags"
+
+# Sent after tags have been invalidated, with the tags as a frozenset.
+tags_invalidated = dispatch.Signal(providing_args=("tags",))
+
+
+def get_tag(item):
+    """
+    Returns the tag for an item, which may be a tag string, a model instance
+    or a model class. Instances are tagged by their model and primary key,
+    e.g. "auth.user.1", and model classes by their model, e.g. "auth.user".
+    
+    """
+    if isinstance(item, six.string_types):
+        return item
+    opts = item._meta
+    tag = ".".join((opts.app_label, opts.model_name,))
+    return (
+        tag
+            if isinstance(item, type)
+            else ".".join((tag, encoding.force_text(item.pk),)))
+
+
+def get_tags(items):
+    """
+    Returns the frozenset of tags for the items. See get_tag().
+    
+    """
+    return frozenset(get_tag(item) for item in items or ())
+
+
+def get_tag_key(tag):
+    """
+    Returns the key of the generation counter for the tag.
+    
+    """
+    return ".".join((KEY_PREFIX, "generation", tag,))
+
+
+def get_generations(tags, cache=None):
+    """
+    Returns a dictionary mapping each of the tags to its current generation
+    in the given cache or cache alias, using a single round trip to the
+    cache when all of the generations are present.
+    
+    Something that is tagged should store the generations of its tags and be
+    discarded when any of them has changed.
+    
+    """
+    tags = tuple(tags)
+    generations = versions.get_versions(
+        (get_tag_key(tag) for tag in tags), cache=cache)
+    return dict((tag, generations[get_tag_key(tag)],) for tag in tags)
+
+
+def invalidate(items, cache=None):
+    """
+    Invalidates everything tagged with the tags for the items by bumping
+    their generations in the given cache or cache alias. The cost doesn't
+    depend on the number of things that are tagged.
+    
+    """
+    tags = get_tags(items)
+    versions.bump_versions(
+        (get_tag_key(tag) for tag in tags), cache=cache)
+    tags_invalidated.send(sender=None, tags=tags)
+
+
+# Signal receivers for invalidating the tags of changed model instances.
+def instance_changed(sender, instance, **kwargs):
+    """
+    Invalidates the tags of a saved or deleted model instance and its model.
+    
+    """
+    invalidate((instance, sender,))
+
+
+def connect(model):
+    """
+    Invalidates the tags of the model's instances and of the model whenever
+    an instance is saved or deleted.
+    
+    """
+    for signal, action in (
+            (signals.post_save, "saved",),
+            (signals.post_delete, "deleted",),):
+        signal.connect(
+            instance_changed, sender=model,
+            dispatch_uid=".".join((
+                KEY_PREFIX, get_tag(model), action,)))
+
+
+def disconnect(model):
+    """
+    Stops invalidating the tags of the model's instances and of the model,
+    undoing connect().
+    
+    """
+    for signal, action in (
+            (signals.post_save, "saved",),
+            (signals.post_delete, "deleted",),):
+        signal.disconnect(
+            instance_changed, sender=model,
+            dispatch_uid=".".join((
+                KEY_PREFIX, get_tag(model), action,)))
@@ -1,11 +1,12 @@
 from __future__ import unicode_literals
 
+import fnmatch
 import urlparse
 
 from django.contrib.sites.models import Site
 from django.core import urlresolvers
 from django.http import request
-from django.utils import encoding
+from django.utils import encoding, http
 from django.utils.functional import lazy
 
 from . import lang
@@ -13,7 +14,7 @@ from . import lang
 
 __all__ = (
     "NoReverseMatch", "resolve", "reverse", "reverse_lazy",
-    "simplify_redirect", "update_query",)
+    "simplify_redirect", "update_query", "normalize_query",)
 
 
 NoReverseMatch = urlresolvers.NoReverseMatch
@@ -135,3 +136,23 @@ def update_query(url, data):
             request.QueryDict(parts.query, mutable=True),
             data or {}).urlencode(safe="/"),) +
         parts[5:])
+
+
+def normalize_query(query, ignore=()):
+    """
+    Returns a canonical version of a query string, so that query strings that
+    differ only in the order or the encoding of their parameters are equal.
+    
+    Parameters whose names match any of the fnmatch-style patterns in ignore,
+    such as "utm_*", are dropped. The remaining parameters are sorted by name
+    and value, keeping blank values, and are encoded consistently.
+    
+    """
+    data = request.QueryDict(encoding.force_str(query))
+    return http.urlencode(sorted(
+        (name, value,)
+        for name, values in data.lists()
+        if not any(
+            fnmatch.fnmatchcase(name, pattern)
+            for pattern in ignore)
+        for value in values))
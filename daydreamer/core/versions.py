@@ -0,0 +1,100 @@
+from __future__ import unicode_literals
+
+import time
+
+from django.core import cache as caches
+
+
+__all__ = (
+    "get_cache", "get_version", "get_versions", "bump_version",
+    "bump_versions",)
+
+
+def get_cache(cache=None):
+    """
+    Returns the cache for the given cache alias, falling back to the default
+    cache when the alias is falsy. Cache objects are passed through unchanged.
+    
+    """
+    return (
+        cache
+            if hasattr(cache, "get_many")
+            else caches.get_cache(cache)
+                if cache
+                else caches.cache)
+
+
+def initial_version():
+    """
+    Returns a value to seed a missing version counter with.
+    
+    The value is derived from the current time, so that a counter which has
+    been evicted from the cache will not be reset to a value that was handed
+    out before the eviction.
+    
+    """
+    return int(time.time() * 1000)
+
+
+def get_version(key, cache=None):
+    """
+    Returns the current value of the version counter stored under the key
+    in the given cache or cache alias, seeding the counter when it is missing.
+    
+    Version counters are stored without an expiration time.
+    
+    """
+    cache = get_cache(cache)
+    version = cache.get(key)
+    if version is None:
+        version = initial_version()
+        if not cache.add(key, version, None):
+            # Another process seeded the counter first.
+            version = cache.get(key, version)
+    return version
+
+
+def get_versions(keys, cache=None):
+    """
+    Returns a dictionary mapping each of the keys to the current value of its
+    version counter in the given cache or cache alias, seeding any missing
+    counters. Uses a single round trip to the cache when all of the counters
+    are present.
+    
+    """
+    cache = get_cache(cache)
+    keys = tuple(keys)
+    versions = cache.get_many(keys) if keys else {}
+    for key in keys:
+        if key not in versions:
+            versions[key] = get_version(key, cache=cache)
+    return versions
+
+
+def bump_version(key, cache=None):
+    """
+    Increments the version counter stored under the key in the given cache
+    or cache alias, invalidating everything that was keyed by its previous
+    value. Returns the new version.
+    
+    """
+    cache = get_cache(cache)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # The counter is missing, so seed it with a fresh value.
+        version = initial_version()
+        cache.set(key, version, None)
+        return version
+
+
+def bump_versions(keys, cache=None):
+    """
+    Increments each of the version counters stored under the keys. Returns a
+    dictionary mapping the keys to their new versions.
+    
+    """
+    cache = get_cache(cache)
+    return dict(
+        (key, bump_version(key, cache=cache))
+        for key in keys)
@@ -0,0 +1,81 @@
+from __future__ import unicode_literals
+
+import logging
+import threading
+
+from django.db import connections
+from django.utils.six.moves import queue
+
+
+__all__ = ("Worker", "worker",)
+
+
+class Worker(object):
+    """
+    A background worker that runs jobs one at a time in a single daemon
+    thread, which is started on demand.
+    
+    Each job is submitted with a key. While a job with the same key is
+    pending, further submissions with the key are ignored, so that a burst
+    of identical requests for work results in a single job.
+    
+    Database connections opened by a job are closed after it runs, because
+    the worker's thread is not managed by Django's request cycle.
+    
+    """
+    logger = logging.getLogger("daydreamer.core.workers")
+    
+    def __init__(self, name="daydreamer-worker"):
+        self.name = name
+        self.jobs = queue.Queue()
+        self.pending = set()
+        self.lock = threading.Lock()
+        self.thread = None
+    
+    def submit(self, key, function, *args, **kwargs):
+        """
+        Schedules a call to the function with the arguments and keyword
+        arguments unless a job with the same key is pending. Returns True
+        when the job was scheduled.
+        
+        """
+        with self.lock:
+            if key in self.pending:
+                return False
+            self.pending.add(key)
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name=self.name)
+                self.thread.daemon = True
+                self.thread.start()
+        self.jobs.put((key, function, args, kwargs,))
+        return True
+    
+    def run(self):
+        """
+        Runs the submitted jobs forever.
+        
+        """
+        while True:
+            key, function, args, kwargs = self.jobs.get()
+            try:
+                function(*args, **kwargs)
+            except Exception:
+                self.logger.exception(
+                    "Background job {key!r} failed.".format(key=key))
+            finally:
+                for connection in connections.all():
+                    connection.close()
+                with self.lock:
+                    self.pending.discard(key)
+                self.jobs.task_done()
+    
+    def join(self):
+        """
+        Blocks until all of the submitted jobs have run.
+        
+        """
+        self.jobs.join()
+
+
+# The shared worker.
+worker = Worker()
@@ -0,0 +1,35 @@
+from __future__ import unicode_literals
+
+import json
+import optparse
+
+from django.core.management import base
+
+from daydreamer.core import stats
+
+
+class Command(base.BaseCommand):
+    help = (
+        "Prints the stats published by the processes sharing the cache, "
+        "such as the stats of the CachePage and Condition views, as JSON.")
+    option_list = base.BaseCommand.option_list + (
+        optparse.make_option(
+            "--cache", default=None,
+            help=(
+                "The alias of the cache that the stats are published in, "
+                "which defaults to settings.DAYDREAMER_STATS_CACHE.")),
+        optparse.make_option(
+            "--prefix", default="",
+            help=(
+                'Only print the stats whose names start with the prefix, '
+                'e.g. "cache_page."')),)
+    
+    def handle(self, *args, **options):
+        prefix = options["prefix"]
+        self.stdout.write(json.dumps(
+            dict(
+                (name, counters,)
+                for name, counters in stats.collect(
+                    cache=options["cache"]).items()
+                if name.startswith(prefix)),
+            indent=4, sort_keys=True))
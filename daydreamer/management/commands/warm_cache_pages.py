@@ -0,0 +1,193 @@
+from __future__ import unicode_literals
+
+import optparse
+import urlparse
+from multiprocessing import pool
+
+from django.conf import settings
+from django.contrib.sites.models import Site
+from django.core import urlresolvers
+from django.core.management import base
+from django.db import connections
+from django.test import client
+from django.utils import module_loading
+
+from daydreamer.core import handlers
+from daydreamer.views.behaviors import cache
+
+
+def is_cache_page(view):
+    """
+    Returns True when the view function was created from a CachePage view
+    class with daydreamer.views.core.Core.as_view().
+    
+    """
+    view_class = getattr(view, "view_class", None)
+    return (
+        isinstance(view_class, type) and
+        issubclass(view_class, cache.CachePage))
+
+
+def get_patterns(resolver, namespaces=()):
+    """
+    Yields a tuple of the view function and the name to reverse its URL with
+    for each URL pattern of the resolver, recursing into included URLconfs.
+    
+    Named patterns are reversed by their namespaced name. Unnamed patterns
+    are reversed by their view function, which only works outside of
+    namespaces.
+    
+    """
+    for pattern in resolver.url_patterns:
+        if isinstance(pattern, urlresolvers.RegexURLResolver):
+            for item in get_patterns(
+                    pattern,
+                    namespaces + (
+                        (pattern.namespace,)
+                            if pattern.namespace
+                            else ())):
+                yield item
+        else:
+            yield (
+                pattern.callback,
+                ":".join(namespaces + (pattern.name,))
+                    if pattern.name
+                    else pattern.callback,)
+
+
+def get_view_paths(resolver):
+    """
+    Yields the paths of the CachePage views in the resolver's URLconf, using
+    the keyword arguments from each view's get_cache_page_warm_kwargs().
+    
+    """
+    for view, name in get_patterns(resolver):
+        if not is_cache_page(view):
+            continue
+        instance = view.view_class(**view.view_initkwargs)
+        for kwargs in instance.get_cache_page_warm_kwargs():
+            try:
+                yield urlresolvers.reverse(name, kwargs=kwargs)
+            except urlresolvers.NoReverseMatch:
+                pass
+
+
+def get_sitemap_paths(sitemaps):
+    """
+    Yields the paths of the locations in the sitemaps that are served by
+    CachePage views. The sitemaps may be a dictionary of sitemaps, like the
+    one passed to django.contrib.sitemaps.views.sitemap(), or a single
+    sitemap. Sitemap classes are instantiated.
+    
+    """
+    if not hasattr(sitemaps, "values"):
+        sitemaps = {None: sitemaps}
+    for sitemap in sitemaps.values():
+        if isinstance(sitemap, type):
+            sitemap = sitemap()
+        for item in sitemap.items():
+            parts = urlparse.urlsplit(sitemap.location(item))
+            try:
+                match = urlresolvers.resolve(parts.path)
+            except urlresolvers.Resolver404:
+                continue
+            if is_cache_page(match.func):
+                yield urlparse.urlunsplit(("", "",) + parts[2:])
+
+
+def get_default_host():
+    """
+    Returns the first host name in settings.ALLOWED_HOSTS that isn't a
+    wildcard, or the current site's domain when the django.contrib.sites app
+    is installed, or None.
+    
+    """
+    for host in settings.ALLOWED_HOSTS:
+        if host != "*" and not host.startswith("."):
+            return host
+    if Site._meta.installed:
+        try:
+            return Site.objects.get_current().domain
+        except Site.DoesNotExist:
+            pass
+    return None
+
+
+class Command(base.BaseCommand):
+    help = (
+        "Fills the cache by requesting the pages of the views that inherit "
+        "from daydreamer.views.behaviors.CachePage.")
+    option_list = base.BaseCommand.option_list + (
+        optparse.make_option(
+            "--host", default=None,
+            help=(
+                "The host name to request the pages for. Defaults to the "
+                "first host name in settings.ALLOWED_HOSTS that isn't a "
+                "wildcard, or to the current site's domain.")),
+        optparse.make_option(
+            "--secure", action="store_true", default=False,
+            help="Request the pages over HTTPS."),
+        optparse.make_option(
+            "--threads", type="int", default=4,
+            help="The number of pages to request at the same time."),
+        optparse.make_option(
+            "--sitemap", default=None,
+            help=(
+                "The import path of a sitemap or a dictionary of sitemaps "
+                "listing more pages to request.")),)
+    
+    def handle(self, *args, **options):
+        self.verbosity = int(options.get("verbosity", 1))
+        self.host = options["host"] or get_default_host()
+        if not self.host:
+            raise base.CommandError(
+                "Pass the host name to request the pages for with --host.")
+        self.secure = options["secure"]
+        self.handler = handlers.base.Handler()
+        self.handler.load_middleware()
+        self.factory = client.RequestFactory()
+        
+        paths = set(get_view_paths(
+            urlresolvers.get_resolver(urlresolvers.get_urlconf())))
+        if options["sitemap"]:
+            paths.update(get_sitemap_paths(
+                module_loading.import_by_path(options["sitemap"])))
+        
+        threads = pool.ThreadPool(max(1, options["threads"]))
+        try:
+            results = list(threads.imap_unordered(self.warm, sorted(paths)))
+        finally:
+            threads.close()
+            threads.join()
+        
+        failed = [
+            (path, status_code,)
+            for path, status_code in results
+            if status_code != 200]
+        if self.verbosity >= 1:
+            self.stdout.write(
+                "Requested {count:d} page(s), {failed:d} of which "
+                "failed.".format(count=len(results), failed=len(failed)))
+        for path, status_code in failed:
+            self.stderr.write("{status_code:d} {path:s}".format(
+                status_code=status_code, path=path))
+    
+    def warm(self, path):
+        """
+        Requests the path through the handler, returning a tuple of the path
+        and the response's status code.
+        
+        """
+        request = self.factory.get(
+            path,
+            HTTP_HOST=self.host,
+            **{"wsgi.url_scheme": "https" if self.secure else "http"})
+        try:
+            status_code = self.handler.get_response(request).status_code
+        finally:
+            for connection in connections.all():
+                connection.close()
+        if self.verbosity >= 2:
+            self.stdout.write("{status_code:d} {path:s}".format(
+                status_code=status_code, path=path))
+        return path, status_code
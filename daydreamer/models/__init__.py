@@ -0,0 +1,10 @@
+from __future__ import unicode_literals
+
+from daydreamer.auth import permissions, users
+
+
+# Connect the signal receivers that keep the cached permission sets and users
+# current. This module is always loaded for installed apps, unlike the
+# modules that define the receivers.
+permissions.connect()
+users.connect()
@@ -0,0 +1,35 @@
+from __future__ import unicode_literals
+
+from daydreamer.auth import backends
+
+
+class ObjectPermissionBackend(backends.ObjectPermissionBackend):
+    """
+    An object permission backend for testing. It grants the "auth.view_group"
+    permission for the groups whose names start with "permitted" and records
+    each batched lookup.
+    
+    """
+    permission = "auth.view_group"
+    prefix = "permitted"
+    batches = []
+    
+    def get_objects_permissions(self, user_obj, objs):
+        """
+        Records the batched lookup.
+        
+        """
+        objs = list(objs)
+        self.batches.append(objs)
+        return super(ObjectPermissionBackend, self).get_objects_permissions(
+            user_obj, objs)
+    
+    def get_all_permissions(self, user_obj, obj=None):
+        """
+        Grants the permission for the permitted groups.
+        
+        """
+        return (
+            set((self.permission,))
+                if getattr(obj, "name", "").startswith(self.prefix)
+                else set())
@@ -1,5 +1,9 @@
 from __future__ import unicode_literals
 
+from django.contrib import auth
+from django.utils import six
+
+from daydreamer.tests.views import generic
 from daydreamer.tests.views.core import behaviors
 
 
@@ -9,3 +13,27 @@ class TestCase(behaviors.TestCase):
     
     """
     pass
+
+
+class UserTestCase(generic.TestCase):
+    """
+    Common utilities for testing authentication view behaviors that don't
+    use the denial framework's common tests.
+    
+    """
+    def create_authenticated_user(self, **attrs):
+        """
+        Creates a user with a unique username and password, sets the specified
+        attributes on the user and logs in. Returns the new, authenticated
+        user.
+        
+        """
+        username, password = self.unique()[:30], self.unique()
+        user = auth.get_user_model().objects.create_user(
+            username, password=password)
+        if attrs:
+            for name, value in six.iteritems(attrs):
+                setattr(user, name, value)
+            user.save()
+        self.client.login(username=username, password=password)
+        return user
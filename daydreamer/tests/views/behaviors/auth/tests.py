@@ -2,12 +2,228 @@ from __future__ import unicode_literals
 
 import unittest
 
+from django import http
+from django.contrib.auth import models as auth_models
+from django.contrib.contenttypes import models as type_models
 from django.core import exceptions
+from django.core.cache import cache
+from django.test.utils import override_settings
+from django.utils import functional, six
 
+from daydreamer.auth import permissions as auth_permissions
+from daydreamer.auth import users as auth_users
+from daydreamer.core import lang
 from daydreamer.views import generic
+from daydreamer.views.core import behaviors as core_behaviors
 from daydreamer.views.behaviors import auth as auth
 
-from . import base
+from . import backends, base
+
+
+class AuthorizationTestCase(base.UserTestCase):
+    """
+    Tests for the prefetch stage of the Authorization view behaviors.
+    
+    """
+    view_classes = (
+        auth.LoginRequired, auth.GroupsRequired, auth.PermissionsRequired,
+        generic.View,)
+    
+    def setUp(self):
+        super(AuthorizationTestCase, self).setUp()
+        self.user = self.create_authenticated_user()
+        self.group = auth_models.Group.objects.create(name=self.unique()[:80])
+        self.user.groups.add(self.group)
+        self.permission = auth_models.Permission.objects.create(
+            content_type=type_models.ContentType.objects.get_for_model(
+                auth_models.Group),
+            codename=self.unique()[:100])
+        self.group.permissions.add(self.permission)
+    
+    def view(self, **attrs):
+        return super(AuthorizationTestCase, self).view(**lang.updated({
+            "groups_required": self.group.name,
+            "permissions_required": ".".join(
+                ("auth", self.permission.codename,))}, attrs))
+    
+    def test_prefetch(self):
+        content = self.unique()
+        self.assertViewBehavior(
+            {"get": content},
+            status_code=200,
+            content=content,
+            request_exact={
+                "auth_group_ids": frozenset((self.group.pk,)),
+                "auth_prefetched": set(("user", "groups", "permissions",))})
+    
+    def test_prefetch_disabled(self):
+        content = self.unique()
+        self.assertViewBehavior(
+            {"get": content, "authorization_prefetch": False},
+            status_code=200,
+            content=content,
+            request_excludes=("auth_prefetched",))
+    
+    def test_prefetch_hooks(self):
+        group_pks = frozenset((self.group.pk,))
+        permissions = (".".join(("auth", self.permission.codename,)),)
+        content = self.unique()
+        self.assertViewBehavior(
+            {
+                "get": content,
+                "groups_required": None,
+                "permissions_required": None,
+                "get_groups_required": lambda self: group_pks,
+                "get_permissions_required": lambda self: permissions},
+            status_code=200,
+            content=content,
+            request_exact={
+                "auth_prefetched": set(("user", "groups", "permissions",))})
+    
+    def test_prefetch_fail(self):
+        self.user.groups.remove(self.group)
+        self.assertViewBehavior(
+            {"get": self.unique(), "groups_required_raise": True},
+            status_code=403)
+    
+    def test_prefetch_unauth(self):
+        self.client.logout()
+        self.assertViewBehavior(
+            {"get": self.unique()},
+            status_code=302,
+            request_excludes=("auth_group_ids",))
+
+
+class AuthorizationUserCacheTestCase(base.UserTestCase):
+    """
+    Tests for the user cache of the Authorization view behaviors.
+    
+    """
+    view_classes = (auth.StaffRequired, generic.View,)
+    
+    def setUp(self):
+        cache.clear()
+        auth_users.local_cache.clear()
+        super(AuthorizationUserCacheTestCase, self).setUp()
+    
+    def tearDown(self):
+        super(AuthorizationUserCacheTestCase, self).tearDown()
+        auth_users.local_cache.clear()
+        cache.clear()
+    
+    def view(self, **attrs):
+        return super(AuthorizationUserCacheTestCase, self).view(
+            **lang.updated({
+                "authorization_user_cache": True,
+                "staff_required_raise": True}, attrs))
+    
+    def test_auth_pass(self):
+        self.create_authenticated_user(is_staff=True)
+        content = self.unique()
+        self.assertViewBehavior(
+            {"get": content},
+            repeat=2,
+            status_code=200,
+            content=content)
+    
+    def test_auth_fail(self):
+        self.create_authenticated_user()
+        self.assertViewBehavior(
+            {"get": self.unique()},
+            repeat=2,
+            status_code=403)
+    
+    def test_unauth_fail(self):
+        self.assertViewBehavior(
+            {"get": self.unique()},
+            status_code=403)
+    
+    def test_auth_fail_invalidated(self):
+        user = self.create_authenticated_user(is_staff=True)
+        content = self.unique()
+        self.assertViewBehavior(
+            {"get": content},
+            status_code=200,
+            content=content)
+        user.is_staff = False
+        user.save()
+        self.assertViewBehavior(
+            {"get": content},
+            status_code=403)
+    
+    @override_settings(CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "django-daydreamer"},
+        "users": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "django-daydreamer-users"}})
+    def test_auth_fail_invalidated_alias(self):
+        user = self.create_authenticated_user(is_staff=True)
+        content = self.unique()
+        self.assertViewBehavior(
+            {"get": content, "authorization_user_cache": "users"},
+            status_code=200,
+            content=content)
+        user.is_staff = False
+        user.save()
+        self.assertViewBehavior(
+            {"get": content, "authorization_user_cache": "users"},
+            status_code=403)
+
+
+class AuthorizationCostOrderedTestCase(base.UserTestCase):
+    """
+    Tests for the cost-ordered evaluation of the Authorization view
+    behaviors' tests.
+    
+    """
+    view_classes = (auth.TestRequired, auth.StaffRequired, generic.View,)
+    
+    def setUp(self):
+        super(AuthorizationCostOrderedTestCase, self).setUp()
+        self.calls = []
+    
+    def view(self, **attrs):
+        calls = self.calls
+        def test_required(self):
+            calls.append(self.request.user.pk)
+            return True
+        return super(AuthorizationCostOrderedTestCase, self).view(
+            **lang.updated({
+                "test_required": test_required,
+                "staff_required_raise": True}, attrs))
+    
+    def test_auth_fail(self):
+        self.create_authenticated_user()
+        self.assertViewBehavior(
+            {"get": self.unique()},
+            status_code=403)
+        self.assertEqual(len(self.calls), 1)
+    
+    def test_auth_fail_cost_ordered(self):
+        self.create_authenticated_user()
+        self.assertViewBehavior(
+            {"get": self.unique(), "denial_cost_ordered": True},
+            status_code=403)
+        self.assertEqual(len(self.calls), 0)
+    
+    def test_auth_fail_cost_ordered_handler(self):
+        self.create_authenticated_user()
+        attrs = {"get": self.unique(), "test_required": lambda self: False}
+        self.assertViewBehavior(attrs, status_code=302)
+        self.assertViewBehavior(
+            lang.updated({"denial_cost_ordered": True}, attrs),
+            status_code=403)
+    
+    def test_auth_pass_cost_ordered(self):
+        self.create_authenticated_user(is_staff=True)
+        content = self.unique()
+        self.assertViewBehavior(
+            {"get": content, "denial_cost_ordered": True},
+            status_code=200,
+            content=content)
+        self.assertEqual(len(self.calls), 1)
 
 
 class LoginRequiredTestCase(base.TestCase):
@@ -32,6 +248,23 @@ class LoginRequiredTestCase(base.TestCase):
     def setup_auth_pass(self):
         self.create_authenticated_user()
         return {}
+    
+    # Tests for the anonymous fast path.
+    def test_unauth_fail_fast_path(self):
+        self.assertViewBehavior(
+            {"raise": True, "get": self.unique()},
+            status_code=403)
+        self.assertIs(
+            self.client.handler.last_request.user._wrapped,
+            functional.empty)
+    
+    def test_unauth_fail_fast_path_disabled(self):
+        self.assertViewBehavior(
+            {"raise": True, "fast_path": False, "get": self.unique()},
+            status_code=403)
+        self.assertIsNot(
+            self.client.handler.last_request.user._wrapped,
+            functional.empty)
 
 
 class ActiveRequiredTestCase(base.TestCase):
@@ -247,6 +480,101 @@ class PermissionsRequiredTestCase(base.TestCase):
             self.client.get(self.view(**{"": (1, 1)}))
 
 
+class PermissionsRequiredCacheTestCase(PermissionsRequiredTestCase):
+    """
+    Tests for the PermissionsRequired view behavior with the permissions
+    cache enabled.
+    
+    """
+    def setUp(self):
+        cache.clear()
+        super(PermissionsRequiredCacheTestCase, self).setUp()
+    
+    def tearDown(self):
+        super(PermissionsRequiredCacheTestCase, self).tearDown()
+        cache.clear()
+    
+    def view(self, **attrs):
+        return super(PermissionsRequiredCacheTestCase, self).view(
+            **lang.updated({"cache": True}, attrs))
+    
+    # Tests for invalidation of the cached permissions.
+    def test_auth_pass_granted(self):
+        permission = self.create_permission()
+        user = self.create_authenticated_user()
+        name = ".".join(("auth", permission.codename,))
+        content = self.unique()
+        self.assertViewBehavior(
+            {"": name, "raise": True, "get": content},
+            status_code=403)
+        user.user_permissions.add(permission)
+        self.assertViewBehavior(
+            {"": name, "raise": True, "get": content},
+            status_code=200,
+            content=content)
+    
+    def test_auth_fail_revoked(self):
+        permission = self.create_permission()
+        user = self.create_authenticated_user()
+        group = self.create_group()
+        group.permissions.add(permission)
+        user.groups.add(group)
+        name = ".".join(("auth", permission.codename,))
+        content = self.unique()
+        self.assertViewBehavior(
+            {"": name, "raise": True, "get": content},
+            status_code=200,
+            content=content)
+        group.permissions.remove(permission)
+        self.assertViewBehavior(
+            {"": name, "raise": True, "get": content},
+            status_code=403)
+    
+    @override_settings(CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "django-daydreamer"},
+        "permissions": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "django-daydreamer-permissions"}})
+    def test_auth_fail_revoked_alias(self):
+        permission = self.create_permission()
+        user = self.create_authenticated_user()
+        user.user_permissions.add(permission)
+        name = ".".join(("auth", permission.codename,))
+        content = self.unique()
+        self.assertViewBehavior(
+            {"": name, "raise": True, "cache": "permissions", "get": content},
+            status_code=200,
+            content=content)
+        user.user_permissions.remove(permission)
+        self.assertViewBehavior(
+            {"": name, "raise": True, "cache": "permissions", "get": content},
+            status_code=403)
+    
+    # Tests for the isolation of the users' cached permissions.
+    def test_auth_fail_equal_versions(self):
+        permission = self.create_permission()
+        other = self.create_authenticated_user()
+        other.user_permissions.add(permission)
+        name = ".".join(("auth", permission.codename,))
+        content = self.unique()
+        self.assertViewBehavior(
+            {"": name, "raise": True, "get": content},
+            status_code=200,
+            content=content)
+        user = self.create_authenticated_user()
+        # Give the user's version counter the other user's value, like when
+        # both counters are seeded in the same millisecond.
+        cache.set(
+            auth_permissions.get_user_version_key(user.pk),
+            cache.get(auth_permissions.get_user_version_key(other.pk)),
+            None)
+        self.assertViewBehavior(
+            {"": name, "raise": True, "get": content},
+            status_code=403)
+
+
 class ObjectPermissionsRequiredTestCase(base.TestCase):
     """
     Tests for the ObjectPermissionsRequired view behavior.
@@ -361,6 +689,31 @@ class ObjectPermissionsRequiredTestCase(base.TestCase):
     def test_invalid_multiple(self):
         with self.assertRaises(ValueError):
             self.client.get(self.view(**{"": (1, 1), "object": object()}))
+    
+    # Tests for sharing the object with a generic view.
+    def test_auth_pass_shared_object(self):
+        permission = self.create_permission()
+        self.create_authenticated_user(is_superuser=True)
+        group = self.create_group()
+        def get(self, request, *args, **kwargs):
+            return http.HttpResponse(
+                "shared"
+                    if self.object_permissions_required_object is
+                        self.get_object()
+                    else "")
+        view = type(
+            b"TestObjectPermissionsRequiredDetailView",
+            (auth.ObjectPermissionsRequired, generic.DetailView,),
+            {
+                "model": auth_models.Group,
+                "get": get,
+                "object_permissions_required": ".".join(
+                    ("auth", permission.codename,)),
+                "object_permissions_required_object": property(
+                    lambda self: self.get_object())}).as_view()
+        response = self.client.get(view, view_kwargs={"pk": group.pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b"shared")
 
 
 class TestRequiredTestCase(base.TestCase):
@@ -371,6 +724,14 @@ class TestRequiredTestCase(base.TestCase):
     view_classes = (auth.TestRequired, generic.View,)
     prefix = "test_required"
     
+    def setUp(self):
+        cache.clear()
+        super(TestRequiredTestCase, self).setUp()
+    
+    def tearDown(self):
+        super(TestRequiredTestCase, self).tearDown()
+        cache.clear()
+    
     def create_name_test(self, name):
         def test_required(self):
             return getattr(self.request.user, "first_name", None) == name
@@ -390,3 +751,180 @@ class TestRequiredTestCase(base.TestCase):
         name = self.unique_username()
         self.create_authenticated_user(first_name=name)
         return {"": self.create_name_test(name)}
+    
+    # Tests for the decision cache.
+    def create_counted_test(self, calls, result):
+        def test_required(self):
+            calls.append(self.request.user.pk)
+            return result
+        return test_required
+    
+    def test_auth_pass_decision_cache(self):
+        self.create_authenticated_user()
+        calls = []
+        content = self.unique()
+        self.assertViewBehavior(
+            {"": self.create_counted_test(calls, True), "get": content,
+                "decision_cache": True},
+            repeat=3,
+            status_code=200,
+            content=content)
+        self.assertEqual(len(calls), 1)
+    
+    def test_auth_fail_decision_cache(self):
+        self.create_authenticated_user()
+        calls = []
+        self.assertViewBehavior(
+            {"": self.create_counted_test(calls, False), "raise": True,
+                "get": self.unique(), "decision_cache": True},
+            repeat=3,
+            status_code=403)
+        self.assertEqual(len(calls), 3)
+    
+    def test_auth_fail_decision_cache_negative(self):
+        self.create_authenticated_user()
+        calls = []
+        self.assertViewBehavior(
+            {"": self.create_counted_test(calls, False), "raise": True,
+                "get": self.unique(), "decision_cache": True,
+                "decision_cache_negative": True},
+            repeat=3,
+            status_code=403)
+        self.assertEqual(len(calls), 1)
+    
+    def test_auth_pass_decision_cache_vary(self):
+        self.create_authenticated_user()
+        calls = []
+        content = self.unique()
+        self.assertViewBehavior(
+            {"": self.create_counted_test(calls, True), "get": content,
+                "decision_cache": True,
+                "decision_cache_vary": lambda self: self.request.path},
+            path=self.unique_path(),
+            status_code=200,
+            content=content)
+        self.assertViewBehavior(
+            {"": self.create_counted_test(calls, True), "get": content,
+                "decision_cache": True,
+                "decision_cache_vary": lambda self: self.request.path},
+            path=self.unique_path(),
+            status_code=200,
+            content=content)
+        self.assertEqual(len(calls), 2)
+    
+    def test_auth_pass_decision_cache_invalidated(self):
+        user = self.create_authenticated_user()
+        calls = []
+        content = self.unique()
+        self.assertViewBehavior(
+            {"": self.create_counted_test(calls, True), "get": content,
+                "decision_cache": True},
+            status_code=200,
+            content=content)
+        core_behaviors.invalidate_decisions("test_required", user.pk)
+        self.assertViewBehavior(
+            {"": self.create_counted_test(calls, True), "get": content,
+                "decision_cache": True},
+            status_code=200,
+            content=content)
+        self.assertEqual(len(calls), 2)
+    
+    def test_unauth_fail_decision_cache(self):
+        calls = []
+        self.assertViewBehavior(
+            {"": self.create_counted_test(calls, False), "raise": True,
+                "get": self.unique(), "decision_cache": True,
+                "decision_cache_negative": True},
+            repeat=2,
+            status_code=403)
+        self.assertEqual(len(calls), 2)
+
+
+@override_settings(AUTHENTICATION_BACKENDS=(
+    "django.contrib.auth.backends.ModelBackend",
+    "daydreamer.tests.views.behaviors.auth.backends.ObjectPermissionBackend",))
+class ObjectListPermissionsTestCase(base.UserTestCase):
+    """
+    Tests for the ObjectListPermissions view behavior.
+    
+    """
+    view_classes = (auth.ObjectListPermissions, generic.ListView,)
+    
+    def setUp(self):
+        super(ObjectListPermissionsTestCase, self).setUp()
+        del backends.ObjectPermissionBackend.batches[:]
+        self.user = self.create_authenticated_user()
+        self.permitted = set(
+            auth_models.Group.objects.create(
+                name="".join(("permitted", self.unique(),))[:80]).name
+            for i in range(3))
+        self.denied = set(
+            auth_models.Group.objects.create(name=self.unique()[:80]).name
+            for i in range(3))
+    
+    def view(self, **attrs):
+        """
+        Prefixes the attributes with "object_list_permissions" and lists the
+        groups with a get() method that responds with the names of the
+        groups that are annotated as permitted.
+        
+        """
+        def get(self, request, *args, **kwargs):
+            self.object_list = self.get_queryset()
+            return http.HttpResponse(" ".join(sorted(
+                group.name
+                for group in self.get_context_data()["object_list"]
+                if getattr(
+                    group, self.get_object_list_permissions_name(), True))))
+        return super(ObjectListPermissionsTestCase, self).view(
+            model=auth_models.Group, get=get, **{
+                "_".join(("object_list_permissions", key,))
+                    if key
+                    else "object_list_permissions": value
+                for key, value in six.iteritems(attrs)})
+    
+    # Tests.
+    def test_disabled(self):
+        self.assertViewBehavior(
+            status_code=200,
+            content=" ".join(sorted(self.permitted | self.denied)))
+        self.assertFalse(backends.ObjectPermissionBackend.batches)
+    
+    def test_annotate(self):
+        self.assertViewBehavior(
+            {"": "auth.view_group"},
+            status_code=200,
+            content=" ".join(sorted(self.permitted)))
+        self.assertEqual(len(backends.ObjectPermissionBackend.batches), 1)
+    
+    def test_annotate_name(self):
+        self.assertViewBehavior(
+            {"": "auth.view_group", "name": "can_view"},
+            status_code=200,
+            content=" ".join(sorted(self.permitted)))
+    
+    def test_annotate_multiple(self):
+        self.assertViewBehavior(
+            {"": ("auth.view_group", "auth.change_group",)},
+            status_code=200,
+            content="")
+    
+    def test_filter(self):
+        self.assertViewBehavior(
+            {"": "auth.view_group", "filter": True},
+            status_code=200,
+            content=" ".join(sorted(self.permitted)))
+        self.assertEqual(len(backends.ObjectPermissionBackend.batches), 1)
+    
+    def test_filter_superuser(self):
+        self.user.is_superuser = True
+        self.user.save()
+        self.assertViewBehavior(
+            {"": "auth.view_group", "filter": True},
+            status_code=200,
+            content=" ".join(sorted(self.permitted | self.denied)))
+        self.assertFalse(backends.ObjectPermissionBackend.batches)
+    
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            self.client.get(self.view(**{"": 1}))
@@ -1,11 +1,25 @@
 from __future__ import unicode_literals
 
-from django import http
+import json
+import logging
+import threading
+import time
 
+from django import http, template
+from django.contrib import auth
+from django.contrib.auth import models as auth_models
+from django.core import cache as caches, management, urlresolvers
+from django.template import response
+from django.test.utils import override_settings
+from django.utils import cache as cache_utils, six
+
+from daydreamer.core import (
+    compression, locks, stats, surrogates, tags, versions, workers,)
+from daydreamer.management.commands import warm_cache_pages
 from daydreamer.views import generic
-from daydreamer.views.behaviors import cache
+from daydreamer.views.behaviors import cache, gzip, vary
 
-from . import base
+from . import base, urls
 
 
 class CachePageTestCase(base.TestCase):
@@ -56,6 +70,725 @@ class CachePageTestCase(base.TestCase):
         """
         self.assertViewBehavior(
             status_code=405)
+    
+    def test_cache_page_post(self):
+        """
+        Check that responses to POST requests are not cached.
+        
+        """
+        content = self.unique()
+        calls = []
+        def post(self, request, *args, **kwargs):
+            calls.append(None)
+            return http.HttpResponse(content)
+        self.assertViewBehavior(
+            {"post": post},
+            method="post",
+            repeat=2,
+            status_code=200,
+            content=content)
+        self.assertEqual(len(calls), 2)
+    
+    def test_cache_page_status(self):
+        """
+        Check that unsuccessful responses are not cached.
+        
+        """
+        content = self.unique()
+        calls = []
+        def get(self, request, *args, **kwargs):
+            calls.append(None)
+            return http.HttpResponseNotFound(content)
+        self.assertViewBehavior(
+            {"get": get},
+            repeat=2,
+            status_code=404,
+            content=content)
+        self.assertEqual(len(calls), 2)
+    
+    def test_cache_page_max_age(self):
+        """
+        Check that the response's max-age is used as the timeout and that the
+        cache headers are set.
+        
+        """
+        content = self.unique()
+        calls = []
+        def get(self, request, *args, **kwargs):
+            calls.append(None)
+            uncached = http.HttpResponse(content)
+            uncached["Cache-Control"] = "max-age=0"
+            return uncached
+        self.assertViewBehavior(
+            {"get": get},
+            repeat=2,
+            status_code=200,
+            content=content)
+        self.assertEqual(len(calls), 2)
+        self.assertViewBehavior(
+            {"get": content, "cache_page_timeout": 60},
+            status_code=200,
+            content=content,
+            headers_include=("Expires", "Last-Modified",),
+            headers_exact={"Cache-Control": "max-age=60"})
+    
+    def test_cache_page_template_response(self):
+        """
+        Check that template responses are cached after they are rendered.
+        
+        """
+        content = self.unique()
+        calls = []
+        def get(self, request, *args, **kwargs):
+            calls.append(None)
+            return response.SimpleTemplateResponse(
+                template.Template(content))
+        self.assertViewBehavior(
+            {"get": get},
+            repeat=2,
+            status_code=200,
+            content=content)
+        self.assertEqual(len(calls), 1)
+    
+    def test_cache_page_stale(self):
+        """
+        Check that an expired response is served within the stale timeout
+        while it is regenerated in the background.
+        
+        """
+        content = self.unique()
+        calls = []
+        def get(self, request, *args, **kwargs):
+            calls.append(None)
+            return http.HttpResponse("{content:s}{calls:d}".format(
+                content=content, calls=len(calls)))
+        path = self.unique_path()
+        attrs = {
+            "get": get,
+            "cache_page_timeout": 1,
+            "cache_page_stale_timeout": 60}
+        self.assertViewBehavior(
+            attrs,
+            path=path,
+            status_code=200,
+            content="{content:s}1".format(content=content))
+        time.sleep(1.5)
+        self.assertViewBehavior(
+            attrs,
+            path=path,
+            status_code=200,
+            content="{content:s}1".format(content=content))
+        workers.worker.join()
+        self.assertEqual(len(calls), 2)
+        self.assertViewBehavior(
+            attrs,
+            path=path,
+            status_code=200,
+            content="{content:s}2".format(content=content))
+    
+    def test_cache_page_expired(self):
+        """
+        Check that an expired response is regenerated without a stale timeout.
+        
+        """
+        content = self.unique()
+        calls = []
+        def get(self, request, *args, **kwargs):
+            calls.append(None)
+            return http.HttpResponse(content)
+        path = self.unique_path()
+        self.assertViewBehavior(
+            {"get": get, "cache_page_timeout": 1},
+            path=path,
+            status_code=200,
+            content=content)
+        time.sleep(1.5)
+        self.assertViewBehavior(
+            {"get": get, "cache_page_timeout": 1},
+            path=path,
+            status_code=200,
+            content=content)
+        self.assertEqual(len(calls), 2)
+    
+    def test_cache_page_lock(self):
+        """
+        Check that the lock is released after the response is cached.
+        
+        """
+        name = self.unique()
+        self.assertViewBehavior(
+            {
+                "get": self.unique(),
+                "cache_page_lock_timeout": 60,
+                "cache_page_lock_name": lambda self, request: name},
+            status_code=200)
+        self.assertFalse(locks.is_locked(name))
+    
+    def test_cache_page_lock_held(self):
+        """
+        Check that the response is regenerated after waiting when the lock is
+        held and no fresh response appears.
+        
+        """
+        name = self.unique()
+        content = self.unique()
+        token = locks.acquire(name, 60)
+        self.assertViewBehavior(
+            {
+                "get": content,
+                "cache_page_lock_timeout": 60,
+                "cache_page_lock_wait": 0.1,
+                "cache_page_lock_name": lambda self, request: name},
+            status_code=200,
+            content=content)
+        self.assertTrue(locks.is_locked(name))
+        locks.release(name, token)
+    
+    def test_cache_page_lock_no_wait(self):
+        """
+        Check that no wait is counted when cache_page_lock_wait is 0.
+        
+        """
+        name = self.unique()
+        content = self.unique()
+        view = self.view(
+            get=content,
+            cache_page_lock_timeout=60,
+            cache_page_lock_wait=0,
+            cache_page_lock_name=lambda self, request: name)
+        counters = stats.get_view_stats("cache_page", view.view_class)
+        counters.reset()
+        token = locks.acquire(name, 60)
+        response = self.client.get(view)
+        locks.release(name, token)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, content)
+        self.assertEqual(counters.get("lock_waits"), 0)
+    
+    def test_cache_page_lock_released(self):
+        """
+        Check that by default the request waits while the lock is held and
+        stops waiting when it is released without a fresh response.
+        
+        """
+        name = self.unique()
+        content = self.unique()
+        view = self.view(
+            get=content,
+            cache_page_lock_timeout=60,
+            cache_page_lock_name=lambda self, request: name)
+        counters = stats.get_view_stats("cache_page", view.view_class)
+        counters.reset()
+        token = locks.acquire(name, 60)
+        timer = threading.Timer(0.2, locks.release, (name, token,))
+        timer.start()
+        started = time.time()
+        response = self.client.get(view)
+        timer.join()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, content)
+        self.assertGreaterEqual(time.time() - started, 0.2)
+        self.assertLess(time.time() - started, 10)
+        self.assertEqual(counters.get("lock_waits"), 1)
+    
+    def test_cache_page_lock_stale(self):
+        """
+        Check that a stale response is not regenerated in the background while
+        the lock is held elsewhere.
+        
+        """
+        name = self.unique()
+        content = self.unique()
+        calls = []
+        def get(self, request, *args, **kwargs):
+            calls.append(None)
+            return http.HttpResponse(content)
+        path = self.unique_path()
+        attrs = {
+            "get": get,
+            "cache_page_timeout": 1,
+            "cache_page_stale_timeout": 60,
+            "cache_page_lock_timeout": 60,
+            "cache_page_lock_name": lambda self, request: name}
+        self.assertViewBehavior(
+            attrs,
+            path=path,
+            status_code=200,
+            content=content)
+        token = locks.acquire(name, 60)
+        time.sleep(1.5)
+        self.assertViewBehavior(
+            attrs,
+            path=path,
+            status_code=200,
+            content=content)
+        workers.worker.join()
+        self.assertEqual(len(calls), 1)
+        locks.release(name, token)
+    
+    def test_cache_page_early_recompute(self):
+        """
+        Check that a fresh response is regenerated early when the early
+        recomputation is aggressive enough.
+        
+        """
+        content = self.unique()
+        calls = []
+        def get(self, request, *args, **kwargs):
+            calls.append(None)
+            time.sleep(0.01)
+            return http.HttpResponse(content)
+        self.assertViewBehavior(
+            {
+                "get": get,
+                "cache_page_timeout": 60,
+                "cache_page_early_recompute": 10 ** 6},
+            repeat=2,
+            status_code=200,
+            content=content)
+        self.assertEqual(len(calls), 2)
+    
+    def test_cache_page_local(self):
+        """
+        Check that responses are served from the in-process cache, even when
+        the shared cache no longer has them.
+        
+        """
+        content = self.unique()
+        calls = []
+        def get(self, request, *args, **kwargs):
+            calls.append(None)
+            return http.HttpResponse(content)
+        view = self.view(get=get, cache_page_local_size=10)
+        counters = stats.get_view_stats("cache_page", view.view_class)
+        counters.reset()
+        path = self.unique_path()
+        self.client.get(view, path=path)
+        caches.cache.clear()
+        response = self.client.get(view, path=path)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, content)
+        self.assertEqual(len(calls), 1)
+        self.assertGreater(counters.get("local_hits"), 0)
+        self.assertEqual(counters.get("shared_hits"), 0)
+    
+    def test_cache_page_stats(self):
+        """
+        Check that the hits, misses and generation times are counted and can
+        be collected from the cache.
+        
+        """
+        view = self.view(get=self.unique())
+        counters = stats.get_view_stats("cache_page", view.view_class)
+        counters.reset()
+        path = self.unique_path()
+        for index in range(3):
+            self.client.get(view, path=path)
+        self.assertEqual(counters.get("misses"), 1)
+        self.assertEqual(counters.get("hits"), 2)
+        self.assertEqual(counters.get("generate_count"), 1)
+        stats.publish()
+        collected = stats.collect()
+        self.assertIn(
+            ".".join((
+                "cache_page",
+                view.view_class.__module__,
+                view.view_class.__name__,)),
+            collected)
+    
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "django-daydreamer"},
+            "stats": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "django-daydreamer-stats"}},
+        DAYDREAMER_STATS_CACHE="stats")
+    def test_cache_page_stats_cache(self):
+        """
+        Check that the stats are published to the cache alias named by
+        settings.DAYDREAMER_STATS_CACHE, which dump_stats reads.
+        
+        """
+        view = self.view(get=self.unique())
+        self.client.get(view, path=self.unique_path())
+        name = ".".join((
+            "cache_page",
+            view.view_class.__module__,
+            view.view_class.__name__,))
+        stats.published["time"] = 0
+        stats.publish_due()
+        self.assertIn(name, stats.collect(cache="stats"))
+        self.assertNotIn(name, stats.collect(cache="default"))
+        output = six.StringIO()
+        management.call_command("dump_stats", cache="stats", stdout=output)
+        self.assertIn(name, json.loads(output.getvalue()))
+    
+    def test_cache_page_local_disabled(self):
+        """
+        Check that the in-process cache isn't used by default.
+        
+        """
+        content = self.unique()
+        calls = []
+        def get(self, request, *args, **kwargs):
+            calls.append(None)
+            return http.HttpResponse(content)
+        view = self.view(get=get)
+        path = self.unique_path()
+        self.client.get(view, path=path)
+        caches.cache.clear()
+        self.client.get(view, path=path)
+        self.assertEqual(len(calls), 2)
+    
+    def test_cache_page_tags(self):
+        """
+        Check that invalidating a response's tag discards the response.
+        
+        """
+        tag = self.unique()
+        content = self.unique()
+        calls = []
+        def get(self, request, *args, **kwargs):
+            calls.append(None)
+            return http.HttpResponse(content)
+        view = self.view(get=get, cache_page_tags=(tag, self.unique(),))
+        path = self.unique_path()
+        self.client.get(view, path=path)
+        self.client.get(view, path=path)
+        self.assertEqual(len(calls), 1)
+        tags.invalidate((tag,))
+        response = self.client.get(view, path=path)
+        self.assertEqual(response.content, content)
+        self.assertEqual(len(calls), 2)
+    
+    @override_settings(CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "django-daydreamer"},
+        "pages": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "django-daydreamer-pages"}})
+    def test_cache_page_tags_cache(self):
+        """
+        Check that invalidating a response's tag discards the response when
+        it is stored in another cache than the default cache.
+        
+        """
+        tag = self.unique()
+        calls = []
+        def get(self, request, *args, **kwargs):
+            calls.append(None)
+            return http.HttpResponse()
+        view = self.view(
+            get=get, cache_page_cache="pages", cache_page_tags=(tag,))
+        path = self.unique_path()
+        self.client.get(view, path=path)
+        self.client.get(view, path=path)
+        self.assertEqual(len(calls), 1)
+        tags.invalidate((tag,))
+        self.client.get(view, path=path)
+        self.assertEqual(len(calls), 2)
+    
+    def test_cache_page_tags_local(self):
+        """
+        Check that the tags' generations are read from the process' memory,
+        so that an invalidation made by another process is only noticed once
+        cache_page_tags_local_timeout has passed.
+        
+        """
+        for local_timeout, count in ((60, 1,), (0, 2,),):
+            tag = self.unique()
+            calls = []
+            def get(self, request, *args, **kwargs):
+                calls.append(None)
+                return http.HttpResponse()
+            view = self.view(
+                get=get,
+                cache_page_tags=(tag,),
+                cache_page_tags_local_timeout=local_timeout)
+            path = self.unique_path()
+            self.client.get(view, path=path)
+            # Bump the generation without the signal, like another process.
+            versions.bump_versions((tags.get_tag_key(tag),))
+            self.client.get(view, path=path)
+            self.assertEqual(len(calls), count)
+    
+    def test_cache_page_tags_model(self):
+        """
+        Check that saving a tagged model instance discards the response when
+        the model is connected.
+        
+        """
+        tags.connect(auth_models.Group)
+        self.addCleanup(tags.disconnect, auth_models.Group)
+        group = auth_models.Group.objects.create(name=self.unique())
+        content = self.unique()
+        calls = []
+        def get(self, request, *args, **kwargs):
+            calls.append(None)
+            return http.HttpResponse(content)
+        def get_cache_page_tags(self):
+            return (group,)
+        view = self.view(get=get, get_cache_page_tags=get_cache_page_tags)
+        path = self.unique_path()
+        self.client.get(view, path=path)
+        self.client.get(view, path=path)
+        self.assertEqual(len(calls), 1)
+        group.save()
+        self.client.get(view, path=path)
+        self.assertEqual(len(calls), 2)
+    
+    def test_cache_page_cookies(self):
+        """
+        Check that responses setting cookies are not cached, so that a cache
+        hit never sets another visitor's cookies.
+        
+        """
+        content = self.unique()
+        name = self.unique()
+        value = self.unique()
+        calls = []
+        def get(self, request, *args, **kwargs):
+            response = http.HttpResponse(content)
+            if not calls:
+                response.set_cookie(name, value)
+            calls.append(None)
+            return response
+        view = self.view(get=get)
+        path = self.unique_path()
+        self.assertIn(name, self.client.get(view, path=path).cookies)
+        for _ in range(2):
+            response = self.client_class().get(view, path=path)
+            self.assertEqual(response.content, content)
+            self.assertNotIn(name, response.cookies)
+        self.assertEqual(len(calls), 2)
+    
+    def test_cache_page_vary(self):
+        """
+        Check that responses are keyed by the headers named by the Vary header
+        by default.
+        
+        """
+        content = self.unique()
+        calls = []
+        def get(self, request, *args, **kwargs):
+            calls.append(None)
+            response = http.HttpResponse(content)
+            response["Vary"] = "Cookie"
+            return response
+        view = self.view(get=get)
+        path = self.unique_path()
+        for value in (self.unique(), self.unique(),):
+            self.client.cookies["tier"] = value
+            self.client.get(view, path=path)
+        self.assertEqual(len(calls), 2)
+    
+    def test_cache_page_variant(self):
+        """
+        Check that responses are shared by requests with the same variant,
+        regardless of the Vary header.
+        
+        """
+        content = self.unique()
+        calls = []
+        def get(self, request, *args, **kwargs):
+            calls.append(None)
+            response = http.HttpResponse(content)
+            response["Vary"] = "X-Tier, X-Unique"
+            return response
+        def get_cache_page_variant(self):
+            return self.request.META.get("HTTP_X_TIER")
+        view = self.view(
+            get=get, get_cache_page_variant=get_cache_page_variant)
+        path = self.unique_path()
+        for value in ("free", "free", "paid", "paid",):
+            response = self.client.get(
+                view, path=path, HTTP_X_TIER=value,
+                HTTP_X_UNIQUE=self.unique())
+            self.assertEqual(response.content, content)
+        self.assertEqual(len(calls), 2)
+    
+    def test_cache_page_compress(self):
+        """
+        Check that compressed responses are decompressed when they are served.
+        
+        """
+        content = self.unique() * 20
+        calls = []
+        def get(self, request, *args, **kwargs):
+            calls.append(None)
+            return http.HttpResponse(content)
+        self.assertViewBehavior(
+            {"get": get, "cache_page_compress": 100},
+            headers={"HTTP_ACCEPT_ENCODING": "gzip"},
+            repeat=2,
+            status_code=200,
+            content=content,
+            headers_exclude="Content-Encoding")
+        self.assertEqual(len(calls), 1)
+    
+    def test_cache_page_query(self):
+        """
+        Check that responses are keyed by the raw query string by default.
+        
+        """
+        calls = []
+        def get(self, request, *args, **kwargs):
+            calls.append(None)
+            return http.HttpResponse(self.request.GET.get("a"))
+        view = self.view(get=get)
+        path = self.unique_path()
+        for query in ("a=1&b=2", "b=2&a=1",):
+            self.client.get(
+                view, path="{path:s}?{query:s}".format(path=path, query=query))
+        self.assertEqual(len(calls), 2)
+    
+    def test_cache_page_normalize_query(self):
+        """
+        Check that responses are shared by query strings that differ only in
+        the order of their parameters or in ignored parameters.
+        
+        """
+        calls = []
+        def get(self, request, *args, **kwargs):
+            calls.append(None)
+            return http.HttpResponse(self.request.GET.get("a"))
+        view = self.view(
+            get=get,
+            cache_page_normalize_query=True,
+            cache_page_query_ignore=("utm_*",))
+        path = self.unique_path()
+        for query in (
+                "a=1&b=2", "b=2&a=1", "utm_source=x&a=1&b=2",
+                "b=2&utm_medium=y&a=%31",):
+            response = self.client.get(
+                view, path="{path:s}?{query:s}".format(path=path, query=query))
+            self.assertEqual(response.content, "1")
+        self.assertEqual(len(calls), 1)
+        self.client.get(view, path="{path:s}?a=2&b=2".format(path=path))
+        self.assertEqual(len(calls), 2)
+
+
+class CachePageVaryOnCookieTestCase(base.TestCase):
+    """
+    Tests for the CachePage view behavior combined with the VaryOnCookie view
+    behavior.
+    
+    """
+    view_classes = (cache.CachePage, vary.VaryOnCookie, generic.View,)
+    
+    def test_cache_page_variant(self):
+        """
+        Check that the responses for authenticated users are shared when the
+        variant is whether the user is authenticated.
+        
+        """
+        content = self.unique()
+        calls = []
+        def get(self, request, *args, **kwargs):
+            calls.append(None)
+            return http.HttpResponse(content)
+        def get_cache_page_variant(self):
+            return self.request.user.is_authenticated()
+        view = self.view(
+            get=get, get_cache_page_variant=get_cache_page_variant)
+        path = self.unique_path()
+        for _ in range(2):
+            username, password = self.unique()[:30], self.unique()
+            auth.get_user_model().objects.create_user(
+                username, password=password)
+            client = self.client_class()
+            self.assertTrue(
+                client.login(username=username, password=password))
+            response = client.get(view, path=path)
+            self.assertEqual(response.content, content)
+            self.assertTrue(cache_utils.has_vary_header(response, "Cookie"))
+        self.assertEqual(len(calls), 1)
+
+
+class CachePageGZipPageTestCase(base.TestCase):
+    """
+    Tests for the CachePage view behavior combined with the GZipPage view
+    behavior.
+    
+    """
+    view_classes = (gzip.GZipPage, cache.CachePage, generic.View,)
+    
+    def test_cache_page_compress(self):
+        """
+        Check that compressed responses are served without being compressed
+        again when the client accepts gzip.
+        
+        """
+        content = self.unique() * 20
+        calls = []
+        def get(self, request, *args, **kwargs):
+            calls.append(None)
+            return http.HttpResponse(content)
+        view = self.view(get=get, cache_page_compress=100)
+        path = self.unique_path()
+        for index in range(2):
+            response = self.client.get(
+                view, path=path, HTTP_ACCEPT_ENCODING="gzip")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response["Content-Encoding"], "gzip")
+            self.assertEqual(
+                compression.decompress(response.content), content)
+        self.assertEqual(len(calls), 1)
+        response = self.client.get(view, path=path)
+        self.assertEqual(response.content, content)
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(len(calls), 1)
+
+
+@override_settings(
+    ROOT_URLCONF="daydreamer.tests.views.behaviors.cache.urls",
+    ALLOWED_HOSTS=("*", ".example.com", "www.example.com",))
+class WarmCachePagesTestCase(base.TestCase):
+    """
+    Tests for the warm_cache_pages management command.
+    
+    """
+    def setUp(self):
+        super(WarmCachePagesTestCase, self).setUp()
+        # The resolvers are memoized regardless of the overridden URLconf.
+        urlresolvers.clear_url_caches()
+        del urls.calls[:]
+    
+    def tearDown(self):
+        urlresolvers.clear_url_caches()
+        super(WarmCachePagesTestCase, self).tearDown()
+    
+    def test_warm_cache_pages(self):
+        """
+        Check that the pages of the CachePage views are requested once and
+        are cached.
+        
+        """
+        management.call_command("warm_cache_pages", verbosity=0)
+        self.assertItemsEqual(
+            urls.calls, ("/page/", "/item/first/", "/item/second/",))
+        management.call_command("warm_cache_pages", verbosity=0)
+        self.assertEqual(len(urls.calls), 3)
+    
+    def test_warm_cache_pages_host(self):
+        """
+        Check that the host name defaults to the first host name in
+        settings.ALLOWED_HOSTS that isn't a wildcard.
+        
+        """
+        self.assertEqual(
+            warm_cache_pages.get_default_host(), "www.example.com")
+        with self.settings(ALLOWED_HOSTS=("*",)):
+            self.assertIsNone(warm_cache_pages.get_default_host())
+            self.assertRaises(
+                management.CommandError,
+                management.call_command, "warm_cache_pages", verbosity=0)
+        management.call_command(
+            "warm_cache_pages", host="cdn.example.com", verbosity=0)
+        self.assertEqual(len(urls.calls), 3)
 
 
 class CacheControlTestCase(base.TestCase):
@@ -202,6 +935,153 @@ class CacheControlTestCase(base.TestCase):
             headers_exclude="Cache-Control")
 
 
+class SurrogateControlTestCase(base.TestCase):
+    """
+    Tests for the SurrogateControl view behavior.
+    
+    """
+    view_classes = (cache.SurrogateControl, generic.View,)
+    
+    def test_defaults(self):
+        """
+        Check that the defaults do not set any surrogate headers on the
+        response.
+        
+        """
+        content = self.unique()
+        self.assertViewBehavior(
+            {"get": content},
+            status_code=200,
+            content=content,
+            headers_exclude=("Surrogate-Control", "Surrogate-Key",))
+    
+    def test_surrogate_control(self):
+        """
+        Check that the Surrogate-Control directives are set on the response,
+        along with the cache control headers.
+        
+        """
+        content = self.unique()
+        self.assertViewBehavior(
+            {
+                "cache_control_max_age": 60,
+                "surrogate_control_max_age": 3600,
+                "surrogate_control_stale_while_revalidate": 30,
+                "get": content},
+            status_code=200,
+            content=content,
+            headers_exact={
+                "Cache-Control": "max-age=60",
+                "Surrogate-Control":
+                    "max-age=3600, stale-while-revalidate=30"})
+    
+    def test_surrogate_control_no_store(self):
+        """
+        Check that the no-store directive is set on the response.
+        
+        """
+        content = self.unique()
+        self.assertViewBehavior(
+            {"surrogate_control_no_store": True, "get": content},
+            status_code=200,
+            content=content,
+            headers_exact={"Surrogate-Control": "no-store"})
+    
+    def test_surrogate_keys(self):
+        """
+        Check that the surrogate keys are derived from tag strings, model
+        instances and model classes.
+        
+        """
+        group = auth_models.Group.objects.create(name=self.unique())
+        content = self.unique()
+        def get_surrogate_keys(self):
+            return ("news", group, auth_models.User,)
+        self.assertViewBehavior(
+            {"get_surrogate_keys": get_surrogate_keys, "get": content},
+            status_code=200,
+            content=content,
+            headers_exact={
+                "Surrogate-Key": "auth.group.{pk:d} auth.user news".format(
+                    pk=group.pk)})
+    
+    def test_surrogate_keys_header(self):
+        """
+        Check that the surrogate keys are set on the configured header.
+        
+        """
+        content = self.unique()
+        self.assertViewBehavior(
+            {
+                "surrogate_keys": ("news",),
+                "surrogate_keys_header": "Cache-Tag",
+                "get": content},
+            status_code=200,
+            content=content,
+            headers_exact={"Cache-Tag": "news"},
+            headers_exclude="Surrogate-Key")
+    
+    def test_surrogate_control_disabled(self):
+        """
+        Check that no surrogate headers are set when the view behavior is
+        disabled.
+        
+        """
+        content = self.unique()
+        self.assertViewBehavior(
+            {
+                "surrogate_control": False,
+                "surrogate_control_max_age": 3600,
+                "surrogate_keys": ("news",),
+                "get": content},
+            status_code=200,
+            content=content,
+            headers_exclude=("Surrogate-Control", "Surrogate-Key",))
+    
+    @override_settings(
+        DAYDREAMER_PURGE_CLIENT="daydreamer.core.surrogates.MemoryPurgeClient")
+    def test_surrogate_purge(self):
+        """
+        Check that invalidated tags are purged once purging is connected.
+        
+        """
+        surrogates.connect()
+        client = surrogates.get_purge_client()
+        tag = self.unique()
+        tags.invalidate((tag,))
+        self.assertIn(tag, client.purged)
+    
+    def test_surrogate_purge_default(self):
+        """
+        Check that the default purge client logs the keys without keeping
+        them.
+        
+        """
+        client = surrogates.get_purge_client(surrogates.DEFAULT_PURGE_CLIENT)
+        self.assertIsInstance(client, surrogates.LoggingPurgeClient)
+        records = []
+        handler = logging.Handler()
+        handler.emit = records.append
+        client.logger.addHandler(handler)
+        self.addCleanup(client.logger.removeHandler, handler)
+        tag = self.unique()
+        client.purge_keys((tag,))
+        self.assertEqual(len(records), 1)
+        self.assertIn(tag, records[0].getMessage())
+        self.assertFalse(hasattr(client, "purged"))
+    
+    def test_precedence(self):
+        """
+        Check that the default HTTP method name protection takes precedence and
+        that no surrogate headers are set on the response.
+        
+        """
+        self.assertViewBehavior(
+            {"surrogate_control_max_age": 3600, "surrogate_keys": ("news",)},
+            status_code=405,
+            headers_exclude=("Surrogate-Control", "Surrogate-Key",))
+
+
 class NeverCacheTestCase(base.TestCase):
     """
     Test for the NeverCache view behavior.
@@ -0,0 +1,46 @@
+from __future__ import unicode_literals
+
+from django import http
+from django.conf.urls import patterns, url
+
+from daydreamer.views import generic
+from daydreamer.views.behaviors import cache
+
+
+# The paths requested from the views.
+calls = []
+
+
+class Page(cache.CachePage, generic.View):
+    """
+    A cached view whose URL takes no arguments.
+    
+    """
+    def get(self, request, *args, **kwargs):
+        calls.append(request.path)
+        return http.HttpResponse(request.path)
+
+
+class Item(Page):
+    """
+    A cached view whose URL takes a slug.
+    
+    """
+    cache_page_warm_kwargs = ({"slug": "first"}, {"slug": "second"},)
+
+
+class Uncached(generic.View):
+    """
+    A view that isn't cached.
+    
+    """
+    def get(self, request, *args, **kwargs):
+        calls.append(request.path)
+        return http.HttpResponse(request.path)
+
+
+urlpatterns = patterns("",
+    url(r"^page/$", Page.as_view(), name="page"),
+    url(r"^item/(?P<slug>[\w-]+)/$", Item.as_view(), name="item"),
+    url(r"^uncached/$", Uncached.as_view(), name="uncached"),
+)
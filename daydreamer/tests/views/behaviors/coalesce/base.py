@@ -0,0 +1,63 @@
+from __future__ import unicode_literals
+
+import threading
+import time
+
+from django import http
+from django.test import client
+
+from daydreamer.tests.views.core import http as http_tests
+
+
+class TestCase(http_tests.TestCase):
+    """
+    Common utilities for testing request coalescing view behaviors.
+    
+    """
+    def setUp(self):
+        super(TestCase, self).setUp()
+        self.factory = client.RequestFactory()
+        self.calls = []
+        self.entered = threading.Event()
+        self.gate = threading.Event()
+    
+    def tearDown(self):
+        self.gate.set()
+        super(TestCase, self).tearDown()
+    
+    def blocking_get(self, content):
+        """
+        Returns a view method that records its calls and blocks until the
+        gate is opened.
+        
+        """
+        def get(view, request, *args, **kwargs):
+            self.calls.append(request)
+            self.entered.set()
+            self.gate.wait(5)
+            return http.HttpResponse(content)
+        return get
+    
+    def concurrently(self, view, *requests):
+        """
+        Runs the view with the first request, then with the other requests
+        while the first one is blocked in the handler, and returns the
+        responses in the order of the requests.
+        
+        """
+        responses = [None] * len(requests)
+        def run(index):
+            responses[index] = view(requests[index])
+        threads = [
+            threading.Thread(target=run, args=(index,))
+            for index in range(len(requests))]
+        threads[0].start()
+        self.assertTrue(self.entered.wait(5))
+        for thread in threads[1:]:
+            thread.start()
+        # Give the other requests time to reach the view behavior.
+        time.sleep(0.1)
+        self.gate.set()
+        for thread in threads:
+            thread.join(5)
+        return responses
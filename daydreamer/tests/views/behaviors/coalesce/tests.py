@@ -0,0 +1,132 @@
+from __future__ import unicode_literals
+
+from django import http
+from django.conf import settings
+
+from daydreamer.views import generic
+from daydreamer.views.behaviors import coalesce
+
+from . import base
+
+
+class CoalesceRequestsTestCase(base.TestCase):
+    """
+    Tests for the CoalesceRequests view behavior.
+    
+    """
+    view_classes = (coalesce.CoalesceRequests, generic.View,)
+    
+    def test_coalesce(self):
+        """
+        Check that identical concurrent requests are handled once and get
+        copies of the same response.
+        
+        """
+        content = self.unique()
+        path = self.unique_path()
+        responses = self.concurrently(
+            self.view(get=self.blocking_get(content)),
+            self.factory.get(path),
+            self.factory.get(path))
+        self.assertEqual(len(self.calls), 1)
+        for response in responses:
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.content, content)
+        self.assertIsNot(responses[0], responses[1])
+    
+    def test_coalesce_disabled(self):
+        """
+        Check that identical concurrent requests are each handled when the
+        view behavior is disabled.
+        
+        """
+        path = self.unique_path()
+        self.concurrently(
+            self.view(coalesce=False, get=self.blocking_get(self.unique())),
+            self.factory.get(path),
+            self.factory.get(path))
+        self.assertEqual(len(self.calls), 2)
+    
+    def test_coalesce_query(self):
+        """
+        Check that requests with different query strings are each handled,
+        and that the order of the parameters and the ignored parameters
+        don't matter.
+        
+        """
+        path = self.unique_path()
+        self.concurrently(
+            self.view(
+                coalesce_query_ignore=("utm_*",),
+                get=self.blocking_get(self.unique())),
+            self.factory.get(path, {"a": "1", "b": "2"}),
+            self.factory.get(path + "?b=2&a=1&utm_source=test"),
+            self.factory.get(path, {"a": "2"}))
+        self.assertEqual(len(self.calls), 2)
+    
+    def test_coalesce_variant(self):
+        """
+        Check that requests for different variants are each handled.
+        
+        """
+        path = self.unique_path()
+        self.concurrently(
+            self.view(
+                get_coalesce_variant=(
+                    lambda self: self.request.META.get("HTTP_X_VARIANT")),
+                get=self.blocking_get(self.unique())),
+            self.factory.get(path, HTTP_X_VARIANT="a"),
+            self.factory.get(path, HTTP_X_VARIANT="b"))
+        self.assertEqual(len(self.calls), 2)
+    
+    def test_coalesce_post(self):
+        """
+        Check that POST requests are not coalesced.
+        
+        """
+        path = self.unique_path()
+        view = self.view(post=self.blocking_get(self.unique()))
+        self.concurrently(
+            view, self.factory.post(path), self.factory.post(path))
+        self.assertEqual(len(self.calls), 2)
+    
+    def test_coalesce_cookies(self):
+        """
+        Check that requests with a session or CSRF cookie are not coalesced.
+        
+        """
+        path = self.unique_path()
+        for name in (settings.SESSION_COOKIE_NAME, settings.CSRF_COOKIE_NAME,):
+            self.calls[:] = []
+            self.entered.clear()
+            self.gate.clear()
+            cookie = "{name:s}={value:s}".format(
+                name=name, value=self.unique())
+            self.concurrently(
+                self.view(get=self.blocking_get(self.unique())),
+                self.factory.get(path, HTTP_COOKIE=cookie),
+                self.factory.get(path, HTTP_COOKIE=cookie))
+            self.assertEqual(len(self.calls), 2)
+    
+    def test_coalesce_set_cookie(self):
+        """
+        Check that the identical requests run the handler themselves when
+        the response sets cookies, instead of getting the cookies.
+        
+        """
+        def get(view, request, *args, **kwargs):
+            self.calls.append(request)
+            self.entered.set()
+            self.gate.wait(5)
+            response = http.HttpResponse()
+            response.set_cookie("call", str(len(self.calls)))
+            return response
+        path = self.unique_path()
+        responses = self.concurrently(
+            self.view(get=get),
+            self.factory.get(path),
+            self.factory.get(path))
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(
+            sorted(response.cookies["call"].value for response in responses),
+            ["1", "2"])
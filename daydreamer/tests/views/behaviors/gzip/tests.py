@@ -1,5 +1,9 @@
 from __future__ import unicode_literals
 
+from django import http, template
+from django.template import response
+
+from daydreamer.core import compression, stats
 from daydreamer.views.behaviors import gzip
 
 from . import base
@@ -40,6 +44,166 @@ class GZipPageTestCase(base.TestCase):
             content=content,
             headers_exclude="Content-Encoding")
     
+    def test_gzip_page_template_response(self):
+        """
+        Check that a template response's content is gzipped after it is
+        rendered.
+        
+        """
+        content = self.unique_gzip()
+        def get(self, request, *args, **kwargs):
+            return response.SimpleTemplateResponse(template.Template(content))
+        self.assertViewBehavior(
+            {"get": get},
+            headers={"HTTP_ACCEPT_ENCODING": "gzip"},
+            status_code=200,
+            content=self.compress(content),
+            headers_exact={"Content-Encoding": "gzip"})
+    
+    def test_gzip_page_streaming(self):
+        """
+        Check that a streaming response's content is gzipped as a single
+        stream that is only flushed after every gzip_page_flush_size bytes of
+        content.
+        
+        """
+        chunks = [self.unique() for _ in range(100)]
+        def get(self, request, *args, **kwargs):
+            return http.StreamingHttpResponse(iter(chunks))
+        view = self.view(
+            gzip_page_flush_size=len("".join(chunks)) // 4, get=get)
+        streaming = self.client.get(view, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(streaming["Content-Encoding"], "gzip")
+        self.assertFalse(streaming.has_header("Content-Length"))
+        compressed = list(streaming.streaming_content)
+        self.assertLess(len(compressed), len(chunks))
+        self.assertEqual(
+            compression.decompress(b"".join(compressed)), "".join(chunks))
+    
+    def test_gzip_page_streaming_not_accepted(self):
+        """
+        Check that a streaming response's content is not gzipped when the
+        client doesn't accept gzip.
+        
+        """
+        chunks = [self.unique() for _ in range(10)]
+        def get(self, request, *args, **kwargs):
+            return http.StreamingHttpResponse(iter(chunks))
+        streaming = self.client.get(self.view(get=get))
+        self.assertFalse(streaming.has_header("Content-Encoding"))
+        self.assertEqual(
+            b"".join(streaming.streaming_content), "".join(chunks))
+    
+    def test_gzip_page_min_length(self):
+        """
+        Check that content shorter than the minimum length is not gzipped.
+        
+        """
+        content = self.unique_gzip()
+        self.assertViewBehavior(
+            {"gzip_page_min_length": len(content) + 1, "get": content},
+            headers={"HTTP_ACCEPT_ENCODING": "gzip"},
+            status_code=200,
+            content=content,
+            headers_exclude="Content-Encoding")
+    
+    def test_gzip_page_types(self):
+        """
+        Check that content of an already compressed type is not gzipped.
+        
+        """
+        content = self.unique_gzip()
+        def get(self, request, *args, **kwargs):
+            return http.HttpResponse(content, content_type="image/png")
+        self.assertViewBehavior(
+            {"get": get},
+            headers={"HTTP_ACCEPT_ENCODING": "gzip"},
+            status_code=200,
+            content=content,
+            headers_exclude=("Content-Encoding", "Vary",))
+    
+    def test_gzip_page_levels(self):
+        """
+        Check that the compression level is picked by the content's length.
+        
+        """
+        content = self.unique_gzip()
+        self.assertViewBehavior(
+            {
+                "gzip_page_levels": ((0, 9,), (len(content), 1,),),
+                "get": content},
+            headers={"HTTP_ACCEPT_ENCODING": "gzip"},
+            status_code=200,
+            content=compression.compress(content, level=1),
+            headers_exact={"Content-Encoding": "gzip"})
+    
+    def test_gzip_page_pressure(self):
+        """
+        Check that the compression level is lowered by the pressure.
+        
+        """
+        content = self.unique_gzip()
+        self.assertViewBehavior(
+            {
+                "get_gzip_page_pressure": classmethod(lambda cls: 1),
+                "get": content},
+            headers={"HTTP_ACCEPT_ENCODING": "gzip"},
+            status_code=200,
+            content=compression.compress(content, level=1),
+            headers_exact={"Content-Encoding": "gzip"})
+    
+    def test_gzip_page_stats(self):
+        """
+        Check that the outcomes and the compressed bytes are counted.
+        
+        """
+        content = self.unique_gzip()
+        view = self.view(get=content)
+        counters = stats.get_view_stats("gzip_page", view.view_class)
+        counters.reset()
+        self.client.get(view, HTTP_ACCEPT_ENCODING="gzip")
+        self.client.get(view)
+        self.assertEqual(counters.get("compressed"), 1)
+        self.assertEqual(counters.get("skipped_encoding"), 1)
+        self.assertEqual(counters.get("bytes_in"), len(content))
+        self.assertEqual(
+            counters.get("bytes_out"), len(self.compress(content)))
+        self.assertEqual(counters.get("compress_count"), 1)
+    
+    def test_gzip_page_body_cache(self):
+        """
+        Check that identical content is only compressed once.
+        
+        """
+        content = self.unique_gzip()
+        view = self.view(get=content)
+        counters = stats.get_view_stats("gzip_page", view.view_class)
+        counters.reset()
+        compressed = [
+            self.client.get(view, HTTP_ACCEPT_ENCODING="gzip").content
+            for _ in range(2)]
+        self.assertEqual(compressed[0], compressed[1])
+        self.assertEqual(compression.decompress(compressed[0]), content)
+        self.assertEqual(counters.get("compressed"), 2)
+        self.assertEqual(counters.get("body_misses"), 1)
+        self.assertEqual(counters.get("body_hits"), 1)
+        self.assertEqual(counters.get("compress_count"), 1)
+    
+    def test_gzip_page_body_cache_disabled(self):
+        """
+        Check that identical content is compressed every time when the body
+        cache is disabled.
+        
+        """
+        content = self.unique_gzip()
+        view = self.view(gzip_page_body_cache=False, get=content)
+        counters = stats.get_view_stats("gzip_page", view.view_class)
+        counters.reset()
+        for _ in range(2):
+            self.client.get(view, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(counters.get("body_hits"), 0)
+        self.assertEqual(counters.get("compress_count"), 2)
+    
     def test_gzip_page_precedence(self):
         """
         Check that the default HTTP method name protection takes precedence and
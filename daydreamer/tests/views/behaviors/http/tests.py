@@ -1,9 +1,15 @@
 from __future__ import unicode_literals
 
 import datetime
+import hashlib
 
+from django import http as django_http, template
+from django.contrib.auth import models as auth_models
+from django.template import response as template_response
+
+from daydreamer.core import stats, tags
 from daydreamer.views import generic
-from daydreamer.views.behaviors import http
+from daydreamer.views.behaviors import gzip, http
 
 from . import base
 
@@ -454,3 +460,391 @@ class ConditionTestCase(base.TestCase):
                 "HTTP_IF_MODIFIED_SINCE": self.format_datetime(last_modified)},
             status_code=405,
             headers_exclude="Last-Modified")
+    
+    def test_stats(self):
+        """
+        Check that the outcomes of conditional requests are counted.
+        
+        """
+        etag = self.unique()
+        def condition_etag(self, request, *args, **kwargs):
+            return etag
+        view = self.view(condition_etag=condition_etag, get=self.unique())
+        counters = stats.get_view_stats("condition", view.view_class)
+        counters.reset()
+        self.client.get(view)
+        self.client.get(view, HTTP_IF_NONE_MATCH=self.format_etag(etag))
+        self.client.get(view, HTTP_IF_NONE_MATCH=self.format_etag(etag))
+        self.assertEqual(counters.get("modified"), 1)
+        self.assertEqual(counters.get("not_modified"), 2)
+        self.assertEqual(counters.get("respond_count"), 3)
+    
+    def test_etag_tags(self):
+        """
+        Check that the ETag derived from tag generations answers conditional
+        requests without any queries and changes when a tag is invalidated.
+        
+        """
+        tag = self.unique()
+        view = self.view(condition_etag_tags=(tag,), get=self.unique())
+        etag = self.client.get(view)["ETag"]
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                self.client.get(view, HTTP_IF_NONE_MATCH=etag).status_code,
+                304)
+        tags.invalidate((tag,))
+        response = self.client.get(view, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+    
+    def test_etag_tags_model(self):
+        """
+        Check that saving a connected model instance changes the ETag derived
+        from its tag.
+        
+        """
+        tags.connect(auth_models.Group)
+        self.addCleanup(tags.disconnect, auth_models.Group)
+        group = auth_models.Group.objects.create(name=self.unique()[:80])
+        view = self.view(
+            get_condition_etag_tags=(
+                lambda self: ("auth.group.{pk}".format(**self.kwargs),)),
+            get=self.unique())
+        etag = self.client.get(view, view_kwargs={"pk": group.pk})["ETag"]
+        group.save()
+        self.assertNotEqual(
+            self.client.get(view, view_kwargs={"pk": group.pk})["ETag"],
+            etag)
+
+
+class ConditionDetailViewTestCase(base.TestCase):
+    """
+    Tests for the Condition view behavior with fields of a DetailView's
+    object.
+    
+    """
+    view_classes = (http.Condition, generic.DetailView,)
+    
+    def test_etag_field(self):
+        """
+        Check that the ETag header is derived from the object's field.
+        
+        """
+        group = auth_models.Group.objects.create(name=self.unique()[:80])
+        content = self.unique()
+        self.assertViewBehavior(
+            {
+                "model": auth_models.Group,
+                "condition_etag_field": "name",
+                "get": content},
+            view_kwargs={"pk": group.pk},
+            status_code=200,
+            content=content,
+            headers_exact={"ETag": self.format_etag(group.name)})
+    
+    def test_etag_field_not_modified(self):
+        """
+        Check for a not modified response on ETag match, fetching the object
+        once.
+        
+        """
+        group = auth_models.Group.objects.create(name=self.unique()[:80])
+        with self.assertNumQueries(1):
+            self.assertViewBehavior(
+                {
+                    "model": auth_models.Group,
+                    "condition_etag_field": "name",
+                    "get": self.unique()},
+                view_kwargs={"pk": group.pk},
+                headers={"HTTP_IF_NONE_MATCH": self.format_etag(group.name)},
+                status_code=304)
+    
+    def test_last_modified_field(self):
+        """
+        Check that the last modified header is derived from the object's
+        field.
+        
+        """
+        user = auth_models.User.objects.create(username=self.unique()[:30])
+        self.assertViewBehavior(
+            {
+                "model": auth_models.User,
+                "condition_last_modified_field": "date_joined",
+                "get": self.unique()},
+            view_kwargs={"pk": user.pk},
+            headers={
+                "HTTP_IF_MODIFIED_SINCE": self.format_datetime(
+                    user.date_joined + datetime.timedelta(hours=1))},
+            status_code=304,
+            headers_exact={
+                "Last-Modified": self.format_datetime(user.date_joined)})
+    
+    def test_field_missing(self):
+        """
+        Check that a missing object still raises a 404.
+        
+        """
+        self.assertViewBehavior(
+            {"model": auth_models.Group, "condition_etag_field": "name"},
+            view_kwargs={"pk": 0},
+            status_code=404)
+
+
+class ConditionListViewTestCase(base.TestCase):
+    """
+    Tests for the Condition view behavior with aggregates of a ListView's
+    queryset.
+    
+    """
+    view_classes = (http.Condition, generic.ListView,)
+    
+    def test_etag_field(self):
+        """
+        Check that the ETag only changes when the object list changes, and
+        that a not modified response only queries the aggregate.
+        
+        """
+        auth_models.User.objects.create(username=self.unique()[:30])
+        content = self.unique()
+        calls = []
+        def get(self, request, *args, **kwargs):
+            calls.append(None)
+            return django_http.HttpResponse(content)
+        view = self.view(
+            model=auth_models.User, condition_etag_field="date_joined",
+            get=get)
+        etag = self.client.get(view)["ETag"]
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                self.client.get(view, HTTP_IF_NONE_MATCH=etag).status_code,
+                304)
+        auth_models.User.objects.create(username=self.unique()[:30])
+        response = self.client.get(view, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(len(calls), 2)
+    
+    def test_last_modified_field(self):
+        """
+        Check that the last modified header is the latest value of the field.
+        
+        """
+        auth_models.User.objects.create(username=self.unique()[:30])
+        latest = auth_models.User.objects.create(
+            username=self.unique()[:30])
+        content = self.unique()
+        self.assertViewBehavior(
+            {
+                "model": auth_models.User,
+                "condition_last_modified_field": "date_joined",
+                "get": content},
+            status_code=200,
+            content=content,
+            headers_exact={
+                "Last-Modified": self.format_datetime(latest.date_joined)})
+
+
+class ContentETagTestCase(base.TestCase):
+    """
+    Tests for the ContentETag view behavior.
+    
+    """
+    view_classes = (http.ContentETag, generic.View,)
+    
+    def content_etag(self, content):
+        """
+        Returns the unquoted ETag for the content.
+        
+        """
+        return hashlib.md5(content.encode("utf-8")).hexdigest()
+    
+    def test_content_etag(self):
+        """
+        Check that the ETag header is the hash of the response's content.
+        
+        """
+        content = self.unique()
+        self.assertViewBehavior(
+            {"get": content},
+            status_code=200,
+            content=content,
+            headers_exact={
+                "ETag": self.format_etag(self.content_etag(content))})
+    
+    def test_content_etag_not_modified(self):
+        """
+        Check for a not modified response with an empty body on ETag match.
+        
+        """
+        content = self.unique()
+        self.assertViewBehavior(
+            {"get": content},
+            headers={
+                "HTTP_IF_NONE_MATCH":
+                    self.format_etag(self.content_etag(content))},
+            status_code=304,
+            content="",
+            headers_exact={
+                "ETag": self.format_etag(self.content_etag(content))})
+    
+    def test_content_etag_miss(self):
+        """
+        Check that the content is sent on ETag mismatch.
+        
+        """
+        content = self.unique()
+        self.assertViewBehavior(
+            {"get": content},
+            headers={"HTTP_IF_NONE_MATCH": self.format_etag(self.unique())},
+            status_code=200,
+            content=content,
+            headers_exact={
+                "ETag": self.format_etag(self.content_etag(content))})
+    
+    def test_content_etag_template_response(self):
+        """
+        Check that template responses are hashed after they are rendered.
+        
+        """
+        content = self.unique()
+        def get(self, request, *args, **kwargs):
+            return template_response.SimpleTemplateResponse(
+                template.Template(content))
+        self.assertViewBehavior(
+            {"get": get},
+            headers={
+                "HTTP_IF_NONE_MATCH":
+                    self.format_etag(self.content_etag(content))},
+            status_code=304,
+            content="")
+    
+    def test_content_etag_streaming(self):
+        """
+        Check that the first streaming response doesn't get an ETag header,
+        but that its ETag is cached for the next responses and for the
+        version check.
+        
+        """
+        content = self.unique()
+        tag = self.unique()
+        calls = []
+        def get(self, request, *args, **kwargs):
+            calls.append(None)
+            return django_http.StreamingHttpResponse(
+                iter((content[:5], content[5:],)))
+        view = self.view(content_etag_tags=(tag,), get=get)
+        path = self.unique_path()
+        response = self.client.get(view, path=path)
+        self.assertEqual(b"".join(response.streaming_content), content)
+        self.assertFalse(response.has_header("ETag"))
+        response = self.client.get(view, path=path)
+        self.assertEqual(b"".join(response.streaming_content), content)
+        self.assertEqual(
+            response["ETag"], self.format_etag(self.content_etag(content)))
+        response = self.client.get(
+            view, path=path, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(calls), 2)
+    
+    def test_content_etag_tags(self):
+        """
+        Check that a request matching the cached ETag skips the handler until
+        a tag is invalidated.
+        
+        """
+        content = self.unique()
+        tag = self.unique()
+        calls = []
+        def get(self, request, *args, **kwargs):
+            calls.append(None)
+            return django_http.HttpResponse(content)
+        view = self.view(content_etag_tags=(tag,), get=get)
+        path = self.unique_path()
+        etag = self.client.get(view, path=path)["ETag"]
+        response = self.client.get(view, path=path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(calls), 1)
+        tags.invalidate((tag,))
+        response = self.client.get(view, path=path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(len(calls), 2)
+    
+    def test_content_etag_existing(self):
+        """
+        Check that an ETag set by the view is kept.
+        
+        """
+        content = self.unique()
+        etag = self.format_etag(self.unique())
+        def get(self, request, *args, **kwargs):
+            response = django_http.HttpResponse(content)
+            response["ETag"] = etag
+            return response
+        self.assertViewBehavior(
+            {"get": get},
+            status_code=200,
+            content=content,
+            headers_exact={"ETag": etag})
+    
+    def test_content_etag_post(self):
+        """
+        Check that the responses to POST requests are not hashed.
+        
+        """
+        content = self.unique()
+        self.assertViewBehavior(
+            {"post": content},
+            method="post",
+            status_code=200,
+            content=content,
+            headers_exclude="ETag")
+    
+    def test_content_etag_disabled(self):
+        """
+        Check that no ETag header is set when the view behavior is disabled.
+        
+        """
+        content = self.unique()
+        self.assertViewBehavior(
+            {"content_etag": False, "get": content},
+            status_code=200,
+            content=content,
+            headers_exclude="ETag")
+    
+    def test_content_etag_precedence(self):
+        """
+        Check that the default HTTP method name protection takes precedence
+        and that no ETag header is set on the response.
+        
+        """
+        self.assertViewBehavior(
+            status_code=405,
+            headers_exclude="ETag")
+
+
+class ContentETagGZipPageTestCase(base.TestCase):
+    """
+    Tests for the ContentETag view behavior combined with the GZipPage view
+    behavior.
+    
+    """
+    view_classes = (gzip.GZipPage, http.ContentETag, generic.View,)
+    
+    def test_content_etag_not_modified(self):
+        """
+        Check that the ETag of a compressed response matches when the client
+        sends it back.
+        
+        """
+        content = self.unique() * 20
+        view = self.view(get=content)
+        path = self.unique_path()
+        response = self.client.get(
+            view, path=path, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertTrue(response["ETag"].endswith(';gzip"'))
+        response = self.client.get(
+            view, path=path,
+            HTTP_ACCEPT_ENCODING="gzip",
+            HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
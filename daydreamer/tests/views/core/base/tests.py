@@ -15,6 +15,16 @@ class CoreTestCase(base.TestCase):
     """
     view_classes = core.Core
     
+    def test_as_view(self):
+        """
+        Check that the view function refers to its view class and initial
+        keyword arguments.
+        
+        """
+        view = self.view()
+        self.assertTrue(issubclass(view.view_class, core.Core))
+        self.assertEqual(view.view_initkwargs, {})
+    
     def test_attachment(self):
         """
         Check that the attachment method behaves correctly.
@@ -0,0 +1,53 @@
+from __future__ import unicode_literals
+
+from django import http
+from django.contrib.auth import models as auth_models
+
+from daydreamer.views import generic
+
+from . import base
+
+
+class DetailViewTestCase(base.TestCase):
+    """
+    Tests for the DetailView generic view.
+    
+    """
+    view_classes = generic.DetailView
+    
+    def view(self, **attrs):
+        """
+        Lists a group with a get() method that fetches the object twice and
+        responds with the group's name when both fetches return the same
+        instance.
+        
+        """
+        def get(self, request, *args, **kwargs):
+            obj = self.get_object()
+            return http.HttpResponse(
+                obj.name
+                    if obj is self.get_object()
+                    else "")
+        return super(DetailViewTestCase, self).view(
+            model=auth_models.Group, get=get, **attrs)
+    
+    def test_get_object_memoized(self):
+        """
+        Check that get_object() only queries the database once.
+        
+        """
+        group = auth_models.Group.objects.create(name=self.unique()[:80])
+        with self.assertNumQueries(1):
+            self.assertViewBehavior(
+                view_kwargs={"pk": group.pk},
+                status_code=200,
+                content=group.name)
+    
+    def test_get_object_missing(self):
+        """
+        Check that a missing object still raises a 404.
+        
+        """
+        self.assertViewBehavior(
+            view_kwargs={"pk": 0},
+            status_code=404)
@@ -1,25 +1,27 @@
-from . import auth, cache, clickjacking, csrf, http, vary
-from .auth import (LoginRequired, ActiveRequired, StaffRequired,
-    SuperuserRequired, GroupsRequired, PermissionsRequired,
-    ObjectPermissionsRequired, TestRequired,)
-from .cache import CachePage, CacheControl, NeverCache
+from . import auth, cache, clickjacking, coalesce, csrf, http, vary
+from .auth import (Authorization, LoginRequired, ActiveRequired,
+    StaffRequired, SuperuserRequired, GroupsRequired, PermissionsRequired,
+    ObjectPermissionsRequired, TestRequired, ObjectListPermissions,)
+from .cache import CachePage, CacheControl, SurrogateControl, NeverCache
 from .clickjacking import (XFrameOptionsDeny, XFrameOptionsSameOrigin,
     XFrameOptionsExempt)
+from .coalesce import CoalesceRequests
 from .csrf import CsrfProtect, RequiresCsrfToken, EnsureCsrfCookie, CsrfExempt
 from .debug import SensitiveVariables, SensitivePostParameters
-from .http import RequireGET, RequirePOST, RequireSafe, Condition
+from .http import RequireGET, RequirePOST, RequireSafe, Condition, ContentETag
 from .gzip import GZipPage
 from .vary import VaryOnHeaders, VaryOnCookie
 
 
 __all__ = (
-    "LoginRequired", "ActiveRequired", "StaffRequired", "SuperuserRequired",
-    "GroupsRequired", "PermissionsRequired", "ObjectPermissionsRequired",
-    "TestRequired",
-    "CachePage", "CacheControl", "NeverCache",
+    "Authorization", "LoginRequired", "ActiveRequired", "StaffRequired",
+    "SuperuserRequired", "GroupsRequired", "PermissionsRequired",
+    "ObjectPermissionsRequired", "TestRequired", "ObjectListPermissions",
+    "CachePage", "CacheControl", "SurrogateControl", "NeverCache",
     "XFrameOptionsDeny", "XFrameOptionsSameOrigin", "XFrameOptionsExempt",
     "CsrfProtect", "RequiresCsrfToken", "EnsureCsrfCookie", "CsrfExempt",
     "SensitiveVariables", "SensitivePostParameters",
-    "RequireGET", "RequirePOST", "RequireSafe", "Condition",
+    "RequireGET", "RequirePOST", "RequireSafe", "Condition", "ContentETag",
     "GZipPage",
-    "VaryOnHeaders", "VaryOnCookie",)
+    "VaryOnHeaders", "VaryOnCookie",
+    "CoalesceRequests",)
@@ -7,28 +7,143 @@ from django.contrib.auth import models as auth_models
 from django.core import exceptions
 from django.utils import six
 
-from .. import core
+from daydreamer.auth import permissions as auth_permissions
+from daydreamer.auth import users as auth_users
+
+from .. import core, generic
 
 
 __all__ = (
-    "LoginRequired", "ActiveRequired", "StaffRequired", "SuperuserRequired",
-    "GroupsRequired", "PermissionsRequired", "ObjectPermissionsRequired",
-    "TestRequired",)
+    "Authorization", "LoginRequired", "ActiveRequired", "StaffRequired",
+    "SuperuserRequired", "GroupsRequired", "PermissionsRequired",
+    "ObjectPermissionsRequired", "TestRequired", "ObjectListPermissions",)
 
 
-class LoginRequired(core.behaviors.Denial):
+class Authorization(core.behaviors.Denial):
+    """
+    An abstract base class for the authorization view behaviors.
+    
+    Before the deny handlers are selected, the data about the user that the
+    enabled behaviors' tests will need is loaded together in a single
+    prefetch stage by daydreamer.auth.users.prefetch() and stored for the
+    tests to share. Each behavior declares what it needs by extending the set
+    returned by get_authorization_requirements().
+    
+    If the authorization_prefetch attribute is falsy, the prefetch stage will
+    be disabled, and each test will load the data it needs on its own. Its
+    initial value is True.
+    
+    Set the authorization_user_cache attribute to True or to a cache alias to
+    load the request's user from a cached snapshot with
+    daydreamer.auth.users.get_user(), rather than from the database on every
+    request. The snapshots expire after authorization_user_cache_timeout
+    seconds, defaulting to daydreamer.auth.users.TIMEOUT when None, and are
+    invalidated when the user is saved. The initial value of
+    authorization_user_cache is None, which disables the cache.
+    
+    """
+    authorization_prefetch = True
+    authorization_user_cache = None
+    authorization_user_cache_timeout = None
+    
+    def get_authorization_prefetch(self):
+        """
+        A hook to override the authorization_prefetch value.
+        
+        The default implementation returns self.authorization_prefetch.
+        
+        """
+        return self.authorization_prefetch
+    
+    def get_authorization_user_cache(self):
+        """
+        A hook to override the authorization_user_cache value.
+        
+        The default implementation returns self.authorization_user_cache.
+        
+        """
+        return self.authorization_user_cache
+    
+    def get_authorization_user_cache_timeout(self):
+        """
+        A hook to override the authorization_user_cache_timeout value.
+        
+        The default implementation returns
+        self.authorization_user_cache_timeout, defaulting to
+        daydreamer.auth.users.TIMEOUT when None.
+        
+        """
+        return (
+            auth_users.TIMEOUT
+                if self.authorization_user_cache_timeout is None
+                else self.authorization_user_cache_timeout)
+    
+    def get_authorization_requirements(self):
+        """
+        Returns the set of names of the data to prefetch for the enabled
+        authorization tests. See daydreamer.auth.users.prefetch() for the
+        names.
+        
+        Subclasses should extend the result of super().
+        
+        """
+        return set()
+    
+    def authorization_user_stage(self):
+        """
+        A hook to override the way that the request's user is loaded.
+        
+        When the user cache is enabled, the request's user is replaced with
+        one that is loaded from the cache.
+        
+        """
+        cache = self.get_authorization_user_cache()
+        if cache:
+            auth_users.use_cached_user(
+                self.request,
+                cache=cache if cache is not True else None,
+                timeout=self.get_authorization_user_cache_timeout())
+    
+    def authorization_prefetch_stage(self):
+        """
+        A hook to override the way that the authorization data is prefetched.
+        
+        """
+        if self.get_authorization_prefetch():
+            requirements = self.get_authorization_requirements()
+            if requirements:
+                auth_users.prefetch(self.request, requirements)
+    
+    def dispatch(self, request, *args, **kwargs):
+        """
+        Runs the user and prefetch stages before deferring to super().
+        
+        """
+        self.authorization_user_stage()
+        self.authorization_prefetch_stage()
+        return super(Authorization, self).dispatch(request, *args, **kwargs)
+
+
+class LoginRequired(Authorization):
     """
     A view behavior that tests whether the user is authenticated.
     
     If the login_required attribute is falsy, the login requirement testing
     will be disabled. Its initial value is True.
     
+    If the login_required_fast_path attribute is truthy, requests without a
+    session cookie are denied as anonymous without loading the session or
+    the user. See daydreamer.auth.users.is_anonymous_request(). Its initial
+    value is True.
+    
     Set the login_required_* attributes to configure the behavior when a login
     is required in order for the user to proceed. See
     daydreamer.views.core.behaviors.Denial for the attributes' documentation.
     
     """
     login_required = True
+    login_required_fast_path = True
+    login_required_cost = 1
     login_required_raise = False
     login_required_exception = None
     login_required_message = None
@@ -47,14 +162,40 @@ class LoginRequired(core.behaviors.Denial):
         """
         return self.login_required
     
+    def get_login_required_fast_path(self):
+        """
+        A hook to override the login_required_fast_path value.
+        
+        The default implementation returns self.login_required_fast_path.
+        
+        """
+        return self.login_required_fast_path
+    
+    def get_authorization_requirements(self):
+        """
+        Requires the user when the login requirement test is enabled.
+        
+        """
+        requirements = (
+            super(LoginRequired, self).get_authorization_requirements())
+        if self.get_login_required():
+            requirements.add("user")
+        return requirements
+    
     def login_required_test(self):
         """
         A hook to override the way that the login requirement test is peformed.
         
+        When the fast path is enabled, requests that are known to be
+        anonymous fail without loading the session or the user.
+        
         """
         return (
-            not self.get_login_required() or 
-            self.request.user.is_authenticated())
+            not self.get_login_required() or (
+                not (
+                    self.get_login_required_fast_path() and
+                    auth_users.is_anonymous_request(self.request)) and
+                self.request.user.is_authenticated()))
     
     def login_required_denied(self, request, *args, **kwargs):
         """
@@ -63,6 +204,13 @@ class LoginRequired(core.behaviors.Denial):
         """
         return self.deny("login_required")
     
+    def get_denials(self):
+        """
+        Adds "login_required" to the denials.
+        
+        """
+        return ("login_required",) + super(LoginRequired, self).get_denials()
+    
     def get_deny_handler(self):
         """
         Returns self.login_required_denied when the login requirement
@@ -70,12 +218,12 @@ class LoginRequired(core.behaviors.Denial):
         
         """
         return (
-            not self.login_required_test() and
+            not self.denial_test("login_required") and
             self.login_required_denied or
             super(LoginRequired, self).get_deny_handler())
 
 
-class ActiveRequired(core.behaviors.Denial):
+class ActiveRequired(Authorization):
     """
     A view behavior that tests whether the user is active.
     
@@ -88,6 +236,7 @@ class ActiveRequired(core.behaviors.Denial):
     
     """
     active_required = True
+    active_required_cost = 1
     active_required_raise = False
     active_required_exception = None
     active_required_message = None
@@ -106,6 +255,17 @@ class ActiveRequired(core.behaviors.Denial):
         """
         return self.active_required
     
+    def get_authorization_requirements(self):
+        """
+        Requires the user when the active requirement test is enabled.
+        
+        """
+        requirements = (
+            super(ActiveRequired, self).get_authorization_requirements())
+        if self.get_active_required():
+            requirements.add("user")
+        return requirements
+    
     def active_required_test(self):
         """
         A hook to override the way that the active requirement test
@@ -123,6 +283,13 @@ class ActiveRequired(core.behaviors.Denial):
         """
         return self.deny("active_required")
     
+    def get_denials(self):
+        """
+        Adds "active_required" to the denials.
+        
+        """
+        return ("active_required",) + super(ActiveRequired, self).get_denials()
+    
     def get_deny_handler(self):
         """
         Returns self.active_required_denied when the active requirement
@@ -130,12 +297,12 @@ class ActiveRequired(core.behaviors.Denial):
         
         """
         return (
-            not self.active_required_test() and
+            not self.denial_test("active_required") and
             self.active_required_denied or
             super(ActiveRequired, self).get_deny_handler())
 
 
-class StaffRequired(core.behaviors.Denial):
+class StaffRequired(Authorization):
     """
     A view behavior that tests whether the user is a staff member.
     
@@ -148,6 +315,7 @@ class StaffRequired(core.behaviors.Denial):
     
     """
     staff_required = True
+    staff_required_cost = 1
     staff_required_raise = False
     staff_required_exception = None
     staff_required_message = None
@@ -166,6 +334,17 @@ class StaffRequired(core.behaviors.Denial):
         """
         return self.staff_required
     
+    def get_authorization_requirements(self):
+        """
+        Requires the user when the staff requirement test is enabled.
+        
+        """
+        requirements = (
+            super(StaffRequired, self).get_authorization_requirements())
+        if self.get_staff_required():
+            requirements.add("user")
+        return requirements
+    
     def staff_required_test(self):
         """
         A hook to override the way that the active requirement test
@@ -183,6 +362,13 @@ class StaffRequired(core.behaviors.Denial):
         """
         return self.deny("staff_required")
     
+    def get_denials(self):
+        """
+        Adds "staff_required" to the denials.
+        
+        """
+        return ("staff_required",) + super(StaffRequired, self).get_denials()
+    
     def get_deny_handler(self):
         """
         Returns self.staff_required_denied when the staff requirement
@@ -190,12 +376,12 @@ class StaffRequired(core.behaviors.Denial):
         
         """
         return (
-            not self.staff_required_test() and
+            not self.denial_test("staff_required") and
             self.staff_required_denied or
             super(StaffRequired, self).get_deny_handler())
 
 
-class SuperuserRequired(core.behaviors.Denial):
+class SuperuserRequired(Authorization):
     """
     A view behavior that tests whether the user is a superuser.
     
@@ -208,6 +394,7 @@ class SuperuserRequired(core.behaviors.Denial):
     
     """
     superuser_required = True
+    superuser_required_cost = 1
     superuser_required_raise = False
     superuser_required_exception = None
     superuser_required_message = None
@@ -226,6 +413,17 @@ class SuperuserRequired(core.behaviors.Denial):
         """
         return self.superuser_required
     
+    def get_authorization_requirements(self):
+        """
+        Requires the user when the superuser requirement test is enabled.
+        
+        """
+        requirements = (
+            super(SuperuserRequired, self).get_authorization_requirements())
+        if self.get_superuser_required():
+            requirements.add("user")
+        return requirements
+    
     def superuser_required_test(self):
         """
         A hook to override the way that the superuser requirement test
@@ -243,6 +441,14 @@ class SuperuserRequired(core.behaviors.Denial):
         """
         return self.deny("superuser_required")
     
+    def get_denials(self):
+        """
+        Adds "superuser_required" to the denials.
+        
+        """
+        denials = ("superuser_required",)
+        return denials + super(SuperuserRequired, self).get_denials()
+    
     def get_deny_handler(self):
         """
         Returns self.superuser_required_denied when the superuser
@@ -250,12 +456,12 @@ class SuperuserRequired(core.behaviors.Denial):
         
         """
         return (
-            not self.superuser_required_test() and
+            not self.denial_test("superuser_required") and
             self.superuser_required_denied or
             super(SuperuserRequired, self).get_deny_handler())
 
 
-class GroupsRequired(core.behaviors.Denial):
+class GroupsRequired(Authorization):
     """
     A view behavior that tests whether the user is in a set of groups.
     
@@ -274,6 +480,7 @@ class GroupsRequired(core.behaviors.Denial):
     
     """
     groups_required = None
+    groups_required_cost = 10
     groups_required_raise = False
     groups_required_exception = None
     groups_required_message = None
@@ -293,8 +500,12 @@ class GroupsRequired(core.behaviors.Denial):
         django.contrib.auth.models.Group object, a ValueError will be raised.
         If any group names do not exist in the database, a
         django.core.exceptions.ImproperlyConfigured exception will be raised.
+        The primary keys are memoized for the request.
         
         """
+        if hasattr(self, "_groups_required"):
+            return self._groups_required
+        
         # Normalize single instances to tuples.
         groups = self.groups_required or set()
         if isinstance(groups, six.string_types + (auth_models.Group,)):
@@ -333,19 +544,35 @@ class GroupsRequired(core.behaviors.Denial):
             
             # Gather all the groups' primary keys.
             groups = resolved_groups | set(group.pk for group in actual_groups)
+        self._groups_required = groups
         return groups
     
+    def get_authorization_requirements(self):
+        """
+        Requires the user's groups when the groups requirement test is
+        enabled.
+        
+        """
+        requirements = (
+            super(GroupsRequired, self).get_authorization_requirements())
+        if self.get_groups_required():
+            requirements.add("groups")
+        return requirements
+    
     def groups_required_test(self):
         """
         A hook to override the way that the groups requirement test
         is performed.
         
+        The test is performed against the primary keys of the user's groups
+        from daydreamer.auth.users.get_group_ids(), which are shared by all
+        of the tests for the request.
+        
         """
         groups = self.get_groups_required()
         return (
             not groups or
-            self.request.user.groups.filter(
-                pk__in=groups).count() == len(groups))
+            groups <= auth_users.get_group_ids(self.request))
     
     def groups_required_denied(self, request, *args, **kwargs):
         """
@@ -354,6 +581,13 @@ class GroupsRequired(core.behaviors.Denial):
         """
         return self.deny("groups_required")
     
+    def get_denials(self):
+        """
+        Adds "groups_required" to the denials.
+        
+        """
+        return ("groups_required",) + super(GroupsRequired, self).get_denials()
+    
     def get_deny_handler(self):
         """
         Returns self.groups_required_denied when the groups
@@ -361,12 +595,12 @@ class GroupsRequired(core.behaviors.Denial):
         
         """
         return (
-            not self.groups_required_test() and
+            not self.denial_test("groups_required") and
             self.groups_required_denied or
             super(GroupsRequired, self).get_deny_handler())
 
 
-class PermissionsRequired(core.behaviors.Denial):
+class PermissionsRequired(Authorization):
     """
     A view behavior that tests whether the user has a set
     of permissions.
@@ -380,8 +614,16 @@ class PermissionsRequired(core.behaviors.Denial):
     permissions are required in order for the user to proceed.
     See daydreamer.views.core.behaviors.Denial for the attributes' documentation.
     
+    Set the permissions_required_cache attribute to True or to a cache alias
+    to test the permissions against the user's permission set from
+    daydreamer.auth.permissions, which is shared across requests and
+    invalidated when the user's permissions or groups change. Its initial
+    value is None, which disables the cache.
+    
     """
     permissions_required = None
+    permissions_required_cache = None
+    permissions_required_cost = 10
     permissions_required_raise = False
     permissions_required_exception = None
     permissions_required_message = None
@@ -420,16 +662,46 @@ class PermissionsRequired(core.behaviors.Denial):
         
         return permissions
     
+    def get_permissions_required_cache(self):
+        """
+        A hook to override the permissions_required_cache value.
+        
+        The default implementation returns self.permissions_required_cache.
+        
+        """
+        return self.permissions_required_cache
+    
+    def get_authorization_requirements(self):
+        """
+        Requires the user's permissions when the permissions requirement test
+        is enabled and the permissions cache is disabled.
+        
+        """
+        requirements = (
+            super(PermissionsRequired, self).get_authorization_requirements())
+        if (self.get_permissions_required() and
+            not self.get_permissions_required_cache()):
+            requirements.add("permissions")
+        return requirements
+    
     def permissions_required_test(self):
         """
         A hook to override the way that the permissions requirement test
         is performed.
         
+        When the permissions cache is enabled, the test is performed against
+        the cached permission set.
+        
         """
         permissions = self.get_permissions_required()
+        cache = self.get_permissions_required_cache()
         return (
-            not permissions or
-            self.request.user.has_perms(permissions))
+            not permissions or (
+                auth_permissions.has_perms(
+                    self.request.user, permissions,
+                    cache=cache if cache is not True else None)
+                if cache
+                else self.request.user.has_perms(permissions)))
     
     def permissions_required_denied(self, request, *args, **kwargs):
         """
@@ -438,6 +710,14 @@ class PermissionsRequired(core.behaviors.Denial):
         """
         return self.deny("permissions_required")
     
+    def get_denials(self):
+        """
+        Adds "permissions_required" to the denials.
+        
+        """
+        denials = ("permissions_required",)
+        return denials + super(PermissionsRequired, self).get_denials()
+    
     def get_deny_handler(self):
         """
         Returns self.permissions_required_denied when the permissions
@@ -445,12 +725,12 @@ class PermissionsRequired(core.behaviors.Denial):
         
         """
         return (
-            not self.permissions_required_test() and
+            not self.denial_test("permissions_required") and
             self.permissions_required_denied or
             super(PermissionsRequired, self).get_deny_handler())
 
 
-class ObjectPermissionsRequired(core.behaviors.Denial):
+class ObjectPermissionsRequired(Authorization):
     """
     A view behavior that tests whether the user has a set of permissions
     for a particular object.
@@ -463,14 +743,27 @@ class ObjectPermissionsRequired(core.behaviors.Denial):
     object_permissions_required_object attribute will typically be implemented
     as a property that returns some object retrieved from the database.
     
+    When combined with one of the single object generic views from
+    daydreamer.views.generic, implement object_permissions_required_object as
+    a property that returns self.get_object(). The generic views memoize
+    get_object(), so the object is only fetched once per request.
+    
     Set the object_permissions_required_* attributes to configure the behavior
     when permissions are required for an object in order for the user to
     proceed. See daydreamer.views.core.behaviors.Denial for the
     attributes' documentation.
     
+    Set the object_permissions_required_cache attribute to True or to a cache
+    alias to test the permissions against the user's cached permission set
+    for the object. See PermissionsRequired for details. Object permission
+    backends must call daydreamer.auth.permissions.invalidate_object() when
+    they change an object's permissions.
+    
     """
     object_permissions_required = None
     object_permissions_required_object = None
+    object_permissions_required_cache = None
+    object_permissions_required_cost = 20
     object_permissions_required_raise = False
     object_permissions_required_exception = None
     object_permissions_required_message = None
@@ -518,17 +811,48 @@ class ObjectPermissionsRequired(core.behaviors.Denial):
         """
         return self.object_permissions_required_object
     
+    def get_object_permissions_required_cache(self):
+        """
+        A hook to override the object_permissions_required_cache value.
+        
+        The default implementation returns
+        self.object_permissions_required_cache.
+        
+        """
+        return self.object_permissions_required_cache
+    
+    def get_authorization_requirements(self):
+        """
+        Requires the user when the object permissions requirement test is
+        enabled.
+        
+        """
+        requirements = (
+            super(ObjectPermissionsRequired, self)
+                .get_authorization_requirements())
+        if self.get_object_permissions_required():
+            requirements.add("user")
+        return requirements
+    
     def object_permissions_required_test(self):
         """
         A hook to override the way that the object permissions requirement test
         is performed.
         
+        When the permissions cache is enabled, the test is performed against
+        the cached permission set for the object.
+        
         """
         permissions = self.get_object_permissions_required()
         obj = self.get_object_permissions_required_object()
+        cache = self.get_object_permissions_required_cache()
         return (
-            (not all((permissions, obj,))) or
-            self.request.user.has_perms(permissions, obj=obj))
+            (not all((permissions, obj,))) or (
+                auth_permissions.has_perms(
+                    self.request.user, permissions, obj=obj,
+                    cache=cache if cache is not True else None)
+                if cache
+                else self.request.user.has_perms(permissions, obj=obj)))
     
     def object_permissions_required_denied(self, request, *args, **kwargs):
         """
@@ -537,6 +861,14 @@ class ObjectPermissionsRequired(core.behaviors.Denial):
         """
         return self.deny("object_permissions_required")
     
+    def get_denials(self):
+        """
+        Adds "object_permissions_required" to the denials.
+        
+        """
+        denials = ("object_permissions_required",)
+        return denials + super(ObjectPermissionsRequired, self).get_denials()
+    
     def get_deny_handler(self):
         """
         Returns self.object_permissions_required_denied when the object
@@ -544,12 +876,12 @@ class ObjectPermissionsRequired(core.behaviors.Denial):
         
         """
         return (
-            not self.object_permissions_required_test() and
+            not self.denial_test("object_permissions_required") and
             self.object_permissions_required_denied or
             super(ObjectPermissionsRequired, self).get_deny_handler())
 
 
-class TestRequired(core.behaviors.Denial):
+class TestRequired(Authorization):
     """
     A view behavior that performs a test against the current request,
     typically a predicate for self.request.user.
@@ -563,6 +895,7 @@ class TestRequired(core.behaviors.Denial):
     
     """
     test_required = None
+    test_required_cost = 100
     test_required_raise = False
     test_required_exception = None
     test_required_message = None
@@ -598,6 +931,13 @@ class TestRequired(core.behaviors.Denial):
         """
         return self.deny("test_required")
     
+    def get_denials(self):
+        """
+        Adds "test_required" to the denials.
+        
+        """
+        return ("test_required",) + super(TestRequired, self).get_denials()
+    
     def get_deny_handler(self):
         """
         Returns self.test_required_denied when the test requirement fails,
@@ -605,6 +945,122 @@ class TestRequired(core.behaviors.Denial):
         
         """
         return (
-            not self.test_required_test() and
+            not self.denial_test("test_required") and
             self.test_required_denied or
             super(TestRequired, self).get_deny_handler())
+
+
+class ObjectListPermissions(generic.View):
+    """
+    A view behavior for list views, such as
+    daydreamer.views.generic.ListView, that checks the user's permissions
+    for all of the listed objects with batched permission lookups, rather
+    than with one lookup per object.
+    
+    Set the object_list_permissions attribute to a permission name or an
+    iterable of permission names to enable the behavior. Its initial value
+    is None, which disables the behavior.
+    
+    By default, each object on the current page of the context's object_list
+    is annotated with an attribute named by object_list_permissions_name,
+    which is True when the user has all of the permissions for the object.
+    Set the object_list_permissions_filter attribute to a truthy value to
+    filter the view's queryset down to the permitted objects instead. Note
+    that filtering evaluates the whole queryset.
+    
+    The permissions are checked by daydreamer.auth.permissions.get_permitted().
+    Authentication backends should implement the batched lookup protocol
+    described by daydreamer.auth.backends.ObjectPermissionBackend.
+    
+    """
+    object_list_permissions = None
+    object_list_permissions_filter = False
+    object_list_permissions_name = "permitted"
+    
+    def get_object_list_permissions(self):
+        """
+        A hook to override the object_list_permissions value.
+        
+        The default implementation returns the value of
+        self.object_list_permissions, where a single value is normalized as
+        a tuple. If any value in object_list_permissions is not a
+        permission name, a ValueError will be raised.
+        
+        """
+        # Normalize single values to a tuple.
+        permissions = self.object_list_permissions or ()
+        if isinstance(permissions, six.string_types):
+            permissions = (permissions,)
+        elif not isinstance(permissions, collections.Iterable):
+            raise ValueError(
+                "The object_list_permissions value is neither a "
+                "permission name nor an iterable of permission names.")
+        
+        # Sanity check.
+        if (permissions and
+            any(not isinstance(permission, six.string_types)
+                for permission in permissions)):
+            raise ValueError(
+                "One or more values in object_list_permissions is not a "
+                "permission name.")
+        return permissions
+    
+    def get_object_list_permissions_filter(self):
+        """
+        A hook to override the object_list_permissions_filter value.
+        
+        The default implementation returns
+        self.object_list_permissions_filter.
+        
+        """
+        return self.object_list_permissions_filter
+    
+    def get_object_list_permissions_name(self):
+        """
+        A hook to override the object_list_permissions_name value.
+        
+        The default implementation returns self.object_list_permissions_name.
+        
+        """
+        return self.object_list_permissions_name
+    
+    def get_queryset(self):
+        """
+        When filtering is enabled, filters the base queryset down to the
+        objects for which the user has the permissions.
+        
+        Querysets are filtered by primary key, so that they remain querysets.
+        Other iterables are filtered into lists.
+        
+        """
+        queryset = super(ObjectListPermissions, self).get_queryset()
+        permissions = self.get_object_list_permissions()
+        if permissions and self.get_object_list_permissions_filter():
+            if hasattr(queryset, "filter"):
+                queryset = queryset.filter(
+                    pk__in=auth_permissions.get_permitted(
+                        self.request.user, permissions, queryset))
+            else:
+                queryset = auth_permissions.filter_objects(
+                    self.request.user, permissions, queryset)
+        return queryset
+    
+    def get_context_data(self, **kwargs):
+        """
+        When filtering is disabled, annotates the objects on the current page
+        of the context's object_list.
+        
+        The object_list is evaluated in place, so that the annotated objects
+        are the ones that will be rendered.
+        
+        """
+        context = super(ObjectListPermissions, self).get_context_data(
+            **kwargs)
+        permissions = self.get_object_list_permissions()
+        if (permissions and
+            not self.get_object_list_permissions_filter() and
+            context.get("object_list") is not None):
+            auth_permissions.annotate_objects(
+                self.request.user, permissions, context["object_list"],
+                self.get_object_list_permissions_name())
+        return context
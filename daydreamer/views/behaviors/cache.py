@@ -1,12 +1,34 @@
 from __future__ import unicode_literals
 
+import copy
+import functools
+import hashlib
+import math
+import random
+import time
+
+from django import http
+from django.conf import settings
+from django.core import cache as caches
+from django.utils import cache as cache_utils, encoding
 from django.utils.decorators import classonlymethod
 from django.views.decorators import cache
 
+from daydreamer.core import caches as daydreamer_caches
+from daydreamer.core import (
+    compression, datastructures, etags, locks, stats, surrogates,
+    urlresolvers, workers,)
+
 from .. import core
+from . import gzip
+
+
+__all__ = ("CachePage", "CacheControl", "SurrogateControl", "NeverCache",)
 
 
-__all__ = ("CachePage", "CacheControl", "NeverCache",)
+# The number of seconds between checks for a fresh response while waiting for
+# another request to regenerate it.
+POLL_INTERVAL = 0.05
 
 
 class CachePage(core.http.HttpMethodAllow):
@@ -14,13 +36,105 @@ class CachePage(core.http.HttpMethodAllow):
     A view behavior that caches the response during the allow phase of
     the dispatch.
     
-    See the django.views.decorators.cache.cache_page() decorator for details.
+    The caching follows the django.views.decorators.cache.cache_page()
+    decorator: only successful GET and HEAD responses are cached, keyed by
+    the request's URL and the headers named by the response's Vary header.
+    The timeout is taken from the response's Cache-Control max-age when it is
+    set, falling back to cache_page_timeout and then to the cache's default
+    timeout. When settings.CACHE_MIDDLEWARE_ANONYMOUS_ONLY is True, responses
+    to authenticated users who have accessed the session are not cached.
+    Responses that set cookies are never cached, so that one visitor's
+    cookies are never served to another.
+    
+    Set the cache_page_stale_timeout attribute to a number of seconds to
+    serve expired responses for that long after they expire while a single
+    background worker regenerates them with a copy of the view. Its initial
+    value is None, which disables serving stale responses.
+    
+    Set the cache_page_lock_timeout attribute to a number of seconds to
+    regenerate each response in a single request at a time across all of the
+    processes sharing the cache. The request holding the lock regenerates the
+    response, for at most that many seconds, while the other requests serve
+    the stale response when there is one, or wait for up to
+    cache_page_lock_wait seconds for the fresh response before regenerating
+    it themselves. They stop waiting early when the lock is released without
+    a fresh response. The initial value of cache_page_lock_wait is None,
+    which waits for up to cache_page_lock_timeout seconds.
+    
+    Set the cache_page_early_recompute attribute to a positive number to
+    regenerate fresh responses early with a probability that grows as they
+    approach expiry and with the time that they took to generate. Larger
+    values regenerate earlier. A value of 1 is a reasonable start.
+    
+    Set the cache_page_local_size attribute to a number of responses to keep
+    the most recently used responses of the view class in process memory, in
+    front of the cache, for up to cache_page_local_timeout seconds. The
+    "local_hits", "local_misses", "shared_hits" and "shared_misses" of the
+    lookups are counted in the view class' stats.
+    
+    Set the cache_page_tags attribute, or override get_cache_page_tags(), to
+    tag the cached responses with tag strings, model instances or model
+    classes, e.g. the objects that the response displays. Calling
+    daydreamer.core.tags.invalidate() with any of the tags discards all of
+    the responses carrying it. The tags are read after the response has been
+    generated, so get_cache_page_tags() may use the objects that the view
+    has loaded. The tags' generations are read with
+    daydreamer.core.etags.get_generations(), which keeps them in the
+    process' memory for cache_page_tags_local_timeout seconds in front of
+    the default cache, so a hit doesn't cost a cache round trip for the
+    tags. Invalidations made by other processes may go unnoticed for that
+    long. The generations are always kept in the default cache, where
+    invalidate() and the model signal receivers bump them, even when the
+    responses are stored in another cache_page_cache.
+    
+    Override get_cache_page_variant() to key the cached responses by the
+    request's URL and a variant computed from the request, such as whether
+    the user is authenticated, instead of by the headers named in the
+    response's Vary header. Requests with equal variants share the cached
+    responses, so the variant must capture everything that the response
+    depends on. The Vary header, such as the Cookie value added by
+    VaryOnCookie, is ignored for the cache keys but still sent to downstream
+    caches. The initial value of cache_page_variant is None, which keys the
+    responses like the decorator does.
+    
+    Set the cache_page_compress attribute to a number of bytes to store the
+    content of responses at least that long compressed in the gzip format.
+    When the view is also a GZipPage and the client accepts gzip, the
+    compressed content is served as is, rather than being decompressed and
+    compressed again.
+    
+    Set the cache_page_normalize_query attribute to True to key the cached
+    responses by a canonical version of the query string, in which the
+    parameters are sorted and consistently encoded, and the parameters whose
+    names match any of the fnmatch-style patterns in cache_page_query_ignore,
+    such as "utm_*", are dropped. The view must not depend on the order of
+    the parameters or on the ignored parameters.
+    
+    The warm_cache_pages management command requests the pages of the
+    CachePage views in the URLconf to fill the cache. It reverses each view's
+    URL with each of the dictionaries of keyword arguments in
+    cache_page_warm_kwargs. The initial value warms views whose URLs take no
+    arguments. Override get_cache_page_warm_kwargs() to list the arguments
+    for other views, keeping in mind that the view has no request then.
     
     """
     cache_page = True
     cache_page_timeout = None
     cache_page_cache = None
     cache_page_key_prefix = None
+    cache_page_stale_timeout = None
+    cache_page_lock_timeout = None
+    cache_page_lock_wait = None
+    cache_page_early_recompute = None
+    cache_page_local_size = None
+    cache_page_local_timeout = 5
+    cache_page_tags = None
+    cache_page_tags_local_timeout = etags.LOCAL_TIMEOUT
+    cache_page_variant = None
+    cache_page_compress = None
+    cache_page_normalize_query = False
+    cache_page_query_ignore = ()
+    cache_page_warm_kwargs = ({},)
     
     def get_cache_page(self):
         """
@@ -50,18 +164,538 @@ class CachePage(core.http.HttpMethodAllow):
         """
         return self.cache_page_key_prefix
     
+    def get_cache_page_stale_timeout(self):
+        """
+        A hook to override the cache_page_stale_timeout value.
+        
+        """
+        return self.cache_page_stale_timeout
+    
+    def get_cache_page_lock_timeout(self):
+        """
+        A hook to override the cache_page_lock_timeout value.
+        
+        """
+        return self.cache_page_lock_timeout
+    
+    def get_cache_page_lock_wait(self):
+        """
+        A hook to override the cache_page_lock_wait value.
+        
+        """
+        return self.cache_page_lock_wait
+    
+    def get_cache_page_early_recompute(self):
+        """
+        A hook to override the cache_page_early_recompute value.
+        
+        """
+        return self.cache_page_early_recompute
+    
+    def get_cache_page_local_size(self):
+        """
+        A hook to override the cache_page_local_size value.
+        
+        """
+        return self.cache_page_local_size
+    
+    def get_cache_page_local_timeout(self):
+        """
+        A hook to override the cache_page_local_timeout value.
+        
+        """
+        return self.cache_page_local_timeout
+    
+    def get_cache_page_tags(self):
+        """
+        A hook to override the cache_page_tags value.
+        
+        """
+        return self.cache_page_tags
+    
+    def get_cache_page_tags_local_timeout(self):
+        """
+        A hook to override the cache_page_tags_local_timeout value.
+        
+        """
+        return self.cache_page_tags_local_timeout
+    
+    def get_cache_page_variant(self):
+        """
+        A hook to override the cache_page_variant value.
+        
+        """
+        return self.cache_page_variant
+    
+    def get_cache_page_compress(self):
+        """
+        A hook to override the cache_page_compress value.
+        
+        """
+        return self.cache_page_compress
+    
+    def get_cache_page_normalize_query(self):
+        """
+        A hook to override the cache_page_normalize_query value.
+        
+        """
+        return self.cache_page_normalize_query
+    
+    def get_cache_page_query_ignore(self):
+        """
+        A hook to override the cache_page_query_ignore value.
+        
+        """
+        return self.cache_page_query_ignore
+    
+    def get_cache_page_warm_kwargs(self):
+        """
+        A hook to override the cache_page_warm_kwargs value.
+        
+        """
+        return self.cache_page_warm_kwargs
+    
+    # Cache access.
+    def cache_page_backend(self):
+        """
+        Returns the cache named by cache_page_cache, defaulting to Django's
+        default cache.
+        
+        """
+        return caches.get_cache(
+            self.get_cache_page_cache() or caches.DEFAULT_CACHE_ALIAS)
+    
+    def cache_page_stats(self):
+        """
+        Returns the process-wide stats for the view class' cached responses.
+        
+        The stats count the responses that were served fresh from the cache
+        as "hits", stale from the cache as "stale", and after generating them
+        as "misses", as well as the "revalidations" of stale responses and
+        the "lock_waits" for other requests to generate responses. The time
+        spent generating responses and waiting for locks is observed as
+        "generate" and "lock_wait".
+        
+        """
+        return stats.get_view_stats("cache_page", type(self))
+    
+    def cache_page_record(self, name):
+        """
+        Increments the named counter of cache_page_stats() and publishes the
+        process' stats when they are due.
+        
+        """
+        self.cache_page_stats().incr(name)
+        stats.publish_due()
+    
+    def cache_page_local(self):
+        """
+        Returns the view class' in-process cache of responses, creating it
+        when it doesn't exist, or None when cache_page_local_size is falsy.
+        
+        """
+        size = self.get_cache_page_local_size()
+        if not size:
+            return None
+        cls = type(self)
+        local = cls.__dict__.get("_cache_page_local")
+        if local is None:
+            local = datastructures.LRUCache(
+                size=size, timeout=self.get_cache_page_local_timeout())
+            cls._cache_page_local = local
+        return local
+    
+    def cache_page_entries(self):
+        """
+        Returns the cache for storing responses, which is the in-process
+        cache in front of cache_page_backend() when cache_page_local_size is
+        truthy and cache_page_backend() otherwise.
+        
+        """
+        backend = self.cache_page_backend()
+        local = self.cache_page_local()
+        return (
+            daydreamer_caches.TieredCache(
+                local, backend, stats=self.cache_page_stats())
+                if local is not None
+                else backend)
+    
+    def cache_page_pack(self, response, timeout):
+        """
+        Returns a cache entry for the response, which expires after
+        timeout seconds. The entry records how long the response took to
+        generate for early recomputation and the current generations of
+        its tags. Its content is compressed when it is at least
+        cache_page_compress bytes long and compressing makes it shorter.
+        
+        """
+        now = time.time()
+        content = response.content
+        content_encoding = None
+        threshold = self.get_cache_page_compress()
+        if threshold is not None and len(content) >= threshold:
+            compressed = compression.compress(content)
+            if len(compressed) < len(content):
+                content = compressed
+                content_encoding = "gzip"
+        return {
+            "status": response.status_code,
+            "headers": list(response.items()),
+            "content": content,
+            "encoding": content_encoding,
+            "expires": now + timeout,
+            "delta": now - getattr(self, "_cache_page_started", now),
+            "tags": etags.get_generations(
+                self.get_cache_page_tags(),
+                local_timeout=self.get_cache_page_tags_local_timeout())}
+    
+    def cache_page_unpack(self, request, entry):
+        """
+        Returns a response to the request built from a cache entry.
+        
+        Compressed content is served compressed when the view is a GZipPage
+        that would gzip the response, and is decompressed otherwise.
+        
+        """
+        response = http.HttpResponse(status=entry["status"])
+        for header, value in entry["headers"]:
+            response[header] = value
+        content = entry["content"]
+        if entry.get("encoding") == "gzip":
+            if (isinstance(self, gzip.GZipPage) and
+                self.gzip_page and
+                compression.accepts_gzip(request, response)):
+                compression.encode_response(response, content)
+                return response
+            content = compression.decompress(content)
+        response.content = content
+        return response
+    
+    def cache_page_normalize(self, request):
+        """
+        Returns the request to build cache keys from, which is a copy of the
+        request with a normalized query string when cache_page_normalize_query
+        is truthy.
+        
+        """
+        if not self.get_cache_page_normalize_query():
+            return request
+        normalized = copy.copy(request)
+        normalized.META = dict(
+            request.META,
+            QUERY_STRING=urlresolvers.normalize_query(
+                request.META.get("QUERY_STRING", ""),
+                ignore=self.get_cache_page_query_ignore()))
+        return normalized
+    
+    def cache_page_url_hash(self, request):
+        """
+        Returns a hash of the request's absolute URL for use in cache keys.
+        
+        """
+        return hashlib.md5(
+            encoding.iri_to_uri(
+                request.build_absolute_uri()).encode("utf-8")).hexdigest()
+    
+    def cache_page_key(self, request, method, cache):
+        """
+        Returns the cache key of the response to the request for the method,
+        or None when it is not known yet.
+        
+        The key is built from the request's URL and the variant when
+        get_cache_page_variant() returns a value other than None, and is
+        learned from the response's Vary header otherwise.
+        
+        """
+        request = self.cache_page_normalize(request)
+        key_prefix = self.get_cache_page_key_prefix() or ""
+        variant = self.get_cache_page_variant()
+        if variant is None:
+            return cache_utils.get_cache_key(
+                request, key_prefix, method, cache=cache)
+        return ".".join((
+            "daydreamer.views.behaviors.cache.variant", key_prefix, method,
+            self.cache_page_url_hash(request),
+            hashlib.md5(encoding.force_bytes(variant)).hexdigest(),))
+    
+    def cache_page_fetch(self, request):
+        """
+        Returns a tuple of the cache key and the cache entry for the request.
+        Either value is None when it is not available.
+        
+        Like Django's cache middleware, HEAD requests fall back to the
+        entries for HEAD requests when no entry for a GET request exists.
+        
+        """
+        cache = self.cache_page_entries()
+        key = self.cache_page_key(request, "GET", cache)
+        entry = cache.get(key) if key is not None else None
+        if entry is None and request.method == "HEAD":
+            key = self.cache_page_key(request, "HEAD", cache)
+            entry = cache.get(key) if key is not None else None
+        if entry is not None and not self.cache_page_current(entry):
+            entry = None
+        return key, entry
+    
+    def cache_page_current(self, entry):
+        """
+        Returns False when any of the cache entry's tags has been invalidated
+        since the entry was stored.
+        
+        """
+        generations = entry.get("tags")
+        return not generations or generations == etags.get_generations(
+            generations,
+            local_timeout=self.get_cache_page_tags_local_timeout())
+    
+    def cache_page_store(self, request, response):
+        """
+        Stores the response in the cache when it is cacheable, patching its
+        Expires, Last-Modified, ETag and Cache-Control headers like Django's
+        cache middleware. Responses that set cookies are never cached.
+        
+        """
+        if response.streaming or response.status_code != 200:
+            return
+        if response.cookies:
+            # The cookies, such as the session and CSRF cookies, belong to
+            # the visitor that the response was generated for.
+            return
+        if (getattr(settings, "CACHE_MIDDLEWARE_ANONYMOUS_ONLY", False) and
+            getattr(getattr(request, "session", None), "accessed", False) and
+            request.user.is_authenticated()):
+            return
+        cache = self.cache_page_entries()
+        timeout = cache_utils.get_max_age(response)
+        if timeout is None:
+            timeout = self.get_cache_page_timeout()
+            if timeout is None:
+                timeout = cache.default_timeout
+        elif timeout == 0:
+            return
+        variant = self.get_cache_page_variant()
+        cache_utils.patch_response_headers(response, timeout)
+        if timeout:
+            cache_timeout = (
+                timeout + (self.get_cache_page_stale_timeout() or 0))
+            key = (
+                cache_utils.learn_cache_key(
+                    self.cache_page_normalize(request), response,
+                    cache_timeout,
+                    self.get_cache_page_key_prefix() or "", cache=cache)
+                    if variant is None
+                    else self.cache_page_key(request, request.method, cache))
+            cache.set(
+                key, self.cache_page_pack(response, timeout), cache_timeout)
+    
+    def cache_page_expired(self, entry):
+        """
+        Returns True when the cache entry has expired, or when it should be
+        regenerated early according to cache_page_early_recompute.
+        
+        """
+        now = time.time()
+        beta = self.get_cache_page_early_recompute()
+        if beta:
+            # Move the time forward by a random amount that is proportional
+            # to the time that the response took to generate.
+            now -= entry.get("delta", 0) * beta * math.log(
+                1.0 - random.random())
+        return entry["expires"] <= now
+    
+    # Single-flight regeneration.
+    def cache_page_lock_name(self, request):
+        """
+        Returns the name of the lock for regenerating the response to
+        the request.
+        
+        """
+        return ".".join((
+            "cache_page",
+            self.cache_page_url_hash(self.cache_page_normalize(request)),))
+    
+    def cache_page_lock(self, request):
+        """
+        Returns a token for the lock to regenerate the response to the request
+        when locking is enabled and the lock was acquired, True when locking
+        is disabled, or None when another request holds the lock.
+        
+        """
+        timeout = self.get_cache_page_lock_timeout()
+        if not timeout:
+            return True
+        return locks.acquire(
+            self.cache_page_lock_name(request), timeout,
+            cache=self.cache_page_backend())
+    
+    def cache_page_unlock(self, request, token):
+        """
+        Releases the lock returned by cache_page_lock().
+        
+        """
+        if token is not True and token is not None:
+            locks.release(
+                self.cache_page_lock_name(request), token,
+                cache=self.cache_page_backend())
+    
+    def cache_page_wait(self, request):
+        """
+        Waits for up to cache_page_lock_wait seconds, defaulting to
+        cache_page_lock_timeout, for another request to store a fresh
+        response for the request. Returns the fresh cache entry, or None when
+        the time runs out or when the lock is released without one.
+        
+        """
+        wait = self.get_cache_page_lock_wait()
+        if wait is None:
+            wait = self.get_cache_page_lock_timeout()
+        if not wait or wait <= 0:
+            return None
+        started = time.time()
+        deadline = started + wait
+        entry = None
+        while entry is None and time.time() < deadline:
+            time.sleep(POLL_INTERVAL)
+            entry = self.cache_page_fetch(request)[1]
+            if entry is not None and entry["expires"] <= time.time():
+                entry = None
+            if entry is None and not locks.is_locked(
+                    self.cache_page_lock_name(request),
+                    cache=self.cache_page_backend()):
+                # The request holding the lock failed to store a response.
+                break
+        self.cache_page_record("lock_waits")
+        self.cache_page_stats().observe("lock_wait", time.time() - started)
+        return entry
+    
+    def cache_page_generate(self, handler, request, token, *args, **kwargs):
+        """
+        Returns the handler's response and caches it, after rendering when
+        the response is a template response. Releases the lock token once
+        the response has been cached.
+        
+        """
+        def store(response):
+            try:
+                self.cache_page_stats().observe(
+                    "generate", time.time() - self._cache_page_started)
+                self.cache_page_store(request, response)
+            finally:
+                self.cache_page_unlock(request, token)
+        self._cache_page_started = time.time()
+        try:
+            response = handler(request, *args, **kwargs)
+        except:
+            self.cache_page_unlock(request, token)
+            raise
+        if hasattr(response, "render") and callable(response.render):
+            response.add_post_render_callback(store)
+        else:
+            store(response)
+        return response
+    
+    # Stale response regeneration.
+    def cache_page_revalidate(self, request, *args, **kwargs):
+        """
+        Regenerates the response for the request with a copy of the view in
+        its initial state and stores it in the cache. The copy is dispatched
+        normally, so the deny phase is repeated before the response is
+        regenerated. Nothing is done when another request holds the lock
+        for regenerating the response.
+        
+        """
+        token = self.cache_page_lock(request)
+        if token is None:
+            return
+        self.cache_page_record("revalidations")
+        view = type(self).__new__(type(self))
+        view.__dict__.update(self._cache_page_initial)
+        view.request = request
+        view.args = args
+        view.kwargs = kwargs
+        view._cache_page_revalidate = token
+        try:
+            response = view.dispatch(request, *args, **kwargs)
+        except:
+            self.cache_page_unlock(request, token)
+            raise
+        if (hasattr(response, "render") and
+            callable(response.render) and
+            not response.is_rendered):
+            response.render()
+        # The lock is still held when the deny phase handled the request.
+        self.cache_page_unlock(request, token)
+    
+    def cache_page_schedule(self, key, request, *args, **kwargs):
+        """
+        Schedules the regeneration of a stale response with the background
+        worker. Requests for the same cache key are scheduled only once.
+        
+        """
+        workers.worker.submit(
+            key, self.cache_page_revalidate, copy.copy(request),
+            *args, **kwargs)
+    
+    def cache_page_respond(self, handler, request, *args, **kwargs):
+        """
+        Returns the cached response for the request when a fresh one is
+        available. Within the stale timeout of an expired response, returns
+        the expired response and schedules its regeneration. Otherwise,
+        regenerates the response with cache_page_generate(), unless another
+        request holds the lock for regenerating it, in which case the stale
+        response or the fresh response that appears while waiting is returned.
+        
+        """
+        if request.method not in ("GET", "HEAD",):
+            return handler(request, *args, **kwargs)
+        revalidate = getattr(self, "_cache_page_revalidate", None)
+        if revalidate is not None:
+            return self.cache_page_generate(
+                handler, request, revalidate, *args, **kwargs)
+        key, entry = self.cache_page_fetch(request)
+        if entry is not None:
+            if not self.cache_page_expired(entry):
+                self.cache_page_record("hits")
+                return self.cache_page_unpack(request, entry)
+            if self.get_cache_page_stale_timeout():
+                self.cache_page_schedule(key, request, *args, **kwargs)
+                self.cache_page_record("stale")
+                return self.cache_page_unpack(request, entry)
+            if entry["expires"] <= time.time():
+                # Without a stale timeout, expired entries are not served.
+                entry = None
+        token = self.cache_page_lock(request)
+        if token is None:
+            if entry is not None:
+                # The entry is due for early recomputation, but it is fresh.
+                self.cache_page_record("hits")
+                return self.cache_page_unpack(request, entry)
+            entry = self.cache_page_wait(request)
+            if entry is not None:
+                self.cache_page_record("hits")
+                return self.cache_page_unpack(request, entry)
+        self.cache_page_record("misses")
+        return self.cache_page_generate(
+            handler, request, token, *args, **kwargs)
+    
+    def dispatch(self, request, *args, **kwargs):
+        """
+        Remembers the view's initial state for regenerating stale responses
+        before deferring to super().
+        
+        """
+        self._cache_page_initial = dict(self.__dict__)
+        return super(CachePage, self).dispatch(request, *args, **kwargs)
+    
     def get_allow_handler(self):
         """
-        When cache_page is truthy, wraps the base handler in the
-        django.views.decorators.cache.cache_page() decorator.
+        When cache_page is truthy, wraps the base handler with
+        cache_page_respond().
         
         """
         allow = super(CachePage, self).get_allow_handler()
         if self.get_cache_page():
-            allow = cache.cache_page(
-                self.get_cache_page_timeout(),
-                cache=self.get_cache_page_cache(),
-                key_prefix=self.get_cache_page_key_prefix())(allow)
+            allow = functools.partial(self.cache_page_respond, allow)
         return allow
 
 
@@ -190,6 +824,127 @@ class CacheControl(core.http.HttpMethodAllow):
         return allow
 
 
+class SurrogateControl(CacheControl):
+    """
+    A view behavior that adds the Surrogate-Control and Surrogate-Key headers
+    for CDNs and other surrogate caches to the response during the allow
+    phase of the dispatch, in addition to the cache control headers of
+    CacheControl.
+    
+    Set the surrogate_control_* attributes to values other than None to add
+    the Surrogate-Control directives, e.g. surrogate_control_max_age to add
+    max-age or surrogate_control_no_store to True to add no-store.
+    
+    Set the surrogate_keys attribute, or override get_surrogate_keys(), to
+    tag the response with tag strings, model instances or model classes, e.g.
+    the objects that the response displays. They are turned into surrogate
+    keys like daydreamer.core.tags.get_tag() does, so the keys match the tags
+    of CachePage. The keys are read after the response has been generated, so
+    get_surrogate_keys() may use the objects that the view has loaded. Set
+    surrogate_keys_header to the header that the CDN reads the keys from, if
+    it isn't Surrogate-Key.
+    
+    Purge the keys with daydreamer.core.surrogates.purge(), or call
+    daydreamer.core.surrogates.connect() to purge them whenever their tags
+    are invalidated.
+    
+    Set the surrogate_control attribute to a falsy value to disable the
+    surrogate headers.
+    
+    """
+    surrogate_control = True
+    surrogate_control_max_age = None
+    surrogate_control_stale_while_revalidate = None
+    surrogate_control_stale_if_error = None
+    surrogate_control_no_store = None
+    surrogate_keys = None
+    surrogate_keys_header = "Surrogate-Key"
+    
+    def get_surrogate_control(self):
+        """
+        A hook to override the surrogate_control value.
+        
+        """
+        return self.surrogate_control
+    
+    def get_surrogate_control_max_age(self):
+        """
+        A hook to override the surrogate_control_max_age value.
+        
+        """
+        return self.surrogate_control_max_age
+    
+    def get_surrogate_control_stale_while_revalidate(self):
+        """
+        A hook to override the surrogate_control_stale_while_revalidate value.
+        
+        """
+        return self.surrogate_control_stale_while_revalidate
+    
+    def get_surrogate_control_stale_if_error(self):
+        """
+        A hook to override the surrogate_control_stale_if_error value.
+        
+        """
+        return self.surrogate_control_stale_if_error
+    
+    def get_surrogate_control_no_store(self):
+        """
+        A hook to override the surrogate_control_no_store value.
+        
+        """
+        return self.surrogate_control_no_store
+    
+    def get_surrogate_keys(self):
+        """
+        A hook to override the surrogate_keys value.
+        
+        """
+        return self.surrogate_keys
+    
+    def get_surrogate_keys_header(self):
+        """
+        A hook to override the surrogate_keys_header value.
+        
+        """
+        return self.surrogate_keys_header
+    
+    def surrogate_control_respond(self, handler, request, *args, **kwargs):
+        """
+        Returns the handler's response with the surrogate headers added.
+        
+        """
+        response = handler(request, *args, **kwargs)
+        no_store = self.get_surrogate_control_no_store()
+        controls = dict(
+            (name, value,)
+            for name, value in (
+                ("max_age", self.get_surrogate_control_max_age(),),
+                ("stale_while_revalidate",
+                    self.get_surrogate_control_stale_while_revalidate(),),
+                ("stale_if_error",
+                    self.get_surrogate_control_stale_if_error(),),
+                ("no_store", True if no_store else None,),)
+            if value is not None)
+        if controls:
+            surrogates.patch_surrogate_control(response, **controls)
+        surrogates.patch_surrogate_keys(
+            response, self.get_surrogate_keys(),
+            header=self.get_surrogate_keys_header())
+        return response
+    
+    def get_allow_handler(self):
+        """
+        When surrogate_control is truthy, wraps the base handler with
+        surrogate_control_respond().
+        
+        """
+        allow = super(SurrogateControl, self).get_allow_handler()
+        if self.get_surrogate_control():
+            allow = functools.partial(self.surrogate_control_respond, allow)
+        return allow
+
+
 class NeverCache(core.http.HttpMethodAllow):
     """
     A view behavior that sets up cache control headings to never cache during
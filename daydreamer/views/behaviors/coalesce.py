@@ -0,0 +1,204 @@
+from __future__ import unicode_literals
+
+import functools
+import threading
+
+from django import http
+from django.conf import settings
+
+from daydreamer.auth import users as auth_users
+from daydreamer.core import urlresolvers
+
+from .. import core
+
+
+__all__ = ("CoalesceRequests",)
+
+
+class Flight(object):
+    """
+    An in-flight request, whose response is shared with identical requests
+    that arrive before it completes.
+    
+    """
+    def __init__(self):
+        self.done = threading.Event()
+        self.response = None
+
+
+# The in-flight requests of this process, by key.
+flights = {}
+flights_lock = threading.Lock()
+
+
+class CoalesceRequests(core.http.HttpMethodAllow):
+    """
+    A view behavior that coalesces identical GET and HEAD requests that are
+    handled concurrently by the current process during the allow phase of
+    the dispatch. The first request runs the handler, and the identical
+    requests that arrive while it is running wait for it and get copies of
+    its response, instead of running the handler again.
+    
+    Requests are identical when they have the same method, host, path and
+    query string, with the query string normalized like
+    daydreamer.core.urlresolvers.normalize_query() does, ignoring the
+    parameters whose names match any of the fnmatch-style patterns in
+    coalesce_query_ignore. Override get_coalesce_variant() to also require
+    identical requests to have the same variant, such as the user's locale.
+    
+    Only requests from anonymous users are coalesced, unless
+    coalesce_anonymous_only is set to False, in which case the variant must
+    capture everything that the response depends on. Requests with a session
+    or CSRF cookie are never coalesced.
+    
+    Template responses are shared once they have been rendered. Waiting
+    requests give up after coalesce_timeout seconds and run the handler
+    themselves. So do the requests waiting for a response that fails, that
+    is streaming or that sets cookies or uses the CSRF token, which can't be
+    shared.
+    
+    Set the coalesce attribute to a falsy value to disable the behavior.
+    
+    """
+    coalesce = True
+    coalesce_query_ignore = ()
+    coalesce_variant = None
+    coalesce_anonymous_only = True
+    coalesce_timeout = 10
+    
+    def get_coalesce(self):
+        """
+        A hook to override the coalesce value.
+        
+        """
+        return self.coalesce
+    
+    def get_coalesce_query_ignore(self):
+        """
+        A hook to override the coalesce_query_ignore value.
+        
+        """
+        return self.coalesce_query_ignore
+    
+    def get_coalesce_variant(self):
+        """
+        A hook to override the coalesce_variant value.
+        
+        """
+        return self.coalesce_variant
+    
+    def get_coalesce_anonymous_only(self):
+        """
+        A hook to override the coalesce_anonymous_only value.
+        
+        """
+        return self.coalesce_anonymous_only
+    
+    def get_coalesce_timeout(self):
+        """
+        A hook to override the coalesce_timeout value.
+        
+        """
+        return self.coalesce_timeout
+    
+    def coalesce_key(self, request):
+        """
+        Returns the key identifying the request among identical requests.
+        
+        """
+        cls = type(self)
+        return (
+            cls.__module__, cls.__name__,
+            request.method, request.get_host(), request.path,
+            urlresolvers.normalize_query(
+                request.META.get("QUERY_STRING", ""),
+                ignore=self.get_coalesce_query_ignore()),
+            self.get_coalesce_variant(),)
+    
+    def coalesce_test(self, request):
+        """
+        Returns True when the request may be coalesced.
+        
+        """
+        if request.method not in ("GET", "HEAD",):
+            return False
+        if (settings.SESSION_COOKIE_NAME in request.COOKIES or
+            settings.CSRF_COOKIE_NAME in request.COOKIES):
+            return False
+        if not self.get_coalesce_anonymous_only():
+            return True
+        user = getattr(request, "user", None)
+        return (
+            user is None or
+            auth_users.is_anonymous_request(request) or
+            not user.is_authenticated())
+    
+    def coalesce_copy(self, response):
+        """
+        Returns a copy of a rendered, non-streaming response, without its
+        cookies.
+        
+        """
+        copied = http.HttpResponse(
+            response.content, status=response.status_code)
+        for header, value in response.items():
+            copied[header] = value
+        return copied
+    
+    def coalesce_respond(self, handler, request, *args, **kwargs):
+        """
+        Returns the handler's response, or a copy of the response to an
+        identical request that is already being handled.
+        
+        """
+        if not self.coalesce_test(request):
+            return handler(request, *args, **kwargs)
+        key = self.coalesce_key(request)
+        with flights_lock:
+            flight = flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = flights[key] = Flight()
+        if not leader:
+            if not flight.done.wait(self.get_coalesce_timeout()):
+                # Let the next request lead, in case this flight's response
+                # will never be rendered.
+                with flights_lock:
+                    if flights.get(key) is flight:
+                        del flights[key]
+            if flight.response is not None:
+                return self.coalesce_copy(flight.response)
+            return handler(request, *args, **kwargs)
+        def land(response=None):
+            # The cookies and the CSRF token belong to the leader's visitor,
+            # so the followers run the handler themselves.
+            if (response is not None and
+                not response.streaming and
+                not response.cookies and
+                not request.META.get("CSRF_COOKIE_USED")):
+                flight.response = self.coalesce_copy(response)
+            with flights_lock:
+                if flights.get(key) is flight:
+                    del flights[key]
+            flight.done.set()
+        try:
+            response = handler(request, *args, **kwargs)
+        except:
+            land()
+            raise
+        if hasattr(response, "render") and callable(response.render):
+            response.add_post_render_callback(land)
+        else:
+            land(response)
+        return response
+    
+    def get_allow_handler(self):
+        """
+        When coalesce is truthy, wraps the base handler with
+        coalesce_respond().
+        
+        """
+        allow = super(CoalesceRequests, self).get_allow_handler()
+        if self.get_coalesce():
+            allow = functools.partial(self.coalesce_respond, allow)
+        return allow
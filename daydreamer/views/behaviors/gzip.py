@@ -1,7 +1,10 @@
 from __future__ import unicode_literals
 
-from django.utils.decorators import classonlymethod
-from django.views.decorators import gzip
+import functools
+
+from django.utils.decorators import available_attrs, classonlymethod
+
+from daydreamer.core import compression, stats
 
 from .. import generic
 
@@ -16,17 +19,99 @@ class GZipPage(generic.View):
     
     Set the gzip_page attribute to a falsy value to disable the behavior.
     
-    See the django.views.decorators.gzip.gzip_page() for details.
+    The response is gzipped like the django.views.decorators.gzip.gzip_page()
+    decorator does, except that streaming responses are compressed chunk by
+    chunk as they are sent, flushing the compressed stream after every
+    gzip_page_flush_size bytes of content, instead of after every chunk. See
+    daydreamer.core.compression.compress_sequence() for details.
+    
+    Content shorter than gzip_page_min_length bytes, and content whose type
+    matches any of the fnmatch-style patterns in gzip_page_types of already
+    compressed types, is sent uncompressed. The compression level is picked
+    from gzip_page_levels by the content's length. Set gzip_page_pressure to
+    True to lower the level when the CPU is busy, or override
+    get_gzip_page_pressure() to provide another measure of the pressure. See
+    daydreamer.core.compression.gzip_response() for details.
+    
+    Identical content is compressed once per process and then served from
+    the process-wide daydreamer.core.compression.body_cache, a least recently
+    used cache capped at BODY_CACHE_BYTES of compressed content, which suits
+    error pages, anonymous pages and reference data. Set
+    gzip_page_body_cache to a falsy value to always compress the content.
+    
+    Since the behavior wraps the view function, its attributes are read from
+    the view class, and its hooks are class methods.
+    
+    The outcomes, the compressed bytes and the time spent compressing are
+    counted in the view class' stats, returned by gzip_page_stats().
     
     """
     gzip_page = True
+    gzip_page_flush_size = compression.FLUSH_SIZE
+    gzip_page_min_length = compression.MIN_LENGTH
+    gzip_page_types = compression.COMPRESSED_TYPES
+    gzip_page_levels = compression.LEVELS
+    gzip_page_pressure = False
+    gzip_page_body_cache = True
+    
+    @classmethod
+    def get_gzip_page_pressure(cls):
+        """
+        Returns the CPU pressure to lower the compression level by, between
+        0 and 1, when gzip_page_pressure is truthy, or 0 otherwise.
+        
+        """
+        return compression.get_pressure() if cls.gzip_page_pressure else 0
+    
+    @classmethod
+    def gzip_page_stats(cls):
+        """
+        Returns the process-wide stats for the view class' gzipped responses.
+        
+        See daydreamer.core.compression.gzip_response() for the counters.
+        The compression ratio is bytes_out / bytes_in.
+        
+        """
+        return stats.get_view_stats("gzip_page", cls)
+    
+    @classmethod
+    def gzip_page_respond(cls, request, response):
+        """
+        Returns the gzipped response.
+        
+        """
+        response = compression.gzip_response(
+            request, response,
+            flush_size=cls.gzip_page_flush_size,
+            min_length=cls.gzip_page_min_length,
+            types=cls.gzip_page_types,
+            levels=cls.gzip_page_levels,
+            pressure=cls.get_gzip_page_pressure(),
+            body_cache=(
+                compression.body_cache
+                    if cls.gzip_page_body_cache
+                    else None),
+            stats=cls.gzip_page_stats())
+        stats.publish_due()
+        return response
     
     @classonlymethod
     def as_view(cls, **kwargs):
         """
-        Optionally decorates the base view with
-        django.views.decorators.gzip.gzip_page().
+        Optionally wraps the base view with gzip_page_respond(). Template
+        responses are gzipped once they have been rendered.
         
         """
         view = super(GZipPage, cls).as_view(**kwargs)
-        return gzip.gzip_page(view) if cls.gzip_page else view
+        if not cls.gzip_page:
+            return view
+        
+        @functools.wraps(view, assigned=available_attrs(view))
+        def gzip_view(request, *args, **kwargs):
+            response = view(request, *args, **kwargs)
+            respond = functools.partial(cls.gzip_page_respond, request)
+            if hasattr(response, "render") and callable(response.render):
+                response.add_post_render_callback(respond)
+                return response
+            return respond(response)
+        return gzip_view
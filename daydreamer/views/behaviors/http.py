@@ -1,13 +1,31 @@
 from __future__ import unicode_literals
 
 import collections
+import functools
+import hashlib
+import re
+import time
 
+from django import http as django_http
+from django.core import cache as caches
+from django.utils import encoding, http as http_utils
 from django.views.decorators import http
 
+from daydreamer.core import etags, stats
+
 from .. import core
 
 
-__all__ = ("RequireGET", "RequirePOST", "RequireSafe", "Condition",)
+__all__ = (
+    "RequireGET", "RequirePOST", "RequireSafe", "Condition", "ContentETag",)
+
+
+# The cache key namespace for the ETags of ContentETag responses.
+CONTENT_ETAG_KEY_PREFIX = "daydreamer.views.behaviors.http.content_etag"
+
+# The headers of a response that are kept in a 304 not modified response.
+NOT_MODIFIED_HEADERS = (
+    "Cache-Control", "Content-Location", "Expires", "Vary",)
 
 
 class RequireGET(core.http.HttpMethodDeny):
@@ -49,20 +67,386 @@ class Condition(core.http.HttpMethodAllow):
     See the django.views.decorators.http.condition() view decorator
     for details.
     
+    Instead of defining the methods, a generic view may name a field that
+    changes whenever its content does, such as a version number or a
+    modification timestamp, in condition_etag_field and/or
+    condition_last_modified_field. The values are looked up by the view's
+    get_etag_from_field() and get_last_modified_from_field() methods, which
+    daydreamer.views.generic.DetailView and ListView implement. This lets
+    unchanged content return a 304 response before the object list is
+    fetched and the template is rendered.
+    
+    To answer without touching the database at all, set the
+    condition_etag_tags attribute, or override get_condition_etag_tags(), to
+    tag strings, model instances or model classes, e.g.
+    "auth.user.{pk}".format(**self.kwargs). The ETag is derived from the
+    generations of the tags with daydreamer.core.etags.get_etag(), which
+    keeps them in the process' memory for condition_etag_local_timeout
+    seconds in front of the condition_etag_cache, and changes whenever any
+    of the tags is invalidated. Tag generations take precedence over the
+    condition_etag_field.
+    
+    The outcomes of the conditional requests are counted in the view class'
+    stats, returned by condition_stats().
+    
     """
     condition_etag = None
     condition_last_modified = None
+    condition_etag_field = None
+    condition_last_modified_field = None
+    condition_etag_tags = None
+    condition_etag_cache = None
+    condition_etag_local_timeout = etags.LOCAL_TIMEOUT
+    
+    def get_condition_etag_field(self):
+        """
+        A hook to override the condition_etag_field value.
+        
+        """
+        return self.condition_etag_field
+    
+    def get_condition_last_modified_field(self):
+        """
+        A hook to override the condition_last_modified_field value.
+        
+        """
+        return self.condition_last_modified_field
+    
+    def get_condition_etag_tags(self):
+        """
+        A hook to override the condition_etag_tags value.
+        
+        """
+        return self.condition_etag_tags
+    
+    def get_condition_etag_cache(self):
+        """
+        A hook to override the condition_etag_cache value.
+        
+        """
+        return self.condition_etag_cache
+    
+    def get_condition_etag_local_timeout(self):
+        """
+        A hook to override the condition_etag_local_timeout value.
+        
+        """
+        return self.condition_etag_local_timeout
+    
+    def get_condition_etag(self):
+        """
+        Returns the condition_etag() method, or a function returning the
+        ETag from the generations of the condition_etag_tags or from the
+        view's condition_etag_field, or None.
+        
+        """
+        if isinstance(self.condition_etag, collections.Callable):
+            return self.condition_etag
+        items = self.get_condition_etag_tags()
+        if items:
+            return lambda request, *args, **kwargs: etags.get_etag(
+                items,
+                cache=self.get_condition_etag_cache(),
+                local_timeout=self.get_condition_etag_local_timeout())
+        field = self.get_condition_etag_field()
+        if field:
+            return lambda request, *args, **kwargs: (
+                self.get_etag_from_field(field))
+        return None
+    
+    def get_condition_last_modified(self):
+        """
+        Returns the condition_last_modified() method, or a function returning
+        the last modified datetime from the view's
+        condition_last_modified_field, or None.
+        
+        """
+        if isinstance(self.condition_last_modified, collections.Callable):
+            return self.condition_last_modified
+        field = self.get_condition_last_modified_field()
+        if field:
+            return lambda request, *args, **kwargs: (
+                self.get_last_modified_from_field(field))
+        return None
+    
+    def condition_stats(self):
+        """
+        Returns the process-wide stats for the view class' conditional
+        responses.
+        
+        The stats count the "not_modified" (304), "precondition_failed" (412)
+        and "modified" responses, and observe the time spent responding
+        as "respond".
+        
+        """
+        return stats.get_view_stats("condition", type(self))
+    
+    def condition_respond(self, handler, request, *args, **kwargs):
+        """
+        Returns the handler's response, recording its outcome in
+        condition_stats().
+        
+        """
+        started = time.time()
+        response = handler(request, *args, **kwargs)
+        condition_stats = self.condition_stats()
+        condition_stats.incr(
+            "not_modified"
+                if response.status_code == 304
+                else "precondition_failed"
+                    if response.status_code == 412
+                    else "modified")
+        condition_stats.observe("respond", time.time() - started)
+        stats.publish_due()
+        return response
     
     def get_allow_handler(self):
         """
-        If either of condition_etag or condition_last_modified is defined, wrap
-        the base allow handler in the condition() decorator.
+        If either of get_condition_etag() or get_condition_last_modified()
+        returns a function, wrap the base allow handler in the condition()
+        decorator.
         
         """
         allow = super(Condition, self).get_allow_handler()
-        if (isinstance(self.condition_etag, collections.Callable) or
-            isinstance(self.condition_last_modified, collections.Callable)):
-            allow = http.condition(
-                etag_func=self.condition_etag,
-                last_modified_func=self.condition_last_modified)(allow)
+        etag = self.get_condition_etag()
+        last_modified = self.get_condition_last_modified()
+        if etag or last_modified:
+            allow = functools.partial(
+                self.condition_respond,
+                http.condition(
+                    etag_func=etag,
+                    last_modified_func=last_modified)(allow))
+        return allow
+
+
+class ContentETag(core.http.HttpMethodAllow):
+    """
+    A view behavior that sets a strong ETag computed from a hash of the
+    response's content during the allow phase of the dispatch, for views
+    whose content has no cheap version to derive an ETag from. A GET or HEAD
+    request whose If-None-Match header matches the ETag gets a 304 not
+    modified response with an empty body instead. Template responses are
+    hashed once they have been rendered.
+    
+    Streaming responses are hashed as their content is produced, so they
+    can't carry the ETag of their own content, which is only known after the
+    last chunk has been sent. With content_etag_tags, later streaming
+    responses carry the cached ETag as long as none of the tags has been
+    invalidated since, and the ETag is used by the version check below.
+    
+    The ";gzip" suffix that GZipPage and Django's GZipMiddleware add to the
+    ETag of compressed responses is ignored when matching If-None-Match.
+    
+    Hashing saves bandwidth, but the content is still generated. To skip
+    generating it, set the content_etag_tags attribute, or override
+    get_content_etag_tags(), to the tags that the content depends on, named
+    like the tags of CachePage. The ETag of each URL is then cached in the
+    content_etag_cache for content_etag_timeout seconds along with the
+    generations of the tags, and a conditional request matching the cached
+    ETag gets a 304 response without calling the handler, as long as none of
+    the tags has been invalidated since.
+    
+    Responses that already have an ETag, such as the responses of Condition,
+    are left alone. The outcomes are counted in the view class' stats,
+    returned by content_etag_stats().
+    
+    Set the content_etag attribute to a falsy value to disable the behavior.
+    
+    """
+    content_etag = True
+    content_etag_tags = None
+    content_etag_cache = None
+    content_etag_timeout = None
+    
+    def get_content_etag(self):
+        """
+        A hook to override the content_etag value.
+        
+        """
+        return self.content_etag
+    
+    def get_content_etag_tags(self):
+        """
+        A hook to override the content_etag_tags value.
+        
+        """
+        return self.content_etag_tags
+    
+    def get_content_etag_cache(self):
+        """
+        A hook to override the content_etag_cache value.
+        
+        """
+        return self.content_etag_cache
+    
+    def get_content_etag_timeout(self):
+        """
+        A hook to override the content_etag_timeout value.
+        
+        """
+        return self.content_etag_timeout
+    
+    def content_etag_backend(self):
+        """
+        Returns the cache named by content_etag_cache, defaulting to Django's
+        default cache.
+        
+        """
+        return caches.get_cache(
+            self.get_content_etag_cache() or caches.DEFAULT_CACHE_ALIAS)
+    
+    def content_etag_stats(self):
+        """
+        Returns the process-wide stats for the view class' hashed responses.
+        
+        The stats count the "not_modified" responses to requests matching
+        the hash of the generated content, the "skipped" responses to
+        requests matching a cached ETag without generating the content, and
+        the "modified" responses.
+        
+        """
+        return stats.get_view_stats("content_etag", type(self))
+    
+    def content_etag_record(self, name):
+        """
+        Counts the named outcome in content_etag_stats().
+        
+        """
+        self.content_etag_stats().incr(name)
+        stats.publish_due()
+    
+    def content_etag_key(self, request):
+        """
+        Returns the cache key of the ETag for the request's URL.
+        
+        """
+        return ".".join((
+            CONTENT_ETAG_KEY_PREFIX,
+            hashlib.md5(
+                encoding.iri_to_uri(
+                    request.build_absolute_uri()).encode("utf-8")
+                ).hexdigest(),))
+    
+    def content_etag_matches(self, request, etag):
+        """
+        Returns True when the request's If-None-Match header matches the
+        unquoted ETag, with or without the ";gzip" suffix of compressed
+        responses.
+        
+        """
+        if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+        if not if_none_match:
+            return False
+        matches = set(
+            re.sub(r";gzip$", "", match)
+            for match in http_utils.parse_etags(if_none_match))
+        return "*" in matches or etag in matches
+    
+    def content_etag_not_modified(self, etag, response=None):
+        """
+        Returns a 304 not modified response with the unquoted ETag, keeping
+        the cache headers and cookies of the response, if any.
+        
+        """
+        not_modified = django_http.HttpResponseNotModified()
+        not_modified["ETag"] = http_utils.quote_etag(etag)
+        if response is not None:
+            for header in NOT_MODIFIED_HEADERS:
+                if response.has_header(header):
+                    not_modified[header] = response[header]
+            not_modified.cookies = response.cookies
+        return not_modified
+    
+    def content_etag_store(self, request, version, etag):
+        """
+        Caches the unquoted ETag of the request's URL along with the version
+        of its tags, when there are tags.
+        
+        """
+        if version is None:
+            return
+        cache = self.content_etag_backend()
+        timeout = self.get_content_etag_timeout()
+        cache.set(
+            self.content_etag_key(request),
+            {"etag": etag, "version": version},
+            cache.default_timeout if timeout is None else timeout)
+    
+    def content_etag_stream(self, request, version, content):
+        """
+        Yields the chunks of streaming content, hashing them as they are
+        produced, and stores the ETag once the last chunk has been sent.
+        
+        """
+        digest = hashlib.md5()
+        for chunk in content:
+            digest.update(chunk)
+            yield chunk
+        self.content_etag_store(request, version, digest.hexdigest())
+    
+    def content_etag_finish(self, request, version, response):
+        """
+        Sets the ETag of a successful, rendered response, returning a 304 not
+        modified response instead when the request matches it. Streaming
+        responses get the cached ETag of the request's URL, if it is current.
+        
+        """
+        if response.status_code != 200 or response.has_header("ETag"):
+            return response
+        if response.streaming:
+            if version is not None:
+                entry = self.content_etag_backend().get(
+                    self.content_etag_key(request))
+                if entry is not None and entry["version"] == version:
+                    response["ETag"] = http_utils.quote_etag(entry["etag"])
+            response.streaming_content = self.content_etag_stream(
+                request, version, response.streaming_content)
+            return response
+        etag = hashlib.md5(response.content).hexdigest()
+        self.content_etag_store(request, version, etag)
+        if self.content_etag_matches(request, etag):
+            self.content_etag_record("not_modified")
+            return self.content_etag_not_modified(etag, response)
+        self.content_etag_record("modified")
+        response["ETag"] = http_utils.quote_etag(etag)
+        return response
+    
+    def content_etag_respond(self, handler, request, *args, **kwargs):
+        """
+        Returns a 304 not modified response when the request matches the
+        cached ETag of its URL and the version of the tags hasn't changed, or
+        the handler's response with its ETag otherwise.
+        
+        """
+        if request.method not in ("GET", "HEAD",):
+            return handler(request, *args, **kwargs)
+        items = self.get_content_etag_tags()
+        version = (
+            etags.get_etag(items, cache=self.get_content_etag_cache())
+                if items
+                else None)
+        if version is not None and request.META.get("HTTP_IF_NONE_MATCH"):
+            entry = self.content_etag_backend().get(
+                self.content_etag_key(request))
+            if (entry is not None and
+                entry["version"] == version and
+                self.content_etag_matches(request, entry["etag"])):
+                self.content_etag_record("skipped")
+                return self.content_etag_not_modified(entry["etag"])
+        response = handler(request, *args, **kwargs)
+        finish = functools.partial(self.content_etag_finish, request, version)
+        if hasattr(response, "render") and callable(response.render):
+            response.add_post_render_callback(finish)
+            return response
+        return finish(response)
+    
+    def get_allow_handler(self):
+        """
+        When content_etag is truthy, wraps the base handler with
+        content_etag_respond().
+        
+        """
+        allow = super(ContentETag, self).get_allow_handler()
+        if self.get_content_etag():
+            allow = functools.partial(self.content_etag_respond, allow)
         return allow
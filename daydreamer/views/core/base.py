@@ -4,6 +4,7 @@ import logging
 
 from django import http
 from django.core import exceptions
+from django.utils.decorators import classonlymethod
 from django.views import generic
 
 from daydreamer.core import lang, urlresolvers
@@ -49,6 +50,20 @@ class Core(generic.View):
     # The request logger.
     logger = logging.getLogger("django.request")
     
+    # View creation.
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        """
+        Adds the view class and the initial keyword arguments to the view
+        function as its view_class and view_initkwargs attributes, so that
+        the view can be inspected through the URLconf.
+        
+        """
+        view = super(Core, cls).as_view(**initkwargs)
+        view.view_class = cls
+        view.view_initkwargs = initkwargs
+        return view
+    
     # URL reversing.
     def reverse(self, viewname, qualified=False, scheme=None, **kwargs):
         """
@@ -1,16 +1,47 @@
 from __future__ import unicode_literals
 
+import collections
+import hashlib
+
 from django import http
 from django.conf import settings
 from django.contrib import messages
 from django.core import exceptions
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.utils import encoding
 
-from daydreamer.core import urlresolvers
+from daydreamer.core import urlresolvers, versions
 
 from . import base
 
 
-__all__ = ("Denial",)
+__all__ = ("Denial", "invalidate_decisions",)
+
+
+# The cache key namespace for cached denial test decisions.
+KEY_PREFIX = "daydreamer.views.denial"
+
+
+def get_decision_version_key(prefix, user_pk):
+    """
+    Returns the key of the version counter for the cached decisions of the
+    denial tests with the given prefix for the user with the given
+    primary key.
+    
+    """
+    return ".".join((
+        KEY_PREFIX, "version", prefix, encoding.force_text(user_pk),))
+
+
+def invalidate_decisions(prefix, user_pk, cache=None):
+    """
+    Invalidates the cached decisions of the denial tests with the given
+    prefix for the user with the given primary key in all views. Use the
+    cache alias that the views' <prefix>_decision_cache attribute specifies.
+    
+    """
+    versions.bump_version(
+        get_decision_version_key(prefix, user_pk), cache=cache)
 
 
 class Denial(base.Deny):
@@ -69,22 +100,60 @@ class Denial(base.Deny):
         the redirect URL. A typical value would be
         django.contrib.auth.REDIRECT_FIELD_NAME.
         
+    The denial test for a prefix is the <prefix>_test() method. Subclasses
+    should call denial_test() with the prefix to run it, so that its result
+    can be cached per user with the following optional attributes:
+        
+        Set the <prefix>_decision_cache attribute to True or to a cache alias
+        to cache the test's decisions for authenticated users. Decisions for
+        anonymous users are never cached. Defaults to None, which disables
+        the cache.
+        
+        Set the <prefix>_decision_cache_timeout attribute to the number of
+        seconds that a decision is cached. Defaults to the cache's default
+        timeout when None.
+        
+        Set the <prefix>_decision_cache_negative attribute to a truthy value
+        to cache failed tests, too. Defaults to False, so that a user who
+        becomes eligible isn't denied until the decision expires.
+        
+        Set the <prefix>_decision_cache_vary attribute to a method returning
+        a value that the decision depends on besides the view, the prefix
+        and the user, such as an object's primary key. Defaults to None.
+        
+    Cached decisions can be invalidated with invalidate_decisions() or
+    invalidate_denial_decisions().
+    
+    Subclasses should also add their prefixes to the tuple returned by
+    get_denials(), in front of the result of super(), and may declare a
+    relative <prefix>_cost for their tests, defaulting to 0. When the
+    denial_cost_ordered attribute is truthy, the first call to denial_test()
+    runs the tests of all of the denials in order of increasing cost until
+    one fails, breaking ties in method resolution order. Tests that weren't
+    run then pass, so the request is denied by the cheapest failing test's
+    handler. Whether the request is denied is the same in both modes, but
+    the handler that denies it may differ. The initial value of
+    denial_cost_ordered is False.
+    
     Additional object-oriented hooks are provided by the implementation. See
     the source code for details.
     
     """
+    denial_cost_ordered = False
+    
     # Hooks for resolving attribute values used by deny().
-    def get_denial_attr(self, prefix, attr):
+    def get_denial_attr(self, prefix, attr, *default):
         """
         A hook to customize the way that attributes for the deny()
         method are retrieved from a prefix and attribute name.
         
         The default implementation joins the prefix and attribute name with
         "_" and looks up the attribute with getattr. This will raise an
-        AttributeError if the generated attribute name does not exist.
+        AttributeError if the generated attribute name does not exist, unless
+        a default value is given.
         
         """
-        return getattr(self, "_".join((prefix, attr)))
+        return getattr(self, "_".join((prefix, attr)), *default)
     
     def get_denial_raise(self, prefix):
         """
@@ -208,6 +277,183 @@ class Denial(base.Deny):
                         request=self.request)})
         return redirect_url
     
+    # Hooks for caching the decisions of the denial tests.
+    def get_denial_decision_cache(self, prefix):
+        """
+        A hook to customize resolution of the decision cache setting used
+        by denial_test().
+        
+        The default implementation returns self.<prefix>_decision_cache,
+        defaulting to None when it does not exist.
+        
+        """
+        return self.get_denial_attr(prefix, "decision_cache", None)
+    
+    def get_denial_decision_cache_timeout(self, prefix):
+        """
+        A hook to customize resolution of the decision cache timeout used
+        by denial_test().
+        
+        The default implementation returns
+        self.<prefix>_decision_cache_timeout, defaulting to the cache's default
+        timeout when it is None or does not exist.
+        
+        """
+        timeout = self.get_denial_attr(prefix, "decision_cache_timeout", None)
+        return DEFAULT_TIMEOUT if timeout is None else timeout
+    
+    def get_denial_decision_cache_negative(self, prefix):
+        """
+        A hook to customize resolution of the negative decision caching
+        setting used by denial_test().
+        
+        The default implementation returns
+        self.<prefix>_decision_cache_negative, defaulting to False when it
+        does not exist.
+        
+        """
+        return self.get_denial_attr(prefix, "decision_cache_negative", False)
+    
+    def get_denial_decision_cache_vary(self, prefix):
+        """
+        A hook to customize resolution of the value that cached decisions
+        vary on, used by denial_test().
+        
+        The default implementation calls self.<prefix>_decision_cache_vary()
+        and returns the result, defaulting to None when the attribute is not
+        a callable.
+        
+        """
+        vary = self.get_denial_attr(prefix, "decision_cache_vary", None)
+        return vary() if isinstance(vary, collections.Callable) else None
+    
+    def get_denial_decision_key(self, prefix, user_pk, cache):
+        """
+        A hook to customize the cache key of a decision used by
+        denial_test().
+        
+        The default implementation hashes the view class' import path, the
+        prefix, the user's primary key, the vary value and the current
+        version of the user's decisions for the prefix.
+        
+        """
+        return ".".join((
+            KEY_PREFIX, "decision", hashlib.md5(encoding.force_bytes(
+                "\n".join((
+                    ".".join((type(self).__module__, type(self).__name__,)),
+                    prefix,
+                    encoding.force_text(user_pk),
+                    repr(self.get_denial_decision_cache_vary(prefix)),
+                    encoding.force_text(versions.get_version(
+                        get_decision_version_key(prefix, user_pk),
+                        cache=cache)),)))).hexdigest(),))
+    
+    # Hooks for ordering the denial tests.
+    def get_denial_cost_ordered(self):
+        """
+        A hook to override the denial_cost_ordered value.
+        
+        The default implementation returns self.denial_cost_ordered.
+        
+        """
+        return self.denial_cost_ordered
+    
+    def get_denials(self):
+        """
+        Returns the tuple of prefixes of the denial tests in method resolution
+        order.
+        
+        Subclasses should add their prefixes in front of the result of
+        super().
+        
+        """
+        return ()
+    
+    def get_denial_cost(self, prefix):
+        """
+        A hook to customize resolution of the relative cost of a denial test.
+        
+        The default implementation returns self.<prefix>_cost, defaulting to
+        0 when it does not exist.
+        
+        """
+        return self.get_denial_attr(prefix, "cost", 0)
+    
+    def get_denial_failure(self):
+        """
+        Runs the denial tests from get_denials() in order of increasing cost
+        and returns the prefix of the first test that fails, or None when
+        all of the tests pass. The result is computed once per view instance.
+        
+        The reported prefix is the cheapest failing test's rather than the
+        first failing test's in method resolution order. Knowing the latter
+        would require running every test that precedes the failing one in
+        method resolution order, however expensive, which is what cost
+        ordering is meant to avoid on requests that are denied anyway.
+        Whether the request is denied doesn't depend on the order.
+        
+        """
+        if not hasattr(self, "_denial_failure"):
+            self._denial_failure = None
+            for prefix in sorted(self.get_denials(), key=self.get_denial_cost):
+                if not self.denial_decision(prefix):
+                    self._denial_failure = prefix
+                    break
+        return self._denial_failure
+    
+    def denial_test(self, prefix):
+        """
+        Returns the result of the denial test for the prefix as a boolean.
+        
+        When cost ordering is enabled and the prefix is one of the denials,
+        the result is taken from get_denial_failure(). Otherwise, the test is
+        run by denial_decision().
+        
+        """
+        if self.get_denial_cost_ordered() and prefix in self.get_denials():
+            return prefix != self.get_denial_failure()
+        return self.denial_decision(prefix)
+    
+    def denial_decision(self, prefix):
+        """
+        Runs the denial test, self.<prefix>_test(), and returns its result
+        as a boolean.
+        
+        When the decision cache is enabled for the prefix and the user is
+        authenticated, a cached decision is returned when one is available.
+        Otherwise, the test's decision is cached when it passes or when
+        negative caching is enabled.
+        
+        """
+        test = getattr(self, "_".join((prefix, "test",)))
+        cache = self.get_denial_decision_cache(prefix)
+        user = getattr(self.request, "user", None)
+        if not cache or user is None or not user.is_authenticated():
+            return bool(test())
+        cache = versions.get_cache(cache if cache is not True else None)
+        key = self.get_denial_decision_key(prefix, user.pk, cache)
+        decision = cache.get(key)
+        if decision is None:
+            decision = bool(test())
+            if decision or self.get_denial_decision_cache_negative(prefix):
+                cache.set(
+                    key, decision,
+                    self.get_denial_decision_cache_timeout(prefix))
+        return decision
+    
+    def invalidate_denial_decisions(self, prefix, user_pk=None):
+        """
+        Invalidates the cached decisions of the denial tests with the given
+        prefix for the user with the given primary key, defaulting to the
+        request's user, in all views.
+        
+        """
+        cache = self.get_denial_decision_cache(prefix)
+        invalidate_decisions(
+            prefix,
+            self.request.user.pk if user_pk is None else user_pk,
+            cache=cache if cache is not True else None)
+    
     # Hooks to modify the implementation of deny().
     def denial_raise_exception(self, prefix):
         """
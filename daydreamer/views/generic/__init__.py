@@ -2,13 +2,14 @@ from . import base, dates, detail, edit, list
 from .base import View, TemplateView, RedirectView
 from .dates import (ArchiveIndexView, YearArchiveView, MonthArchiveView,
     WeekArchiveView, DayArchiveView, TodayArchiveView, DateDetailView,)
-from .detail import DetailView
+from .detail import SingleObjectMixin, DetailView
 from .edit import FormView, CreateView, UpdateView, DeleteView
-from .list import ListView
+from .list import MultipleObjectMixin, ListView
 
 
 __all__ = (
     "View", "TemplateView", "RedirectView", "ArchiveIndexView",
     "YearArchiveView", "MonthArchiveView", "WeekArchiveView", "DayArchiveView",
-    "TodayArchiveView", "DateDetailView", "DetailView", "FormView",
-    "CreateView", "UpdateView", "DeleteView", "ListView",)
+    "TodayArchiveView", "DateDetailView", "SingleObjectMixin", "DetailView",
+    "FormView", "CreateView", "UpdateView", "DeleteView",
+    "MultipleObjectMixin", "ListView",)
@@ -3,6 +3,7 @@ from __future__ import unicode_literals
 from django.views import generic
 
 from .base import View
+from .detail import SingleObjectMixin
 
 
 __all__ = (
@@ -64,7 +65,7 @@ class TodayArchiveView(generic.TodayArchiveView, View):
     pass
 
 
-class DateDetailView(generic.DateDetailView, View):
+class DateDetailView(SingleObjectMixin, generic.DateDetailView, View):
     """
     Extends Django's DateDetailView class with features from
     daydreamer.views.generic.View.
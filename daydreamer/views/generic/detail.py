@@ -1,14 +1,56 @@
 from __future__ import unicode_literals
 
+from django.utils import encoding
 from django.views import generic
 
 from .base import View
 
 
-__all__ = ("DetailView",)
+__all__ = ("SingleObjectMixin", "DetailView",)
 
 
-class DetailView(generic.DetailView, View):
+class SingleObjectMixin(object):
+    """
+    Memoizes the object returned by Django's SingleObjectMixin.get_object(),
+    so that it is fetched from the database at most once per request.
+    
+    This allows other view behaviors, such as
+    daydreamer.views.behaviors.ObjectPermissionsRequired, to share the
+    object with the generic view by calling self.get_object(). The
+    conditional view behavior, daydreamer.views.behaviors.Condition, derives
+    the ETag and last modified datetime from the memoized object's fields.
+    
+    """
+    def get_object(self, queryset=None):
+        """
+        Returns the memoized object when no custom queryset is given.
+        
+        """
+        if queryset is not None:
+            return super(SingleObjectMixin, self).get_object(queryset=queryset)
+        if not hasattr(self, "_object"):
+            self._object = super(SingleObjectMixin, self).get_object()
+        return self._object
+    
+    def get_etag_from_field(self, field):
+        """
+        Returns the value of the object's field as an ETag, or None when the
+        value is None. Used by daydreamer.views.behaviors.Condition.
+        
+        """
+        value = getattr(self.get_object(), field)
+        return None if value is None else encoding.force_text(value)
+    
+    def get_last_modified_from_field(self, field):
+        """
+        Returns the value of the object's field as the last modified datetime.
+        Used by daydreamer.views.behaviors.Condition.
+        
+        """
+        return getattr(self.get_object(), field)
+
+
+class DetailView(SingleObjectMixin, generic.DetailView, View):
     """
     Extends Django's DetailView class with features from
     daydreamer.views.generic.View.
@@ -3,6 +3,7 @@ from __future__ import unicode_literals
 from django.views import generic
 
 from .base import View
+from .detail import SingleObjectMixin
 
 
 __all__ = ("FormView", "CreateView", "UpdateView", "DeleteView",)
@@ -26,7 +27,7 @@ class CreateView(generic.CreateView, View):
     pass
 
 
-class UpdateView(generic.UpdateView, View):
+class UpdateView(SingleObjectMixin, generic.UpdateView, View):
     """
     Extends Django's UpdateView class with features from
     daydreamer.views.generic.View.
@@ -35,7 +36,7 @@ class UpdateView(generic.UpdateView, View):
     pass
 
 
-class DeleteView(generic.DeleteView, View):
+class DeleteView(SingleObjectMixin, generic.DeleteView, View):
     """
     Extends Django's DeleteView class with features from
     daydreamer.views.generic.View.
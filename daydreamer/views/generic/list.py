@@ -1,14 +1,67 @@
 from __future__ import unicode_literals
 
+from django.db import models
+from django.utils import encoding
 from django.views import generic
 
 from .base import View
 
 
-__all__ = ("ListView",)
+__all__ = ("MultipleObjectMixin", "ListView",)
 
 
-class ListView(generic.ListView, View):
+class MultipleObjectMixin(object):
+    """
+    Derives the ETag and the last modified datetime of an object list from
+    a cheap aggregate over the view's queryset, for the conditional view
+    behavior, daydreamer.views.behaviors.Condition.
+    
+    Only the latest value of the field is queried, so the field must be set
+    on every write to a value greater than any other in the queryset, such
+    as a DateTimeField with auto_now=True or a number taken from a shared
+    sequence. A per-object version number, or a timestamp that isn't updated
+    on every write, lets an edit to an object other than the latest one go
+    unnoticed.
+    
+    """
+    def get_field_aggregate(self, field):
+        """
+        Returns a dictionary with the latest value of the field in the
+        queryset as "latest" and the number of objects as "count". The
+        aggregate is queried at most once per field and request.
+        
+        """
+        if not hasattr(self, "_field_aggregates"):
+            self._field_aggregates = {}
+        if field not in self._field_aggregates:
+            self._field_aggregates[field] = (
+                self.get_queryset().order_by().aggregate(
+                    latest=models.Max(field), count=models.Count("pk")))
+        return self._field_aggregates[field]
+    
+    def get_etag_from_field(self, field):
+        """
+        Returns an ETag made of the latest value of the field and the number
+        of objects in the queryset, which changes when an object is added or
+        removed, or when an object is changed and the field is updated as
+        described above.
+        
+        """
+        aggregate = self.get_field_aggregate(field)
+        return "-".join((
+            encoding.force_text(aggregate["latest"]),
+            encoding.force_text(aggregate["count"]),))
+    
+    def get_last_modified_from_field(self, field):
+        """
+        Returns the latest value of the field in the queryset as the last
+        modified datetime.
+        
+        """
+        return self.get_field_aggregate(field)["latest"]
+
+
+class ListView(MultipleObjectMixin, generic.ListView, View):
     """
     Extends Django's ListView class with features from
     daydreamer.views.generic.View.